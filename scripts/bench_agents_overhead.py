@@ -0,0 +1,78 @@
+"""Measure per-request overhead of the agents adapter with a stub model (no Ollama needed).
+
+Compares the old pattern (new adapter, provider and Ollama client plus
+``Runner.run_sync`` per request) with the cached adapter on the persistent
+background loop and with native ``await adapter.arun`` from one event loop.
+
+    PYTHONPATH=src python scripts/bench_agents_overhead.py --requests 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Callable
+
+from agents import Runner, set_tracing_disabled
+from agents.items import ModelResponse
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.adapters.agents import OllamaAgentsAdapter, OllamaAgentsModel, OllamaModelProvider
+
+
+class StubModel(OllamaAgentsModel):
+    """Builds its Ollama client like the real model but answers instantly."""
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        text = ResponseOutputText(text="ok", annotations=[], type="output_text")
+        message = ResponseOutputMessage(
+            id=f"stub-{uuid.uuid4().hex}", role="assistant", status="completed", type="message", content=[text]
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1), response_id=None)
+
+
+class StubProvider(OllamaModelProvider):
+    def __init__(self) -> None:
+        self._model = StubModel()
+
+
+def _per_request(prompt: str) -> None:
+    adapter = OllamaAgentsAdapter(provider=StubProvider())
+    Runner.run_sync(adapter._agent, prompt, run_config=adapter._run_config)
+
+
+def _timed(name: str, requests: int, call: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": name, "requests": requests, "ms_per_request": round(1000 * elapsed / requests, 3)}))
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    set_tracing_disabled(True)
+
+    cached = OllamaAgentsAdapter(provider=StubProvider())
+    cached.run("warm-up")
+
+    async def native() -> None:
+        for _ in range(args.requests):
+            await cached.arun("hello")
+
+    baseline = _timed("per_request_run_sync", args.requests, lambda: [_per_request("hello") for _ in range(args.requests)])
+    loop_thread = _timed("cached_persistent_loop", args.requests, lambda: [cached.run("hello") for _ in range(args.requests)])
+    native_async = _timed("cached_async_endpoint", args.requests, lambda: asyncio.run(native()))
+    print(json.dumps({
+        "speedup_persistent_loop": round(baseline / loop_thread, 2),
+        "speedup_async": round(baseline / native_async, 2),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare embedding backends on throughput and memory.
+
+Each backend runs in its own subprocess so peak RSS is measured in isolation:
+
+    PYTHONPATH=src python scripts/bench_embeddings.py --backends torch int8 onnx --sentences 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+SAMPLE = (
+    "Local-first research agents keep retrieval, memory and generation on the same machine, "
+    "so embedding throughput on CPU decides how fast the index can be rebuilt."
+)
+
+
+def _measure(backend: str, sentences: int, batch_size: int) -> dict:
+    from app.embeddings import DEFAULT_EMBED_MODEL, get_encoder
+
+    start = time.perf_counter()
+    encoder = get_encoder(DEFAULT_EMBED_MODEL, backend=backend)
+    encoder.encode(["warm-up"], convert_to_numpy=True)
+    load_seconds = time.perf_counter() - start
+
+    texts = [f"{SAMPLE} #{i}" for i in range(sentences)]
+    start = time.perf_counter()
+    encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 3),
+        "sentences_per_sec": round(sentences / elapsed, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.backends[0], args.sentences, args.batch_size)))
+        return
+
+    for backend in args.backends:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--child", "--backends", backend,
+             "--sentences", str(args.sentences), "--batch-size", str(args.batch_size)],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            print(json.dumps({"backend": backend, "error": completed.stderr.strip().splitlines()[-1:]}))
+            continue
+        print(completed.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
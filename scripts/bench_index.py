@@ -0,0 +1,60 @@
+"""Measure how rag.build_index scales with embedding worker processes.
+
+    PYTHONPATH=src python scripts/bench_index.py --docs 4000 --workers 1 2 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app import rag
+
+WORDS = (
+    "index vector memory crawl ollama graph retrieval latency embedding token batch shard "
+    "worker process cache prompt answer source research local model query corpus"
+).split()
+
+
+def _write_corpus(directory: Path, docs: int, words_per_doc: int) -> None:
+    rng = random.Random(0)
+    for i in range(docs):
+        text = " ".join(rng.choice(WORDS) for _ in range(words_per_doc))
+        (directory / f"doc_{i:06d}.txt").write_text(text, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--words-per-doc", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        corpus = root / "docs"
+        corpus.mkdir()
+        _write_corpus(corpus, args.docs, args.words_per_doc)
+        rag.INDEX_FILE = root / "index.faiss"
+        rag.META_FILE = root / "metadata.jsonl"
+        rag.LEXICAL_DIR = root / "bm25"
+
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            rag.build_index(corpus, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(json.dumps({
+                "workers": workers,
+                "seconds": round(elapsed, 2),
+                "docs_per_sec": round(args.docs / elapsed, 1),
+                "speedup": round(baseline / elapsed, 2),
+            }))
+
+
+if __name__ == "__main__":
+    main()
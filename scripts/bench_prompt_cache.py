@@ -0,0 +1,133 @@
+"""Measure prefill time saved by the stable-prefix prompt layout.
+
+Replays follow-up questions over shared context with both prompt layouts. By
+default it runs against a local stub that, like Ollama, only prefills the part
+of a prompt that differs from the previous one; pass ``--base-url`` to use a
+real Ollama instance (its ``prompt_eval_duration`` is reported instead).
+
+    PYTHONPATH=src python scripts/bench_prompt_cache.py --sessions 5 --turns 4
+    PYTHONPATH=src python scripts/bench_prompt_cache.py --base-url http://localhost:11434
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+from app.context import count_tokens
+from app.ollama import OllamaClient
+from app.prompting import DEFAULT_SYSTEM_PROMPT, build_synthesis_messages
+
+WORDS = (
+    "index vector memory crawl ollama graph retrieval latency embedding token batch shard "
+    "worker process cache prompt answer source research local model query corpus"
+).split()
+MODES = ["hybrid", "web", "offline"]
+
+
+def legacy_messages(question: str, context: str, mode: str) -> List[Dict[str, str]]:
+    """The previous layout: per-mode system suffix, question ahead of the context."""
+    return [
+        {"role": "system", "content": DEFAULT_SYSTEM_PROMPT + f"\nActive mode: {mode}."},
+        {"role": "user", "content": f"Question: {question}\n\nContext:\n{context}"},
+    ]
+
+
+def _prompt_text(messages: List[Dict[str, str]]) -> str:
+    return "".join(f"<{m['role']}>{m['content']}" for m in messages)
+
+
+def start_stub(seconds_per_token: float) -> ThreadingHTTPServer:
+    """Single-slot stand-in that charges prefill only for tokens after the cached prefix."""
+    state = {"previous": ""}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = _prompt_text(payload["messages"])
+            with lock:
+                previous = state["previous"]
+                shared = len(os.path.commonprefix([previous, prompt]))
+                state["previous"] = prompt
+                evaluated = count_tokens(prompt) - count_tokens(prompt[:shared])
+                time.sleep(evaluated * seconds_per_token)
+            body = json.dumps(
+                {
+                    "message": {"content": "ok"},
+                    "prompt_eval_count": evaluated,
+                    "prompt_eval_duration": int(evaluated * seconds_per_token * 1e9),
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _workload(sessions: int, turns: int, context_words: int) -> List[tuple[str, str, str]]:
+    rng = random.Random(0)
+    calls = []
+    for session in range(sessions):
+        context = " ".join(rng.choice(WORDS) for _ in range(context_words))
+        for turn in range(turns):
+            question = f"Follow-up {turn} in session {session}: how does {rng.choice(WORDS)} affect {rng.choice(WORDS)}?"
+            calls.append((question, context, MODES[(session + turn) % len(MODES)]))
+    return calls
+
+
+def run(
+    client: OllamaClient, layout: Callable[[str, str, str], List[Dict[str, str]]], calls: List[tuple[str, str, str]]
+) -> Dict[str, float]:
+    prefill = tokens = 0.0
+    start = time.perf_counter()
+    for question, context, mode in calls:
+        response = client.generate(layout(question, context, mode), options={"num_predict": 1})
+        prefill += response.get("prompt_eval_duration", 0) / 1e9
+        tokens += response.get("prompt_eval_count", 0)
+    return {"seconds": time.perf_counter() - start, "prefill_seconds": prefill, "prefill_tokens": tokens}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=None, help="real Ollama instance; omit to use the local stub")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--context-words", type=int, default=1500)
+    parser.add_argument("--stub-ms-per-token", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_stub(args.stub_ms_per_token / 1000)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = OllamaClient(base_url=base_url)
+    calls = _workload(args.sessions, args.turns, args.context_words)
+
+    results = {}
+    for name, layout in (("legacy", legacy_messages), ("stable_prefix", build_synthesis_messages)):
+        results[name] = run(client, layout, calls)
+        print(json.dumps({"layout": name, "requests": len(calls), **{k: round(v, 3) for k, v in results[name].items()}}))
+    saved = results["legacy"]["prefill_seconds"] - results["stable_prefix"]["prefill_seconds"]
+    share = saved / results["legacy"]["prefill_seconds"] if results["legacy"]["prefill_seconds"] else 0.0
+    print(json.dumps({"prefill_seconds_saved": round(saved, 3), "prefill_saved_pct": round(100 * share, 1)}))
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,19 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
+import threading
+import time
 import uuid
-from typing import Any, Dict, Iterable, List, Optional
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterable, List, Optional, TypeVar
 
 from app.config import settings
+from app.context import count_tokens
 from app.logging import tracer
-from app.ollama import OllamaClient, get_client
+from app.ollama import OllamaClient, get_client, node_overrides
 
 try:  # pragma: no cover - optional dependency
     from agents import Agent, ModelSettings, RunConfig, Runner
@@ -16,7 +22,20 @@ try:  # pragma: no cover - optional dependency
     from agents.models.interface import Model, ModelProvider, ModelTracing
     from agents.tool import Tool
     from agents.usage import Usage
-    from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+    from openai.types.responses import (
+        Response,
+        ResponseCompletedEvent,
+        ResponseContentPartAddedEvent,
+        ResponseContentPartDoneEvent,
+        ResponseCreatedEvent,
+        ResponseOutputItemAddedEvent,
+        ResponseOutputItemDoneEvent,
+        ResponseOutputMessage,
+        ResponseOutputText,
+        ResponseTextDeltaEvent,
+        ResponseUsage,
+    )
+    from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
 
     AGENTS_AVAILABLE = True
 except Exception:  # pragma: no cover - optional dependency
@@ -31,13 +50,34 @@ except Exception:  # pragma: no cover - optional dependency
     Usage = object  # type: ignore
     ResponseOutputMessage = None
     ResponseOutputText = None
+    Response = None
+    ResponseUsage = None
     ModelTracing = object  # type: ignore
     TResponseInputItem = Dict[str, Any]
     AGENTS_AVAILABLE = False
 
 
-def _estimate_tokens(text: str) -> int:
-    return max(1, len(text) // 4)
+def _token_counts(payload: Dict[str, Any], messages: List[Dict[str, str]], reply: str) -> tuple[int, int]:
+    """Prompt and completion tokens as reported by Ollama.
+
+    Ollama omits ``prompt_eval_count`` when the whole prompt came from its KV
+    cache, so missing counts fall back to the local estimate.
+    """
+    input_tokens = payload.get("prompt_eval_count")
+    if input_tokens is None:
+        input_tokens = sum(count_tokens(message["content"]) for message in messages)
+    output_tokens = payload.get("eval_count")
+    if output_tokens is None:
+        output_tokens = count_tokens(reply)
+    return int(input_tokens), int(output_tokens)
+
+
+def _usage_dict(usage: Any) -> Dict[str, int]:
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
 
 
 def _prepare_messages(
@@ -93,7 +133,7 @@ class OllamaAgentsModel(Model):  # type: ignore[misc]
         prompt: Any,
     ) -> ModelResponse:
         messages = _prepare_messages(system_instructions, input)
-        response_payload = await asyncio.to_thread(self._client.generate, messages, False)
+        response_payload = await self._client.agenerate(messages, **node_overrides("agents"))
         reply = response_payload.get("message", {}).get("content", "")
 
         output_text = ResponseOutputText(
@@ -108,15 +148,16 @@ class OllamaAgentsModel(Model):  # type: ignore[misc]
             type="message",
             content=[output_text],
         )
+        input_tokens, output_tokens = _token_counts(response_payload, messages, reply)
         usage = Usage(
             requests=1,
-            input_tokens=_estimate_tokens(json.dumps(messages)),
-            output_tokens=_estimate_tokens(reply),
-            total_tokens=_estimate_tokens(json.dumps(messages)) + _estimate_tokens(reply),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
         )
         return ModelResponse(output=[output_message], usage=usage, response_id=None)
 
-    def stream_response(  # pragma: no cover - streaming pending
+    async def stream_response(
         self,
         system_instructions: str | None,
         input: str | List[TResponseInputItem],
@@ -129,8 +170,81 @@ class OllamaAgentsModel(Model):  # type: ignore[misc]
         previous_response_id: str | None,
         conversation_id: str | None,
         prompt: Any,
-    ):
-        raise NotImplementedError("Streaming not yet supported for Ollama agents.")
+    ) -> AsyncIterator[Any]:
+        """Stream Ollama chunks as Responses-API events, mirroring the SDK's chat-completions handler."""
+        messages = _prepare_messages(system_instructions, input)
+        overrides = node_overrides("agents")
+        sequence = itertools.count()
+        item_id = f"ollama-{uuid.uuid4().hex}"
+        response = Response(
+            id=item_id,
+            created_at=time.time(),
+            model=overrides.get("model") or self._client.model,
+            object="response",
+            output=[],
+            tool_choice="auto",
+            top_p=model_settings.top_p,
+            temperature=model_settings.temperature,
+            tools=[],
+            parallel_tool_calls=False,
+        )
+        yield ResponseCreatedEvent(response=response, type="response.created", sequence_number=next(sequence))
+
+        part = ResponseOutputText(text="", type="output_text", annotations=[])
+        message = ResponseOutputMessage(id=item_id, content=[], role="assistant", type="message", status="in_progress")
+        yield ResponseOutputItemAddedEvent(
+            item=message, output_index=0, type="response.output_item.added", sequence_number=next(sequence)
+        )
+        yield ResponseContentPartAddedEvent(
+            content_index=0,
+            item_id=item_id,
+            output_index=0,
+            part=part,
+            type="response.content_part.added",
+            sequence_number=next(sequence),
+        )
+
+        final: Dict[str, Any] = {}
+        async for chunk in self._client.astream(messages, **overrides):
+            delta = chunk.get("message", {}).get("content", "")
+            if delta:
+                part.text += delta
+                yield ResponseTextDeltaEvent(
+                    content_index=0,
+                    delta=delta,
+                    item_id=item_id,
+                    output_index=0,
+                    type="response.output_text.delta",
+                    sequence_number=next(sequence),
+                    logprobs=[],
+                )
+            if chunk.get("done"):
+                final = chunk
+
+        yield ResponseContentPartDoneEvent(
+            content_index=0,
+            item_id=item_id,
+            output_index=0,
+            part=part,
+            type="response.content_part.done",
+            sequence_number=next(sequence),
+        )
+        message = ResponseOutputMessage(id=item_id, content=[part], role="assistant", type="message", status="completed")
+        yield ResponseOutputItemDoneEvent(
+            item=message, output_index=0, type="response.output_item.done", sequence_number=next(sequence)
+        )
+
+        input_tokens, output_tokens = _token_counts(final, messages, part.text)
+        completed = response.model_copy()
+        completed.output = [message]
+        completed.usage = ResponseUsage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            input_tokens_details=InputTokensDetails(cached_tokens=0),
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+        )
+        yield ResponseCompletedEvent(response=completed, type="response.completed", sequence_number=next(sequence))
 
 
 class OllamaModelProvider(ModelProvider):  # type: ignore[misc]
@@ -146,10 +260,10 @@ class OllamaModelProvider(ModelProvider):  # type: ignore[misc]
 class OllamaAgentsAdapter:
     """High-level helper that exposes openai-agents with Ollama responses."""
 
-    def __init__(self, instructions: Optional[str] = None) -> None:
+    def __init__(self, instructions: Optional[str] = None, provider: Optional[ModelProvider] = None) -> None:
         if not AGENTS_AVAILABLE:
             raise RuntimeError("openai-agents is not installed. Run `pip install openai-agents`.")
-        self._provider = OllamaModelProvider()
+        self._provider = provider or OllamaModelProvider()
         self._agent = Agent(
             name="ollama-agent",
             instructions=instructions
@@ -160,26 +274,72 @@ class OllamaAgentsAdapter:
         self._run_config = RunConfig(model_provider=self._provider, model="ollama")
 
     def run(self, prompt: str) -> Dict[str, Any]:
-        """Execute the configured agent synchronously and return structured output."""
+        """Execute the agent from synchronous code on the shared background event loop."""
+        return get_event_loop_thread().run(self.arun(prompt))
+
+    async def arun(self, prompt: str) -> Dict[str, Any]:
+        """Execute the agent on the caller's event loop and return structured output."""
         with tracer.span(component="agents", mode="ollama") as span_id:
-            result = Runner.run_sync(self._agent, prompt, run_config=self._run_config)
+            result = await Runner.run(self._agent, prompt, run_config=self._run_config)
             reply = result.final_output if isinstance(result.final_output, str) else str(result.final_output)
             tracer.append(span_id, {"event": "agents_result", "reply_length": len(reply)})
         return {
             "reply": reply,
+            "usage": _usage_dict(result.context_wrapper.usage),
             "raw_items": [
                 item.raw_item.model_dump(exclude_none=True) if hasattr(item.raw_item, "model_dump") else item.raw_item
                 for item in result.new_items
             ],
         }
 
+    async def stream(self, prompt: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the agent with streaming, yielding ``delta`` events and a final ``done`` event with usage."""
+        with tracer.span(component="agents", mode="ollama-stream") as span_id:
+            result = Runner.run_streamed(self._agent, prompt, run_config=self._run_config)
+            async for event in result.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    yield {"type": "delta", "text": event.data.delta}
+            reply = result.final_output if isinstance(result.final_output, str) else str(result.final_output)
+            usage = _usage_dict(result.context_wrapper.usage)
+            tracer.append(span_id, {"event": "agents_result", "reply_length": len(reply), **usage})
+        yield {"type": "done", "reply": reply, "usage": usage}
+
     @property
     def external_enabled(self) -> bool:
         return True
 
 
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """One event loop running forever in a daemon thread.
+
+    Synchronous callers submit coroutines here instead of paying for a fresh
+    loop (and fresh async HTTP connections) on every ``Runner.run_sync``.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="agents-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self.submit(coro).result()
+
+
+@lru_cache(maxsize=1)
+def get_event_loop_thread() -> EventLoopThread:
+    return EventLoopThread()
+
+
+@lru_cache(maxsize=1)
 def get_agents_adapter() -> OllamaAgentsAdapter:
+    """Process-wide adapter: the Agent, provider and Ollama HTTP pools are built once and reused."""
     return OllamaAgentsAdapter()
 
 
-__all__ = ["OllamaAgentsAdapter", "get_agents_adapter", "AGENTS_AVAILABLE"]
+__all__ = ["OllamaAgentsAdapter", "EventLoopThread", "get_agents_adapter", "get_event_loop_thread", "AGENTS_AVAILABLE"]
@@ -0,0 +1,25 @@
+"""Optional imports from vendored submodules under ``src_ext/``."""
+from __future__ import annotations
+
+import importlib
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=None)
+def import_external(relative_path: str, module: str) -> bool:
+    """Import ``module`` from ``relative_path`` once per process, adding the path to ``sys.path`` at most once."""
+    ext_path = Path(relative_path).resolve()
+    if not ext_path.exists():
+        return False
+    if str(ext_path) not in sys.path:
+        sys.path.insert(0, str(ext_path))
+    try:
+        importlib.import_module(module)
+        return True
+    except Exception:
+        return False
+
+
+__all__ = ["import_external"]
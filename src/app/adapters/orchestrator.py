@@ -1,13 +1,14 @@
 """Orchestration adapter with optional LangGraph integration."""
 from __future__ import annotations
 
-import importlib
-import sys
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Any, Callable, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from app import graphs, memory
+from app import graphs, memory, rag
+from app.admission import AdmissionError
+from app.adapters.external import import_external
 from app.config import settings
 from app.logging import tracer
 from app.prompting import build_messages
@@ -16,6 +17,15 @@ from app.ollama import get_client
 GraphCallable = Callable[[dict], dict]
 
 
+MEMORY_K = graphs.MEMORY_K
+LOCAL_MODES = {"offline", "hybrid"}
+
+
+def _clean_mode(mode: str | None) -> str:
+    cleaned = (mode or settings.mode).lower()
+    return cleaned if cleaned in {"offline", "web", "hybrid"} else settings.mode_normalized
+
+
 class AbstractOrchestrator(ABC):
     @abstractmethod
     def build_graph(self) -> GraphCallable: ...
@@ -30,29 +40,26 @@ class LangGraphAdapter(AbstractOrchestrator):
         self._external_available = self._attempt_import()
 
     def _attempt_import(self) -> bool:
-        ext_path = Path("src_ext/langgraph").resolve()
-        if ext_path.exists():
-            sys.path.insert(0, str(ext_path))
-            try:
-                importlib.import_module("langgraph")  # noqa: F401
-                return True
-            except Exception:
-                return False
-        return False
+        return import_external("src_ext/langgraph", "langgraph")
 
     def build_graph(self) -> GraphCallable:
         if self._graph is None:
             self._graph = graphs.build_default_graph()
         return self._graph
 
-    def run(self, query: str, mode: str = "hybrid") -> Dict[str, Any]:
-        cleaned_mode = (mode or settings.mode).lower()
-        if cleaned_mode not in {"offline", "web", "hybrid"}:
-            cleaned_mode = settings.mode_normalized
+    def run(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        memory_hits: Optional[List[Dict[str, Any]]] = None,
+        retrieved: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Run the graph for one query; ``memory_hits``/``retrieved`` skip lookups already done in bulk."""
+        cleaned_mode = _clean_mode(mode)
         graph_callable = self.build_graph()
-        messages = build_messages(query, cleaned_mode)
+        messages = build_messages(query)
         client = get_client()
-        episodic_hits = memory.search_memory(query, k=3)
+        episodic_hits = memory_hits if memory_hits is not None else memory.search_memory(query, k=MEMORY_K)
         with tracer.span(component="orchestrator", mode=cleaned_mode) as trace_id:
             state = {
                 "messages": messages,
@@ -62,10 +69,13 @@ class LangGraphAdapter(AbstractOrchestrator):
                 "trace_id": trace_id,
                 "memory_hits": episodic_hits,
             }
+            if retrieved is not None:
+                state["prefetched_chunks"] = retrieved
             result = graph_callable(state)
             tracer.append(trace_id, {"event": "result", "meta": result.get("meta", {})})
         # enrich meta with episodic info
         result.setdefault("meta", {})
+        result["meta"]["trace_id"] = trace_id
         result["meta"]["memory_hits"] = len(episodic_hits)
         if episodic_hits:
             result["meta"]["memory"] = [
@@ -86,6 +96,45 @@ class LangGraphAdapter(AbstractOrchestrator):
             )
         return result
 
+    def run_batch(
+        self, items: Sequence[Tuple[str, str]], concurrency: int = 4
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Run many ``(query, mode)`` pairs, yielding ``(index, result)`` as each finishes.
+
+        Memory and local-index lookups for the whole batch are done up front
+        with one encoder pass each; graph runs then proceed concurrently (LLM
+        calls are still bounded by admission control). A failed item yields
+        ``{"error": ...}`` instead of aborting the batch.
+        """
+        queries = [query for query, _ in items]
+        modes = [_clean_mode(mode) for _, mode in items]
+        memory_hits = memory.search_memory_batch(queries, k=MEMORY_K)
+        local = [i for i, mode in enumerate(modes) if mode in LOCAL_MODES]
+        retrieved: Dict[int, List[Dict[str, Any]]] = {}
+        if local:
+            try:
+                batches = rag.query_index_batch([queries[i] for i in local], k=graphs.retrieval_fetch_k())
+                retrieved = dict(zip(local, batches))
+            except Exception:
+                retrieved = {}
+
+        def run_one(i: int) -> Dict[str, Any]:
+            try:
+                return self.run(queries[i], modes[i], memory_hits=memory_hits[i], retrieved=retrieved.get(i))
+            except AdmissionError as exc:
+                return {"error": str(exc), "status": exc.status_code}
+            except Exception as exc:
+                return {"error": str(exc)}
+
+        pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="chat-batch")
+        try:
+            futures = {pool.submit(copy_context().run, run_one, i): i for i in range(len(items))}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # A consumer that stops early (client disconnect) drops the items that have not started.
+            pool.shutdown(wait=False, cancel_futures=True)
+
     @property
     def external_enabled(self) -> bool:
         return self._external_available
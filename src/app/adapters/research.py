@@ -1,13 +1,11 @@
 """Deep research adapter with optional DeerFlow integration."""
 from __future__ import annotations
 
-import importlib
-import sys
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
 
-from app import tools_web
+from app import admission, summarize, tools_web
+from app.adapters.external import import_external
 from app.ollama import get_client
 from app.prompting import build_messages
 from app.config import settings
@@ -26,21 +24,16 @@ class AbstractResearch(ABC):
     @abstractmethod
     def synthesize(self, pages: List[Dict]) -> Dict[str, str]: ...
 
+    @abstractmethod
+    def research(self, query: str, depth: int = 1, max_results: int = 5) -> Dict[str, Any]: ...
+
 
 class DeerFlowAdapter(AbstractResearch):
     def __init__(self) -> None:
         self._external_available = self._attempt_import()
 
     def _attempt_import(self) -> bool:
-        ext_path = Path("src_ext/deer-flow").resolve()
-        if ext_path.exists():
-            sys.path.insert(0, str(ext_path))
-            try:
-                importlib.import_module("deerflow")  # type: ignore  # noqa: F401
-                return True
-            except Exception:
-                return False
-        return False
+        return import_external("src_ext/deer-flow", "deerflow")
 
     def plan(self, query: str) -> List[str]:
         if not settings.enable_web:
@@ -57,16 +50,27 @@ class DeerFlowAdapter(AbstractResearch):
 
     def synthesize(self, pages: List[Dict]) -> Dict[str, str]:
         if not pages:
-            return {"summary": "No web pages retrieved.", "sources": []}
+            return {"summary": summarize.NO_PAGES_SUMMARY, "sources": []}
         client = get_client()
-        content = "\n\n".join(f"Source: {page.get('url')}\n{page.get('text', '')[:800]}" for page in pages)
-        messages = [
-            {"role": "system", "content": "Summarize the findings with citations."},
-            {"role": "user", "content": content},
+        if summarize.needs_map_reduce(pages):
+            return summarize.map_reduce_summarize(client, pages)
+        return summarize.single_pass_summarize(client, pages)
+
+    def research(self, query: str, depth: int = 1, max_results: int = 5) -> Dict[str, Any]:
+        """Run every plan seed through search and crawl concurrently, then synthesize once.
+
+        Search results are merged by URL and each seed's URLs are crawled in
+        parallel against one shared ``max_results`` page budget.
+        """
+        plan = self.plan(query) or [query]
+        search_results = tools_web.multi_search(plan, max_results=max_results)
+        url_groups = [
+            [item["href"] for item in search_results if item.get("seed") == seed and item.get("href")] for seed in plan
         ]
-        response = client.generate(messages, stream=False)
-        reply = response.get("message", {}).get("content", "")
-        return {"summary": reply, "sources": [page.get("url") for page in pages]}
+        pages = tools_web.crawl_many(url_groups, depth=depth, max_pages=max_results)
+        with admission.priority("research"):
+            synthesis = self.synthesize(pages)
+        return {"plan": plan, "search_results": search_results, "pages": pages, "synthesis": synthesis}
 
     @property
     def external_enabled(self) -> bool:
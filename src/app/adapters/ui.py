@@ -1,13 +1,11 @@
 """UI adapter exposing CopilotKit-inspired capabilities."""
 from __future__ import annotations
 
-import importlib
 import json
-import sys
 from abc import ABC, abstractmethod
-from pathlib import Path
 from typing import Any, Dict
 
+from app.adapters.external import import_external
 from app.config import settings
 
 
@@ -21,15 +19,7 @@ class CopilotKitAdapter(AbstractUIBridge):
         self._external_available = self._attempt_import()
 
     def _attempt_import(self) -> bool:
-        ext_path = Path("src_ext/copilotkit").resolve()
-        if ext_path.exists():
-            sys.path.insert(0, str(ext_path))
-            try:
-                importlib.import_module("packages")  # noqa: F401
-                return True
-            except Exception:
-                return False
-        return False
+        return import_external("src_ext/copilotkit", "packages")
 
     def render_chat_panel(self) -> Dict[str, Any]:
         base_config = {
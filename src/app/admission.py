@@ -0,0 +1,177 @@
+"""Admission control for Ollama calls: bounded concurrency, priorities and backpressure."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from .backends import get_pool
+from .config import settings
+
+PRIORITIES = {"interactive": 0, "research": 1, "reflection": 2, "background": 3}
+
+_current_priority: ContextVar[str] = ContextVar("ollama_priority", default="interactive")
+
+
+class AdmissionError(RuntimeError):
+    """Raised when an Ollama call is not admitted; ``status_code`` is the HTTP status to return."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionError):
+    status_code = 429
+
+
+class QueueTimeoutError(AdmissionError):
+    status_code = 503
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the enclosed Ollama calls at ``name`` priority (see ``PRIORITIES``)."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {name}")
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    queue_time_total: float = 0.0
+    queue_time_max: float = 0.0
+
+
+class AdmissionController:
+    """Semaphore with a priority-ordered wait queue.
+
+    At most ``limit`` calls run at once. Waiters are admitted by priority, then
+    arrival order. Requests are rejected immediately when ``max_queue`` callers
+    are already waiting, and give up after ``timeout`` seconds in the queue.
+    """
+
+    def __init__(self, limit: int, max_queue: int, timeout: float) -> None:
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.stats = AdmissionStats()
+        self._cond = threading.Condition()
+        self._waiters: List[List[Any]] = []
+        self._sequence = itertools.count()
+
+    def acquire(self, name: Optional[str] = None) -> float:
+        """Block until admitted and return the time spent queued, in seconds."""
+        rank = PRIORITIES.get(name or current_priority(), 0)
+        start = time.perf_counter()
+        with self._cond:
+            if self.stats.in_flight < self.limit and not self._waiters:
+                self.stats.in_flight += 1
+                self.stats.admitted += 1
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                self.stats.rejected += 1
+                raise QueueFullError("Ollama queue is full")
+
+            entry = [rank, next(self._sequence)]
+            heapq.heappush(self._waiters, entry)
+            self.stats.queued = len(self._waiters)
+            deadline = start + self.timeout
+            while not (self._waiters[0] is entry and self.stats.in_flight < self.limit):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self.stats.queued = len(self._waiters)
+                    self.stats.timed_out += 1
+                    self._cond.notify_all()
+                    raise QueueTimeoutError(f"Timed out after {self.timeout:.1f}s waiting for Ollama")
+                self._cond.wait(remaining)
+            heapq.heappop(self._waiters)
+            self.stats.queued = len(self._waiters)
+            self.stats.in_flight += 1
+            self.stats.admitted += 1
+            waited = time.perf_counter() - start
+            self.stats.queue_time_total += waited
+            self.stats.queue_time_max = max(self.stats.queue_time_max, waited)
+            self._cond.notify_all()
+            return waited
+
+    def release(self) -> None:
+        with self._cond:
+            self.stats.in_flight = max(0, self.stats.in_flight - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, name: Optional[str] = None) -> Iterator[float]:
+        waited = self.acquire(name)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            data = asdict(self.stats)
+        data["limit"] = self.limit
+        data["max_queue"] = self.max_queue
+        data["queue_time_avg"] = data["queue_time_total"] / data["admitted"] if data["admitted"] else 0.0
+        return data
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> AdmissionController:
+    """Process-wide controller shared by every ``OllamaClient``.
+
+    ``OLLAMA_MAX_CONCURRENCY`` is per backend, so capacity grows with the pool.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            limit = settings.ollama_max_concurrency * len(get_pool().backends)
+            _controller = AdmissionController(limit, settings.ollama_max_queue, settings.ollama_queue_timeout)
+        return _controller
+
+
+def set_controller(controller: Optional[AdmissionController]) -> None:
+    """Swap the shared controller (``None`` rebuilds it from settings on next use)."""
+    global _controller
+    with _controller_lock:
+        _controller = controller
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionError",
+    "AdmissionStats",
+    "QueueFullError",
+    "QueueTimeoutError",
+    "PRIORITIES",
+    "current_priority",
+    "get_controller",
+    "priority",
+    "set_controller",
+]
@@ -0,0 +1,192 @@
+"""Pool of Ollama backends with load balancing, health checks and circuit breaking."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+import httpx
+
+from .config import settings
+
+STRATEGIES = {"least_outstanding", "latency"}
+AFFINITY_SLACK = 1
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class Backend:
+    url: str
+    outstanding: int = 0
+    latency: float = 0.0
+    failures: int = 0
+    open_until: float = 0.0
+    requests: int = 0
+    models: set[str] = field(default_factory=set)
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+
+class BackendPool:
+    """Chooses an Ollama instance per call.
+
+    ``least_outstanding`` picks the backend with the fewest in-flight calls;
+    ``latency`` weights that by the backend's moving-average latency. Backends
+    that already have the requested model loaded are preferred unless they are
+    more than ``AFFINITY_SLACK`` calls busier than the idlest one, which keeps
+    models warm without starving other instances. ``failure_threshold``
+    consecutive failures open a backend's circuit for ``cooldown`` seconds.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one Ollama backend URL is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy: {strategy}")
+        self.backends = [Backend(url.rstrip("/")) for url in dict.fromkeys(urls)]
+        self.strategy = strategy
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def _load(self, backend: Backend) -> float:
+        if self.strategy == "latency":
+            return (backend.outstanding + 1) * (backend.latency or 0.001)
+        return backend.outstanding + backend.latency * 1e-3
+
+    def acquire(self, model: str, exclude: Collection[str] = ()) -> Optional[Backend]:
+        """Reserve the best backend for ``model``; None when every backend is excluded."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b.url not in exclude]
+            closed = [b for b in candidates if not b.is_open(now)]
+            # With every circuit open, fail open rather than refusing all traffic.
+            candidates = closed or candidates
+            if not candidates:
+                return None
+            least_busy = min(b.outstanding for b in candidates)
+            warm = [b for b in candidates if model in b.models and b.outstanding <= least_busy + AFFINITY_SLACK]
+            backend = min(warm or candidates, key=self._load)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: Backend, model: Optional[str] = None, latency: Optional[float] = None) -> None:
+        """Return a successful call's slot, recording latency and that ``model`` is now loaded there."""
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            backend.failures = 0
+            backend.open_until = 0.0
+            if latency is not None:
+                backend.latency = latency if not backend.latency else (
+                    EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * backend.latency
+                )
+            if model:
+                backend.models.add(model)
+
+    def fail(self, backend: Backend) -> None:
+        """Return a failed call's slot and open the circuit after repeated failures."""
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            self._record_failure(backend)
+
+    def _record_failure(self, backend: Backend) -> None:
+        backend.failures += 1
+        if backend.failures >= self.failure_threshold:
+            backend.open_until = time.monotonic() + self.cooldown
+            backend.models.clear()
+
+    def check_health(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """Probe ``/api/ps`` on every backend, refreshing loaded models and circuit state."""
+        status: Dict[str, bool] = {}
+        with httpx.Client(timeout=timeout) as client:
+            for backend in self.backends:
+                try:
+                    response = client.get(f"{backend.url}/api/ps")
+                    response.raise_for_status()
+                    loaded = {item.get("name") or item.get("model") for item in response.json().get("models", [])}
+                except (httpx.HTTPError, ValueError):
+                    with self._lock:
+                        self._record_failure(backend)
+                    status[backend.url] = False
+                    continue
+                with self._lock:
+                    backend.failures = 0
+                    backend.open_until = 0.0
+                    backend.models = {name for name in loaded if name}
+                status[backend.url] = True
+        return status
+
+    def start_health_checks(self, interval: float) -> Optional[threading.Thread]:
+        """Run ``check_health`` every ``interval`` seconds in a daemon thread (once per pool)."""
+        if interval <= 0 or self._health_thread is not None:
+            return self._health_thread
+
+        def loop() -> None:
+            while True:
+                try:
+                    self.check_health()
+                except Exception:
+                    pass
+                time.sleep(interval)
+
+        self._health_thread = threading.Thread(target=loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+        return self._health_thread
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": b.url,
+                    "outstanding": b.outstanding,
+                    "requests": b.requests,
+                    "latency": round(b.latency, 4),
+                    "circuit_open": b.is_open(now),
+                    "models": sorted(b.models),
+                }
+                for b in self.backends
+            ]
+
+
+def configured_urls() -> List[str]:
+    urls = [url.strip() for url in settings.ollama_base_urls.split(",") if url.strip()]
+    return urls or [settings.ollama_base_url]
+
+
+_pool: Optional[BackendPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BackendPool:
+    """Process-wide pool built from ``OLLAMA_BASE_URLS`` (falling back to ``OLLAMA_BASE_URL``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BackendPool(
+                configured_urls(),
+                strategy=settings.ollama_balance,
+                failure_threshold=settings.ollama_failure_threshold,
+                cooldown=settings.ollama_circuit_cooldown,
+            )
+        return _pool
+
+
+def set_pool(pool: Optional[BackendPool]) -> None:
+    """Swap the shared pool (``None`` rebuilds it from settings on next use)."""
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+__all__ = ["Backend", "BackendPool", "configured_urls", "get_pool", "set_pool"]
@@ -0,0 +1,69 @@
+"""Small persistent key/value cache on top of SQLite."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from .config import settings
+
+
+class SqliteCache:
+    """JSON values keyed by string within a namespace, with their age on read.
+
+    Expiry policy is left to callers (they get the entry age back), which lets
+    the same store serve hard TTLs and stale-while-revalidate reads. ``clock``
+    supplies the timestamps used for storing and ageing entries.
+    """
+
+    def __init__(self, namespace: str, path: Path | None = None, clock: Callable[[], float] = time.time) -> None:
+        self.namespace = namespace
+        self.clock = clock
+        self.path = Path(path or Path(settings.cache_dir) / "cache.sqlite")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, age_seconds)`` or None when the key is missing."""
+        row = self._connect().execute(
+            "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), self.clock() - row[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, ensure_ascii=False), self.clock()),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+
+__all__ = ["SqliteCache"]
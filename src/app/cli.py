@@ -2,21 +2,52 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import typer
 from rich import print
 
-from app import memory, rag, reflection
+from app import consolidation, evaluation, memory, rag, reflection
 from app.adapters import AGENTS_AVAILABLE, get_agents_adapter, get_orchestrator, get_research_adapter
 from app.config import settings
 
 app = typer.Typer(name="lam-agent-unified")
 
+INPUT_HELP = "JSONL file with one request per line (a string or an object); prints one JSON result per line"
+
+
+def _read_jsonl(path: Path, field: str) -> List[Dict[str, Any]]:
+    """Parse ``path`` into request dicts; bare strings become ``{field: line}``."""
+    items = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        items.append(item if isinstance(item, dict) else {field: str(item)})
+    return items
+
+
+def _require_input(value: Optional[str], input: Optional[Path], name: str) -> None:
+    if value is None and input is None:
+        raise typer.BadParameter(f"Pass {name} or --input")
+
 
 @app.command()
-def chat(message: str, mode: str = typer.Option("hybrid", help="offline|web|hybrid")) -> None:
+def chat(
+    message: Optional[str] = typer.Argument(None),
+    mode: str = typer.Option("hybrid", help="offline|web|hybrid"),
+    input: Optional[Path] = typer.Option(None, exists=True, dir_okay=False, help=INPUT_HELP),
+    concurrency: int = typer.Option(4, min=1, max=32, help="Parallel requests with --input"),
+) -> None:
+    _require_input(message, input, "MESSAGE")
     orchestrator = get_orchestrator()
+    if input is not None:
+        items = [(item["message"], item.get("mode", mode)) for item in _read_jsonl(input, "message")]
+        for index, result in orchestrator.run_batch(items, concurrency=concurrency):
+            typer.echo(json.dumps({"index": index, **result}, ensure_ascii=False, default=str))
+        return
     result = orchestrator.run(message, mode=mode)
     print(result["reply"])
     if result.get("sources"):
@@ -24,13 +55,29 @@ def chat(message: str, mode: str = typer.Option("hybrid", help="offline|web|hybr
 
 
 @app.command("rag-index")
-def rag_index(dir: Path = typer.Option(settings.docs_dir, exists=True)) -> None:
-    stats = rag.build_index(dir)
-    print(f"Indexed {stats.documents_indexed} documents (dim={stats.dim}).")
+def rag_index(
+    dir: Path = typer.Option(settings.docs_dir, exists=True),
+    workers: int = typer.Option(settings.index_workers, min=1, help="Embedding worker processes"),
+) -> None:
+    stats = rag.build_index(dir, workers=workers)
+    print(
+        f"Indexed {stats.documents_indexed} documents as {stats.chunks_indexed} chunks (dim={stats.dim}, "
+        f"{stats.duplicates_skipped} near-duplicate chunks skipped)."
+    )
 
 
 @app.command("rag-query")
-def rag_query(question: str, k: int = typer.Option(4, min=1, max=10)) -> None:
+def rag_query(
+    question: Optional[str] = typer.Argument(None),
+    k: int = typer.Option(4, min=1, max=10),
+    input: Optional[Path] = typer.Option(None, exists=True, dir_okay=False, help=INPUT_HELP),
+) -> None:
+    _require_input(question, input, "QUESTION")
+    if input is not None:
+        questions = [item["question"] for item in _read_jsonl(input, "question")]
+        for results in rag.query_index_batch(questions, k=k):
+            typer.echo(json.dumps(results, ensure_ascii=False))
+        return
     results = rag.query_index(question, k=k)
     print(json.dumps(results, indent=2))
 
@@ -38,13 +85,34 @@ def rag_query(question: str, k: int = typer.Option(4, min=1, max=10)) -> None:
 @app.command()
 def research(query: str, depth: int = typer.Option(1, min=0, max=3), max_results: int = typer.Option(5, min=1, max=10)) -> None:
     adapter = get_research_adapter()
-    plan = adapter.plan(query)
-    print("Plan:", plan)
-    search_results = adapter.search(query, k=max_results)
-    urls = [item.get("href") for item in search_results if item.get("href")]
-    pages = adapter.crawl(urls, depth=depth, max_pages=max_results)
-    synthesis = adapter.synthesize(pages)
-    print(json.dumps({"synthesis": synthesis, "pages": pages}, indent=2))
+    result = adapter.research(query, depth=depth, max_results=max_results)
+    print("Plan:", result["plan"])
+    print(json.dumps({"synthesis": result["synthesis"], "pages": result["pages"]}, indent=2))
+
+
+@app.command("eval")
+def eval_workload(
+    input: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSONL workload to replay"),
+    output: Optional[Path] = typer.Option(None, help="Results file (default: data/eval/<timestamp>.json)"),
+    modes: Optional[str] = typer.Option(None, help="Comma-separated modes to replay every request in"),
+    phases: str = typer.Option("cold,warm", help="cold clears caches first; warm replays on top"),
+    concurrency: int = typer.Option(1, min=1, max=64),
+    limit: Optional[int] = typer.Option(None, min=1, help="Replay only the first N requests"),
+    isolate_memory: bool = typer.Option(True, help="Record replayed episodes into a throwaway copy of memory"),
+) -> None:
+    requests = evaluation.load_requests(input, limit=limit)
+    report = evaluation.run_evaluation(
+        requests,
+        get_orchestrator(),
+        modes=[m.strip() for m in modes.split(",") if m.strip()] if modes else None,
+        phases=[p.strip() for p in phases.split(",") if p.strip()],
+        concurrency=concurrency,
+        isolate_memory=isolate_memory,
+    )
+    output = output or Path("data/eval") / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    evaluation.write_report(report, output)
+    print(json.dumps(report["summary"], indent=2))
+    print(f"Results written to {output}")
 
 
 @app.command("print-config")
@@ -54,21 +122,52 @@ def print_config() -> None:
 
 
 @app.command("memory-search")
-def memory_search(query: str, k: int = typer.Option(3, min=1, max=10)) -> None:
-    hits = memory.search_memory(query, k=k)
+def memory_search(
+    query: Optional[str] = typer.Argument(None),
+    k: int = typer.Option(3, min=1, max=10),
+    mode: Optional[str] = typer.Option(None, help="Only episodes answered in this mode"),
+    max_age: Optional[float] = typer.Option(None, min=0, help="Only episodes newer than this many seconds"),
+    input: Optional[Path] = typer.Option(None, exists=True, dir_okay=False, help=INPUT_HELP),
+) -> None:
+    _require_input(query, input, "QUERY")
+    if input is not None:
+        queries = [item["query"] for item in _read_jsonl(input, "query")]
+        for hits in memory.search_memory_batch(queries, k=k, mode=mode, max_age=max_age):
+            typer.echo(json.dumps(hits, ensure_ascii=False))
+        return
+    hits = memory.search_memory(query, k=k, mode=mode, max_age=max_age)
     print(json.dumps(hits, indent=2, ensure_ascii=False))
 
 
 @app.command("memory-list")
-def memory_list(limit: int = typer.Option(5, min=1, max=50)) -> None:
-    episodes = memory.load_recent(limit)
+def memory_list(
+    limit: int = typer.Option(5, min=1, max=50),
+    cursor: Optional[int] = typer.Option(None, min=0, help="Cursor printed by the previous page"),
+) -> None:
+    episodes, next_cursor = memory.load_page(limit, cursor=cursor)
     print(json.dumps(episodes, indent=2, ensure_ascii=False))
+    if next_cursor is not None:
+        print(f"Older episodes: --cursor {next_cursor}")
+
+
+@app.command("memory-consolidate")
+def memory_consolidate(
+    similarity: Optional[float] = typer.Option(None, min=0, max=1, help="Merge episodes at least this similar"),
+    max_age: Optional[float] = typer.Option(None, min=0, help="Drop episodes older than this many seconds (0 = keep)"),
+    max_episodes: Optional[int] = typer.Option(None, min=0, help="Keep at most this many episodes (0 = no cap)"),
+    dry_run: bool = typer.Option(False, help="Report what would change without rewriting the store"),
+) -> None:
+    report = consolidation.consolidate(similarity=similarity, max_age=max_age, max_episodes=max_episodes, dry_run=dry_run)
+    print(json.dumps(report.to_dict(), indent=2))
 
 
 @app.command("reflect")
-def reflect(limit: int = typer.Option(5, min=1, max=20)) -> None:
+def reflect(
+    limit: int = typer.Option(5, min=1, max=20),
+    all: bool = typer.Option(False, "--all", help="Reflect on the newest episodes even if already covered"),
+) -> None:
     try:
-        record = reflection.run_reflection(limit=limit)
+        record = reflection.run_reflection(limit=limit, incremental=not all)
     except RuntimeError as exc:
         typer.echo(f"[reflection] {exc}")
         raise typer.Exit(code=1)
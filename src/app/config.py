@@ -4,7 +4,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,20 +16,73 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
     ollama_base_url: str = Field(default="http://localhost:11434", alias="OLLAMA_BASE_URL")
+    ollama_base_urls: str = Field(default="", alias="OLLAMA_BASE_URLS")
+    ollama_balance: str = Field(default="least_outstanding", alias="OLLAMA_BALANCE")
+    ollama_failure_threshold: int = Field(default=3, alias="OLLAMA_FAILURE_THRESHOLD")
+    ollama_circuit_cooldown: float = Field(default=30.0, alias="OLLAMA_CIRCUIT_COOLDOWN")
+    ollama_health_interval: float = Field(default=15.0, alias="OLLAMA_HEALTH_INTERVAL")
     ollama_model: str = Field(default="llama3:8b", alias="OLLAMA_MODEL")
     temperature: float = Field(default=0.2, alias="TEMPERATURE")
     num_ctx: int = Field(default=4096, alias="NUM_CTX")
+    context_reserve_tokens: int = Field(default=768, alias="CONTEXT_RESERVE_TOKENS")
+    ollama_keep_alive: str = Field(default="30m", alias="OLLAMA_KEEP_ALIVE")
+    ollama_num_predict: Optional[int] = Field(default=None, alias="OLLAMA_NUM_PREDICT")
+    ollama_num_thread: Optional[int] = Field(default=None, alias="OLLAMA_NUM_THREAD")
+    ollama_num_batch: Optional[int] = Field(default=None, alias="OLLAMA_NUM_BATCH")
+    ollama_node_models: Dict[str, str] = Field(default_factory=dict, alias="OLLAMA_NODE_MODELS")
+    ollama_node_options: Dict[str, Dict[str, Any]] = Field(default_factory=dict, alias="OLLAMA_NODE_OPTIONS")
+    ollama_max_concurrency: int = Field(default=2, alias="OLLAMA_MAX_CONCURRENCY")
+    ollama_max_queue: int = Field(default=16, alias="OLLAMA_MAX_QUEUE")
+    ollama_queue_timeout: float = Field(default=30.0, alias="OLLAMA_QUEUE_TIMEOUT")
+
+    embed_backend: str = Field(default="torch", alias="EMBED_BACKEND")
+    embed_onnx_file: str = Field(default="onnx/model.onnx", alias="EMBED_ONNX_FILE")
+    index_workers: int = Field(default=1, alias="INDEX_WORKERS")
+    index_batch_size: int = Field(default=64, alias="INDEX_BATCH_SIZE")
+    extract_workers: int = Field(default=1, alias="EXTRACT_WORKERS")
+    chunk_size: int = Field(default=1000, alias="CHUNK_SIZE")
+    chunk_overlap: int = Field(default=200, alias="CHUNK_OVERLAP")
+    rag_dedupe: bool = Field(default=True, alias="RAG_DEDUPE")
+    rag_hybrid: bool = Field(default=True, alias="RAG_HYBRID")
+    rag_candidates: int = Field(default=20, alias="RAG_CANDIDATES")
+    rrf_k: int = Field(default=60, alias="RRF_K")
+    retrieval_k: int = Field(default=4, alias="RETRIEVAL_K")
+    rerank_enabled: bool = Field(default=False, alias="RERANK_ENABLED")
+    rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2", alias="RERANK_MODEL")
+    rerank_candidates: int = Field(default=16, alias="RERANK_CANDIDATES")
+    rerank_batch_size: int = Field(default=4, alias="RERANK_BATCH_SIZE")
+    rerank_budget_ms: float = Field(default=250.0, alias="RERANK_BUDGET_MS")
+    rerank_cache_size: int = Field(default=4096, alias="RERANK_CACHE_SIZE")
 
     trace_dir: Path = Field(default=Path("data/traces"), alias="TRACE_DIR")
     docs_dir: Path = Field(default=Path("data/docs"), alias="DOCS_DIR")
     memory_dir: Path = Field(default=Path("data/memory"), alias="MEMORY_DIR")
+    memory_decay_half_life: float = Field(default=30 * 86400.0, alias="MEMORY_DECAY_HALF_LIFE")
+    memory_decay_weight: float = Field(default=0.2, alias="MEMORY_DECAY_WEIGHT")
+    memory_overfetch: int = Field(default=4, alias="MEMORY_OVERFETCH")
+    memory_dedupe_similarity: float = Field(default=0.92, alias="MEMORY_DEDUPE_SIMILARITY")
+    memory_retention_age: float = Field(default=0.0, alias="MEMORY_RETENTION_AGE")
+    memory_max_episodes: int = Field(default=0, alias="MEMORY_MAX_EPISODES")
+    memory_consolidate_interval: float = Field(default=0.0, alias="MEMORY_CONSOLIDATE_INTERVAL")
+    memory_consolidate_on_reflection: bool = Field(default=False, alias="MEMORY_CONSOLIDATE_ON_REFLECTION")
+    reflection_interval: float = Field(default=0.0, alias="REFLECTION_INTERVAL")
+    reflection_limit: int = Field(default=5, alias="REFLECTION_LIMIT")
+    job_workers: int = Field(default=1, alias="JOB_WORKERS")
+    cache_dir: Path = Field(default=Path("data/cache"), alias="CACHE_DIR")
 
     mode: str = Field(default="hybrid", alias="MODE")
     enable_web: bool = Field(default=True, alias="ENABLE_WEB")
+    search_backend: str = Field(default="ddg", alias="SEARCH_BACKEND")
+    search_fixtures: Optional[Path] = Field(default=None, alias="SEARCH_FIXTURES")
+    search_cache_ttl: int = Field(default=3600, alias="SEARCH_CACHE_TTL")
+    search_cache_stale: int = Field(default=86400, alias="SEARCH_CACHE_STALE")
+    research_synthesis: str = Field(default="auto", alias="RESEARCH_SYNTHESIS")
+    summary_workers: int = Field(default=4, alias="SUMMARY_WORKERS")
     enable_playwright: bool = Field(default=False, alias="ENABLE_PLAYWRIGHT")
     frontend_enabled: bool = Field(default=True, alias="FRONTEND_ENABLED")
 
     port: int = Field(default=8000, alias="PORT")
+    warmup_enabled: bool = Field(default=True, alias="WARMUP_ENABLED")
 
     def ensure_directories(self) -> None:
         """Make sure runtime directories exist."""
@@ -0,0 +1,210 @@
+"""Episodic memory consolidation: merge near-duplicates, apply retention, rebuild compactly."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from app import memory
+from app.config import settings
+from app.logging import tracer
+
+LATENCY_SAMPLES = 32
+
+_RUN_LOCK = threading.Lock()
+
+
+@dataclass
+class ConsolidationReport:
+    episodes_before: int = 0
+    episodes_after: int = 0
+    clusters_merged: int = 0
+    episodes_merged: int = 0
+    dropped_invalid: int = 0
+    dropped_age: int = 0
+    dropped_size: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    search_ms_before: float = 0.0
+    search_ms_after: float = 0.0
+    duration: float = 0.0
+    dry_run: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def store_bytes() -> int:
+    return sum(path.stat().st_size for path in (memory.INDEX_FILE, memory.META_FILE, memory.LOG_FILE) if path.exists())
+
+
+def search_latency_ms(index: faiss.Index, vectors: np.ndarray, k: int = 3) -> float:
+    """Mean flat-search time per query over up to ``LATENCY_SAMPLES`` stored vectors."""
+    if index.ntotal == 0 or len(vectors) == 0:
+        return 0.0
+    sample = vectors[np.linspace(0, len(vectors) - 1, min(LATENCY_SAMPLES, len(vectors))).astype(int)]
+    start = time.perf_counter()
+    for row in sample:
+        index.search(row[None, :], k)
+    return 1000 * (time.perf_counter() - start) / len(sample)
+
+
+def cluster_near_duplicates(vectors: np.ndarray, order: List[int], threshold: float) -> List[List[int]]:
+    """Greedy threshold clustering: each unassigned row (in ``order``) claims its unassigned neighbours.
+
+    Neighbours are rows with inner product >= ``threshold`` (cosine, as the
+    vectors are normalised), found with one FAISS range search. Each cluster
+    starts with the row that seeded it.
+    """
+    if len(vectors) == 0:
+        return []
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    lims, _, ids = index.range_search(vectors, threshold)
+    assigned = np.zeros(len(vectors), dtype=bool)
+    clusters: List[List[int]] = []
+    for row in order:
+        if assigned[row]:
+            continue
+        neighbours = [int(i) for i in ids[lims[row]: lims[row + 1]] if not assigned[i] and i != row]
+        cluster = [row, *neighbours]
+        assigned[cluster] = True
+        clusters.append(cluster)
+    return clusters
+
+
+def merge_cluster(episodes: List[Dict[str, Any]], vectors: np.ndarray) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Fold a cluster into its newest episode, keeping every source and the merge history."""
+    head = dict(episodes[0])
+    if len(episodes) == 1:
+        return head, vectors[0]
+    history = [(e.get("meta") or {}).get("consolidated", {}) for e in episodes]
+    merged_ids = [episode_id for h in history for episode_id in h.get("merged_ids", [])]
+    meta = dict(head.get("meta") or {})
+    meta["consolidated"] = {
+        "count": sum(h.get("count", 1) for h in history),
+        "merged_ids": merged_ids + [e["episode_id"] for e in episodes[1:]],
+        "first_seen": min(h.get("first_seen", e.get("timestamp", 0.0)) for h, e in zip(history, episodes)),
+    }
+    head["meta"] = meta
+    head["sources"] = list(dict.fromkeys(source for e in episodes for source in e.get("sources") or []))
+    centroid = vectors.mean(axis=0, keepdims=True).astype(np.float32)
+    faiss.normalize_L2(centroid)
+    return head, centroid[0]
+
+
+def _rewrite_log(episodes: List[Dict[str, Any]]) -> None:
+    tmp = memory.LOG_FILE.with_suffix(".jsonl.tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        for episode in sorted(episodes, key=lambda item: item.get("timestamp", 0.0)):
+            fh.write(json.dumps(episode, ensure_ascii=False) + "\n")
+    os.replace(tmp, memory.LOG_FILE)
+
+
+def _flat_index(vectors: np.ndarray, dim: int) -> faiss.Index:
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    return index
+
+
+def consolidate(
+    similarity: Optional[float] = None,
+    max_age: Optional[float] = None,
+    max_episodes: Optional[int] = None,
+    dry_run: bool = False,
+) -> ConsolidationReport:
+    """Compact episodic memory and report store size and search latency before and after.
+
+    Drops failed/placeholder episodes, episodes older than ``max_age`` seconds
+    and, after merging clusters of near-duplicates (cosine >= ``similarity``)
+    into their newest member, everything beyond the newest ``max_episodes``.
+    The index is rebuilt from the stored vectors (no re-encoding) and the
+    episode log is rewritten to match. Arguments default to the
+    ``MEMORY_DEDUPE_SIMILARITY``/``MEMORY_RETENTION_AGE``/``MEMORY_MAX_EPISODES``
+    settings; ``0`` disables a policy.
+
+    Clustering runs on a snapshot without holding the memory lock; episodes
+    recorded meanwhile are appended unchanged when the new store is swapped in.
+    """
+    similarity = settings.memory_dedupe_similarity if similarity is None else similarity
+    max_age = settings.memory_retention_age if max_age is None else max_age
+    max_episodes = settings.memory_max_episodes if max_episodes is None else max_episodes
+    report = ConsolidationReport(dry_run=dry_run)
+    start = time.perf_counter()
+
+    with _RUN_LOCK, tracer.span(component="consolidation") as trace_id:
+        with memory._LOCK:
+            index, live_metadata = memory._load_index()
+            if index is None or not live_metadata:
+                return report
+            total = min(index.ntotal, len(live_metadata))
+            dim = index.d
+            vectors = index.reconstruct_n(0, total)
+            metadata = live_metadata[:total]
+            report.bytes_before = store_bytes()
+        report.episodes_before = total
+        report.search_ms_before = search_latency_ms(_flat_index(vectors, dim), vectors)
+
+        now = time.time()
+        keep = [i for i in range(total) if memory.is_usable(metadata[i])]
+        report.dropped_invalid = total - len(keep)
+        if max_age:
+            fresh = [i for i in keep if now - metadata[i].get("timestamp", 0.0) <= max_age]
+            report.dropped_age = len(keep) - len(fresh)
+            keep = fresh
+
+        newest_first = sorted(range(len(keep)), key=lambda j: metadata[keep[j]].get("timestamp", 0.0), reverse=True)
+        subset = vectors[keep]
+        clusters = (
+            cluster_near_duplicates(subset, newest_first, similarity) if 0 < similarity < 1 and keep
+            else [[j] for j in newest_first]
+        )
+        merged: List[Tuple[Dict[str, Any], np.ndarray]] = []
+        for cluster in clusters:
+            if len(cluster) > 1:
+                report.clusters_merged += 1
+                report.episodes_merged += len(cluster) - 1
+            merged.append(merge_cluster([metadata[keep[j]] for j in cluster], subset[cluster]))
+        if max_episodes and len(merged) > max_episodes:
+            report.dropped_size = len(merged) - max_episodes
+            merged = merged[:max_episodes]
+        # Clusters were seeded newest first; store oldest first like record_episode does.
+        merged.reverse()
+        new_meta = [episode for episode, _ in merged]
+        new_vectors = np.stack([vector for _, vector in merged]).astype(np.float32) if merged else vectors[:0]
+
+        if dry_run:
+            report.bytes_after = report.bytes_before
+        else:
+            with memory._LOCK:
+                current, current_meta = memory._load_index()
+                if current is None or current.d != dim or current.ntotal < total:
+                    raise RuntimeError("Episodic memory was rebuilt during consolidation; try again.")
+                appended = min(current.ntotal, len(current_meta)) - total
+                if appended > 0:
+                    new_meta = new_meta + current_meta[total: total + appended]
+                    new_vectors = np.concatenate([new_vectors, current.reconstruct_n(total, appended)])
+                memory._write_index(_flat_index(new_vectors, dim), new_meta)
+                _rewrite_log(new_meta)
+                report.bytes_after = store_bytes()
+        report.episodes_after = len(new_meta)
+        report.search_ms_after = search_latency_ms(_flat_index(new_vectors, dim), new_vectors)
+        report.duration = time.perf_counter() - start
+        tracer.append(trace_id, {"event": "consolidation_complete", **report.to_dict()})
+    return report
+
+
+__all__ = [
+    "ConsolidationReport",
+    "cluster_near_duplicates",
+    "consolidate",
+    "merge_cluster",
+    "search_latency_ms",
+    "store_bytes",
+]
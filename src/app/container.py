@@ -0,0 +1,122 @@
+"""Application-scoped container holding the adapters, compiled graph and shared clients."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app import backends, tools_web
+from app.adapters import AGENTS_AVAILABLE, get_agents_adapter
+from app.adapters.orchestrator import LangGraphAdapter
+from app.adapters.research import DeerFlowAdapter
+from app.adapters.ui import CopilotKitAdapter
+from app.config import settings
+from app.jobs import JobManager
+from app.ollama import get_client, reset_client
+
+Hook = Callable[["Container"], None]
+
+
+class Container:
+    """Builds every adapter once per process.
+
+    ``start`` compiles the orchestration graph, schedules periodic jobs and
+    runs startup hooks; ``stop`` runs shutdown hooks, stops the job manager
+    and releases shared HTTP clients. Adapter
+    availability is computed at construction so ``/health`` only reads fields.
+    """
+
+    def __init__(self) -> None:
+        self.orchestrator = LangGraphAdapter()
+        self.research = DeerFlowAdapter()
+        self.ui = CopilotKitAdapter()
+        self.submodules: Dict[str, bool] = {
+            "langgraph": self.orchestrator.external_enabled,
+            "deerflow": self.research.external_enabled,
+            "copilotkit": self.ui.external_enabled,
+        }
+        self.jobs = JobManager(workers=settings.job_workers)
+        self.started = False
+        self._startup_hooks: List[Hook] = [_compile_graph, _start_backend_health_checks, _schedule_jobs]
+        self._shutdown_hooks: List[Hook] = [_close_clients, _stop_jobs]
+        self._lock = threading.Lock()
+
+    @property
+    def agents(self) -> Any:
+        return get_agents_adapter() if AGENTS_AVAILABLE else None
+
+    @property
+    def client(self) -> Any:
+        return get_client()
+
+    def add_startup_hook(self, hook: Hook) -> None:
+        self._startup_hooks.append(hook)
+
+    def add_shutdown_hook(self, hook: Hook) -> None:
+        self._shutdown_hooks.append(hook)
+
+    def start(self) -> None:
+        with self._lock:
+            if self.started:
+                return
+            for hook in self._startup_hooks:
+                hook(self)
+            self.started = True
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self.started:
+                return
+            for hook in reversed(self._shutdown_hooks):
+                hook(self)
+            self.started = False
+
+
+def _compile_graph(container: Container) -> None:
+    container.orchestrator.build_graph()
+
+
+def _start_backend_health_checks(container: Container) -> None:
+    pool = backends.get_pool()
+    if len(pool.backends) > 1:
+        pool.start_health_checks(settings.ollama_health_interval)
+
+
+def _schedule_jobs(container: Container) -> None:
+    container.jobs.start()
+    container.jobs.schedule("reflection", settings.reflection_interval, limit=settings.reflection_limit)
+    container.jobs.schedule("consolidation", settings.memory_consolidate_interval)
+
+
+def _stop_jobs(container: Container) -> None:
+    container.jobs.shutdown()
+
+
+def _close_clients(container: Container) -> None:
+    reset_client()
+    # The cached agents adapter holds the client that was just closed.
+    get_agents_adapter.cache_clear()
+    tools_web.close_search_backend()
+
+
+_container: Optional[Container] = None
+_container_lock = threading.Lock()
+
+
+def get_container() -> Container:
+    global _container
+    with _container_lock:
+        if _container is None:
+            _container = Container()
+        return _container
+
+
+def reset_container() -> None:
+    """Stop and drop the container so the next ``get_container`` builds a fresh one."""
+    global _container
+    with _container_lock:
+        container, _container = _container, None
+    if container is not None:
+        container.stop()
+
+
+__all__ = ["Container", "get_container", "reset_container"]
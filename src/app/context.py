@@ -0,0 +1,110 @@
+"""Token-budgeted context assembly for synthesis prompts."""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from .dedupe import NearDuplicateFilter
+
+TOKEN_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+DUPLICATE_JACCARD = 0.8
+
+
+def count_tokens(text: str) -> int:
+    """Fast BPE-style estimate: one token per punctuation mark, ~5 characters per word token."""
+    return sum(max(1, math.ceil(len(piece) / 5)) for piece in TOKEN_PIECE_RE.findall(text))
+
+
+@dataclass
+class Passage:
+    label: str
+    text: str
+    source: Optional[str] = None
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    text: str = ""
+    sources: List[str] = field(default_factory=list)
+    tokens: int = 0
+    included: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+
+def _truncate_to_tokens(text: str, budget: int) -> str:
+    """Trim ``text`` on a word boundary until it fits ``budget`` tokens."""
+    if budget <= 0:
+        return ""
+    tokens = count_tokens(text)
+    while tokens > budget and text:
+        cut = max(1, int(len(text) * budget / tokens) - 1)
+        boundary = text.rfind(" ", 0, cut)
+        text = text[: boundary if boundary > 0 else cut].rstrip()
+        tokens = count_tokens(text)
+    return text
+
+
+def format_passage(passage: Passage) -> str:
+    prefix = f"{passage.label} [{passage.source}]" if passage.source else passage.label
+    return f"{prefix}: {passage.text}"
+
+
+def pack_context(
+    passages: Sequence[Passage],
+    budget_tokens: int,
+    max_share: float = 0.5,
+    min_tokens: int = 32,
+    dedupe: NearDuplicateFilter | None = None,
+) -> PackedContext:
+    """Fill ``budget_tokens`` with the highest-scoring, non-duplicate passages.
+
+    No single passage may take more than ``max_share`` of the budget; the last
+    passage that does not fit whole is truncated when at least ``min_tokens``
+    remain. Near-duplicates (MinHash Jaccard >= 0.8 against anything already
+    packed, or already seen by a shared ``dedupe`` filter) are skipped.
+    """
+    packed = PackedContext()
+    parts: List[str] = []
+    dedupe = dedupe or NearDuplicateFilter(threshold=DUPLICATE_JACCARD)
+    remaining = max(0, budget_tokens)
+    per_passage = max(min_tokens, int(budget_tokens * max_share))
+
+    for passage in sorted(passages, key=lambda item: item.score, reverse=True):
+        text = (passage.text or "").strip()
+        if not text:
+            continue
+        if remaining < min_tokens:
+            packed.dropped += 1
+            continue
+        if dedupe.check(text):
+            packed.duplicates += 1
+            continue
+        limit = min(per_passage, remaining)
+        formatted = format_passage(Passage(passage.label, text, passage.source, passage.score))
+        tokens = count_tokens(formatted)
+        if tokens > limit:
+            overhead = tokens - count_tokens(text)
+            text = _truncate_to_tokens(text, limit - overhead)
+            if not text:
+                packed.dropped += 1
+                continue
+            formatted = format_passage(Passage(passage.label, text, passage.source, passage.score))
+            tokens = count_tokens(formatted)
+            packed.truncated += 1
+        parts.append(formatted)
+        remaining -= tokens
+        packed.tokens += tokens
+        packed.included += 1
+        if passage.source and passage.source not in packed.sources:
+            packed.sources.append(passage.source)
+
+    packed.text = "\n\n".join(parts)
+    return packed
+
+
+__all__ = ["Passage", "PackedContext", "count_tokens", "pack_context", "format_passage"]
@@ -0,0 +1,75 @@
+"""MinHash near-duplicate detection for crawled pages, context passages and RAG chunks."""
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+SHINGLE_SIZE = 3
+MAX_WORDS = 5000
+
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, MERSENNE_PRIME, size=256, dtype=np.uint64)
+_PERM_B = _rng.integers(0, MERSENNE_PRIME, size=256, dtype=np.uint64)
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = re.findall(r"\w+", text.lower())[:MAX_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.fromiter((zlib.crc32(item.encode("utf-8")) for item in set(shingles)), dtype=np.uint64)
+
+
+def minhash_signature(text: str, num_perm: int = 64) -> np.ndarray:
+    """Return ``num_perm`` MinHash values; matching positions estimate shingle Jaccard similarity."""
+    hashes = _shingle_hashes(text) % MERSENNE_PRIME
+    permuted = (hashes[:, None] * _PERM_A[:num_perm] + _PERM_B[:num_perm]) % MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateFilter:
+    """Remembers texts and flags later ones whose estimated Jaccard similarity exceeds ``threshold``.
+
+    Signatures are split into LSH bands so each check only compares against
+    texts that share at least one band. Memory is one ``uint32`` signature plus
+    ``bands`` dict entries per remembered text. Thread-safe.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def check(self, text: str) -> bool:
+        """Return True if ``text`` is a near-duplicate of something seen; otherwise remember it."""
+        signature = minhash_signature(text, self.num_perm)
+        bands = [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(len(self._buckets))]
+        with self._lock:
+            candidates = {idx for band, key in zip(self._buckets, bands) for idx in band.get(key, ())}
+            for idx in candidates:
+                if np.mean(self._signatures[idx] == signature) >= self.threshold:
+                    self.dropped += 1
+                    return True
+            position = len(self._signatures)
+            self._signatures.append(signature)
+            for band, key in zip(self._buckets, bands):
+                band.setdefault(key, []).append(position)
+        return False
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+__all__ = ["minhash_signature", "NearDuplicateFilter"]
@@ -1,17 +1,195 @@
 """Shared embedding utilities used across local memory and RAG."""
 from __future__ import annotations
 
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Protocol, Sequence
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from .config import settings
 
 DEFAULT_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BACKENDS = ("torch", "int8", "onnx")
+MAX_SEQ_LENGTH = 256
+
+
+class Encoder(Protocol):
+    """Subset of the SentenceTransformer API the rest of the app relies on."""
+
+    def encode(
+        self,
+        sentences: str | Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray: ...
+
+
+def _load_sentence_transformer(model_name: str, **kwargs: Any) -> Any:
+    # sentence-transformers pulls in torch; only pay for the import when a torch backend is chosen.
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, **kwargs)
+
+
+def _load_quantized_sentence_transformer(model_name: str) -> Any:
+    """Dynamic int8 quantisation of every Linear layer; no extra dependencies required."""
+    import torch
+
+    model = _load_sentence_transformer(model_name, device="cpu")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+    norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return (pooled / norms).astype(np.float32)
+
+
+class OnnxEncoder:
+    """ONNX Runtime port of the sentence-transformers mean-pooling pipeline."""
+
+    def __init__(self, model_name: str, onnx_file: str, max_length: int = MAX_SEQ_LENGTH, threads: int = 0) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path, tokenizer_path = self._resolve_files(model_name, onnx_file)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {item.name for item in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+
+    @staticmethod
+    def _resolve_files(model_name: str, onnx_file: str) -> tuple[Path, Path]:
+        local_dir = Path(model_name)
+        if local_dir.is_dir():
+            return local_dir / onnx_file, local_dir / "tokenizer.json"
+        from huggingface_hub import hf_hub_download
+
+        model_path = hf_hub_download(repo_id=model_name, filename=onnx_file)
+        tokenizer_path = hf_hub_download(repo_id=model_name, filename="tokenizer.json")
+        return Path(model_path), Path(tokenizer_path)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([item.ids for item in encodings], dtype=np.int64),
+            "attention_mask": np.array([item.attention_mask for item in encodings], dtype=np.int64),
+            "token_type_ids": np.array([item.type_ids for item in encodings], dtype=np.int64),
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        hidden = self._session.run(None, feeds)[0]
+        return _mean_pool(hidden, feeds["attention_mask"])
+
+    def encode(
+        self,
+        sentences: str | Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        # Length-sorted batches keep padding (and wasted compute) to a minimum.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = [
+            self._encode_batch([texts[i] for i in order[start : start + batch_size]])
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.vstack(batches)
+        return embeddings[0] if single else embeddings
+
+    @property
+    def dim(self) -> int:
+        return int(self._encode_batch([""]).shape[1])
 
 
 @lru_cache(maxsize=4)
-def get_encoder(model_name: str = DEFAULT_EMBED_MODEL) -> SentenceTransformer:
-    """Return a cached sentence transformer encoder."""
-    return SentenceTransformer(model_name)
+def _build_encoder(model_name: str, backend: str, threads: int = 0) -> Encoder:
+    if backend in {"torch", "int8"} and threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    if backend == "torch":
+        return _load_sentence_transformer(model_name)
+    if backend == "int8":
+        return _load_quantized_sentence_transformer(model_name)
+    if backend == "onnx":
+        return OnnxEncoder(model_name, settings.embed_onnx_file, threads=threads)
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(EMBED_BACKENDS)}")
+
+
+def get_encoder(model_name: str = DEFAULT_EMBED_MODEL, backend: str | None = None) -> Encoder:
+    """Return a cached encoder for the configured (or requested) backend."""
+    return _build_encoder(model_name, (backend or settings.embed_backend).lower())
+
+
+_worker_encoder: Optional[Encoder] = None
+
+
+def _init_worker(model_name: str, backend: str, factory: Optional[Callable[[], Encoder]] = None) -> None:
+    global _worker_encoder
+    if factory is not None:
+        _worker_encoder = factory()
+        return
+    # One intra-op thread per process: the pool provides the parallelism and
+    # oversubscribed BLAS threads would erase the gain.
+    _worker_encoder = _build_encoder(model_name, backend, 1)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    assert _worker_encoder is not None
+    return _worker_encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+def iter_encode(
+    batches: Iterable[List[str]],
+    model_name: str = DEFAULT_EMBED_MODEL,
+    workers: int = 1,
+    batch_size: int = 32,
+    factory: Optional[Callable[[], Encoder]] = None,
+) -> Iterator[np.ndarray]:
+    """Yield one embedding matrix per input batch, preserving input order.
+
+    With ``workers > 1`` batches are sharded across a process pool. At most
+    ``2 * workers`` batches are in flight, so memory stays bounded no matter
+    how long the input iterable is. ``factory`` (picklable, for the workers)
+    builds the encoder instead of ``get_encoder(model_name)``.
+    """
+    if workers <= 1:
+        encoder = factory() if factory is not None else get_encoder(model_name)
+        for batch in batches:
+            yield encoder.encode(batch, batch_size=batch_size, convert_to_numpy=True)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_name, settings.embed_backend.lower(), factory),
+    ) as pool:
+        pending: Deque[Future] = deque()
+        for batch in batches:
+            pending.append(pool.submit(_encode_in_worker, batch, batch_size))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
-__all__ = ["DEFAULT_EMBED_MODEL", "get_encoder"]
+__all__ = ["DEFAULT_EMBED_MODEL", "EMBED_BACKENDS", "Encoder", "OnnxEncoder", "get_encoder", "iter_encode"]
@@ -0,0 +1,321 @@
+"""Replay a JSONL workload through the orchestrator and report latency and throughput."""
+from __future__ import annotations
+
+import json
+import math
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from contextvars import copy_context
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from app import memory, rag, rerank
+from app.cache import SqliteCache
+from app.config import settings
+from app.logging import JsonTracer, tracer as default_tracer
+from app.summarize import set_cache as set_summary_cache
+from app.tools_web import set_search_cache
+
+TEXT_FIELDS = ("message", "query", "question", "prompt", "title")
+PHASES = ("cold", "warm")
+CACHE_NAMESPACES = ("search", "summaries")
+
+
+@dataclass
+class EvalRequest:
+    id: str
+    message: str
+    mode: Optional[str] = None
+    expected_sources: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EvalResult:
+    id: str
+    phase: str
+    mode: str
+    latency: float
+    trace_id: Optional[str] = None
+    error: Optional[str] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+    queue_time: float = 0.0
+    prompt_tokens: int = 0
+    prefill_tokens: int = 0
+    eval_tokens: int = 0
+    eval_seconds: float = 0.0
+    retrieved: int = 0
+    memory_hits: int = 0
+    pages: int = 0
+    source_hit: Optional[bool] = None
+
+
+def load_requests(path: Path, limit: Optional[int] = None) -> List[EvalRequest]:
+    """Read a workload; each line is a string or an object with a message-like field.
+
+    ``message``/``query``/``question``/``prompt`` are used as-is; backlog-style
+    lines with ``title`` and ``body`` are replayed as ``"title\\n\\nbody"``.
+    """
+    requests: List[EvalRequest] = []
+    for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            item = {"message": str(item)}
+        text = next((item[key] for key in TEXT_FIELDS if item.get(key)), "")
+        if item.get("body"):
+            text = f"{text}\n\n{item['body']}" if text else item["body"]
+        if not text:
+            raise ValueError(f"{path}:{number}: no message, query, question, prompt or body field")
+        requests.append(
+            EvalRequest(
+                id=str(item.get("id") or item.get("request_id") or number),
+                message=text,
+                mode=item.get("mode"),
+                expected_sources=list(item.get("expected_sources") or []),
+            )
+        )
+        if limit and len(requests) >= limit:
+            break
+    return requests
+
+
+def reset_caches() -> None:
+    """Drop application caches so the next phase starts cold.
+
+    Loaded models (the encoder, re-ranker and Ollama weights) stay resident;
+    "cold" covers the search/summary caches under the current ``CACHE_DIR``,
+    re-rank scores and the in-process copies of the RAG and memory indexes.
+    """
+    for namespace in CACHE_NAMESPACES:
+        SqliteCache(namespace).clear()
+    rerank.clear_cache()
+    rag.clear_cache()
+    memory.clear_cache()
+
+
+@contextmanager
+def scratch_caches() -> Iterator[Path]:
+    """Point ``CACHE_DIR`` at a throwaway directory so clearing and filling caches never touches the real ones."""
+    original = settings.cache_dir
+    with tempfile.TemporaryDirectory(prefix="eval-cache-") as tmp:
+        settings.cache_dir = Path(tmp)
+        set_search_cache(None)
+        set_summary_cache(None)
+        try:
+            yield settings.cache_dir
+        finally:
+            settings.cache_dir = original
+            set_search_cache(None)
+            set_summary_cache(None)
+
+
+@contextmanager
+def scratch_memory() -> Iterator[Path]:
+    """Run against a throwaway copy of episodic memory so replayed replies never reach the real store."""
+    with tempfile.TemporaryDirectory(prefix="eval-memory-") as tmp:
+        scratch = Path(tmp)
+        for path in (memory.INDEX_FILE, memory.META_FILE, memory.LOG_FILE):
+            if path.exists():
+                shutil.copy2(path, scratch / path.name)
+        with memory.use_store(scratch):
+            yield scratch
+
+
+def trace_breakdown(trace_id: str, tracer: JsonTracer = default_tracer) -> Dict[str, Any]:
+    """Sum node durations and collect generation stats from one request's trace."""
+    stages: Dict[str, float] = {}
+    generation: Dict[str, Any] = {"queue_time": 0.0, "prompt_eval_count": 0, "eval_count": 0, "eval": 0.0}
+    path = tracer.trace_dir / f"{trace_id}.jsonl"
+    if not path.exists():
+        return {"stages": stages, "generation": generation}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        record = json.loads(line)
+        node = record.get("node")
+        if node == "generation":
+            for key in generation:
+                generation[key] += record.get(key) or 0
+        elif node and record.get("duration") is not None:
+            stages[node] = stages.get(node, 0.0) + float(record["duration"])
+    return {"stages": stages, "generation": generation}
+
+
+def _source_hit(expected: Sequence[str], sources: Sequence[str]) -> Optional[bool]:
+    if not expected:
+        return None
+    return any(want in source for want in expected for source in sources)
+
+
+def run_one(orchestrator: Any, request: EvalRequest, mode: str, phase: str, tracer: JsonTracer) -> EvalResult:
+    start = time.perf_counter()
+    try:
+        output = orchestrator.run(request.message, mode=mode)
+    except Exception as exc:
+        return EvalResult(request.id, phase, mode, time.perf_counter() - start, error=str(exc))
+    latency = time.perf_counter() - start
+    meta = output.get("meta", {})
+    result = EvalResult(
+        request.id,
+        phase,
+        mode,
+        latency,
+        trace_id=meta.get("trace_id"),
+        error=meta.get("generation_error"),
+        prompt_tokens=meta.get("prompt_tokens", 0),
+        retrieved=meta.get("retrieved", 0),
+        memory_hits=meta.get("memory_hits", 0),
+        pages=meta.get("pages", 0),
+        source_hit=_source_hit(request.expected_sources, output.get("sources", [])),
+    )
+    if result.trace_id:
+        breakdown = trace_breakdown(result.trace_id, tracer)
+        generation = breakdown["generation"]
+        result.stages = breakdown["stages"]
+        result.queue_time = generation["queue_time"]
+        result.prefill_tokens = generation["prompt_eval_count"]
+        result.eval_tokens = generation["eval_count"]
+        result.eval_seconds = generation["eval"]
+    return result
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _rate(flags: Sequence[bool]) -> Optional[float]:
+    return round(sum(flags) / len(flags), 4) if flags else None
+
+
+def summarize(results: Sequence[EvalResult], wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Aggregate rows; wall time and throughput are only reported when ``wall_seconds`` is given."""
+    ok = [r for r in results if not r.error]
+    latencies = [r.latency for r in ok]
+    eval_seconds = sum(r.eval_seconds for r in ok)
+    stage_names = sorted({name for r in ok for name in r.stages})
+    summary: Dict[str, Any] = {"requests": len(results), "errors": len(results) - len(ok)}
+    if wall_seconds is not None:
+        summary["wall_seconds"] = round(wall_seconds, 4)
+        summary["throughput_rps"] = round(len(results) / wall_seconds, 4) if wall_seconds else 0.0
+    return {
+        **summary,
+        "latency": {
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies, default=0.0), 4),
+        },
+        "stages_mean": {
+            name: round(sum(r.stages.get(name, 0.0) for r in ok) / len(ok), 4) for name in stage_names
+        },
+        "queue_time_mean": round(sum(r.queue_time for r in ok) / len(ok), 4) if ok else 0.0,
+        "tokens_per_second": round(sum(r.eval_tokens for r in ok) / eval_seconds, 2) if eval_seconds else None,
+        "retrieval_hit_rate": _rate([r.retrieved > 0 for r in ok]),
+        "memory_hit_rate": _rate([r.memory_hits > 0 for r in ok]),
+        "web_hit_rate": _rate([r.pages > 0 for r in ok]),
+        "source_hit_rate": _rate([r.source_hit for r in ok if r.source_hit is not None]),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def run_evaluation(
+    requests: Sequence[EvalRequest],
+    orchestrator: Any,
+    modes: Optional[Sequence[str]] = None,
+    phases: Sequence[str] = PHASES,
+    concurrency: int = 1,
+    tracer: JsonTracer = default_tracer,
+    isolate_memory: bool = True,
+) -> Dict[str, Any]:
+    """Replay ``requests`` once per phase and mode and return per-request rows plus summaries.
+
+    With ``modes`` unset each request runs in its own ``mode`` (or the
+    orchestrator default). A ``cold`` phase clears caches first; a ``warm``
+    phase replays on whatever the previous phase left behind. With
+    ``isolate_memory`` each phase records episodes into its own copy of
+    episodic memory, so the real store is untouched and a warm phase's memory
+    hits never include episodes the cold phase created. Search and summary
+    caches live in a scratch ``CACHE_DIR`` for the whole run either way.
+    """
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        raise ValueError(f"Unknown phase(s): {', '.join(sorted(unknown))}")
+    rows: List[EvalResult] = []
+    summary: Dict[str, Dict[str, Any]] = {}
+    with scratch_caches():
+        for phase in phases:
+            if phase == "cold":
+                reset_caches()
+            jobs = [
+                (request, mode or request.mode or settings.mode_normalized)
+                for mode in (modes or [None])
+                for request in requests
+            ]
+            with scratch_memory() if isolate_memory else nullcontext():
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="eval") as pool:
+                    futures = [
+                        pool.submit(copy_context().run, run_one, orchestrator, request, mode, phase, tracer)
+                        for request, mode in jobs
+                    ]
+                    phase_rows = [future.result() for future in futures]
+                wall = time.perf_counter() - start
+            rows.extend(phase_rows)
+            summary[phase] = summarize(phase_rows, wall)
+            # Modes share the phase's worker pool, so only the phase as a whole has a meaningful throughput.
+            for mode in sorted({row.mode for row in phase_rows}):
+                subset = [row for row in phase_rows if row.mode == mode]
+                summary[phase].setdefault("by_mode", {})[mode] = summarize(subset)
+    return {
+        "config": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "revision": _git_revision(),
+            "requests": len(requests),
+            "modes": list(modes) if modes else None,
+            "phases": list(phases),
+            "concurrency": concurrency,
+            "isolate_memory": isolate_memory,
+        },
+        "summary": summary,
+        "results": [asdict(row) for row in rows],
+    }
+
+
+def write_report(report: Dict[str, Any], path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+__all__ = [
+    "EvalRequest",
+    "EvalResult",
+    "load_requests",
+    "reset_caches",
+    "scratch_caches",
+    "scratch_memory",
+    "trace_breakdown",
+    "percentile",
+    "summarize",
+    "run_evaluation",
+    "write_report",
+]
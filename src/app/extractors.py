@@ -0,0 +1,169 @@
+"""Pluggable text extractors for RAG ingestion with a content-hash cache."""
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import settings
+
+CACHE_DIR = Path(settings.cache_dir) / "extract"
+# Bump when an extractor's output format changes so stale cache entries are ignored.
+EXTRACTOR_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Extractor:
+    name: str
+    func: Callable[[Path], str]
+    cacheable: bool = True
+
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(*suffixes: str, cacheable: bool = True) -> Callable[[Callable[[Path], str]], Callable[[Path], str]]:
+    """Register ``func`` as the extractor for the given file suffixes ("" for extensionless files).
+
+    ``cacheable`` extractors have their output cached by file hash; leave it off
+    for formats that are cheaper to re-read than to hash.
+    """
+
+    def decorator(func: Callable[[Path], str]) -> Callable[[Path], str]:
+        extractor = Extractor(name=func.__name__, func=func, cacheable=cacheable)
+        for suffix in suffixes:
+            EXTRACTORS[suffix.lower()] = extractor
+        return func
+
+    return decorator
+
+
+def get_extractor(path: Path) -> Optional[Extractor]:
+    return EXTRACTORS.get(path.suffix.lower())
+
+
+@register_extractor(".txt", ".md", "", cacheable=False)
+def extract_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="ignore")
+
+
+@register_extractor(".html", ".htm")
+def extract_html(path: Path) -> str:
+    from .tools_web import extract_readable
+
+    readable = extract_readable(path.read_text(encoding="utf-8", errors="ignore"), url=path.as_uri())
+    return "\n\n".join(part for part in (readable.get("title"), readable.get("text")) if part)
+
+
+@register_extractor(".pdf")
+def extract_pdf(path: Path) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+@register_extractor(".docx")
+def extract_docx(path: Path) -> str:
+    import docx
+
+    document = docx.Document(str(path))
+    parts = [paragraph.text for paragraph in document.paragraphs if paragraph.text]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(parts)
+
+
+def _flatten_json(value: Any, prefix: str = "") -> Iterator[str]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten_json(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten_json(item, prefix)
+    elif value is not None:
+        yield f"{prefix}: {value}" if prefix else str(value)
+
+
+@register_extractor(".json", cacheable=False)
+def extract_json(path: Path) -> str:
+    data = json.loads(path.read_text(encoding="utf-8", errors="ignore"))
+    return "\n".join(_flatten_json(data))
+
+
+def _cache_path(extractor: Extractor, path: Path) -> Path:
+    with path.open("rb") as fh:
+        digest = hashlib.file_digest(fh, "sha256").hexdigest()
+    return CACHE_DIR / f"{extractor.name}-v{EXTRACTOR_VERSION}-{digest}.txt"
+
+
+def extract(path: Path) -> Optional[str]:
+    """Return the text of ``path``; unchanged binaries are served from the hash cache."""
+    extractor = get_extractor(path)
+    if extractor is None:
+        return None
+    if not extractor.cacheable:
+        return extractor.func(path)
+    cached = _cache_path(extractor, path)
+    if cached.exists():
+        return cached.read_text(encoding="utf-8")
+    text = extractor.func(path)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, cached)
+    return text
+
+
+def _extract_safely(path: str) -> Tuple[str, Optional[str]]:
+    try:
+        return path, extract(Path(path))
+    except Exception:
+        # Corrupt files or a missing optional parser (pypdf, python-docx) skip the file.
+        return path, None
+
+
+def iter_extracted(paths: Iterable[Path], workers: int | None = None) -> Iterator[Tuple[str, str]]:
+    """Yield ``(path, text)`` in input order, extracting across a process pool when ``workers > 1``."""
+    workers = settings.extract_workers if workers is None else workers
+    if workers <= 1:
+        results: Iterable[Tuple[str, Optional[str]]] = (_extract_safely(str(path)) for path in paths)
+    else:
+        results = _pooled(paths, workers)
+    for path, text in results:
+        if text:
+            yield path, text
+
+
+def _pooled(paths: Iterable[Path], workers: int) -> Iterator[Tuple[str, Optional[str]]]:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: Deque[Future] = deque()
+        for path in paths:
+            pending.append(pool.submit(_extract_safely, str(path)))
+            if len(pending) >= 4 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def supported_suffixes() -> List[str]:
+    return sorted(EXTRACTORS)
+
+
+__all__ = [
+    "Extractor",
+    "EXTRACTORS",
+    "register_extractor",
+    "get_extractor",
+    "extract",
+    "iter_extracted",
+    "supported_suffixes",
+]
@@ -6,18 +6,31 @@ from typing import Any, Dict, List, TypedDict
 
 from langgraph.graph import END, StateGraph
 
-from app import memory, rag, tools_web
+from app import memory, rag, rerank, tools_web
+from app.admission import AdmissionError, current_priority
+from app.config import settings
+from app.context import Passage, count_tokens, pack_context
+from app.dedupe import NearDuplicateFilter
 from app.logging import JsonTracer
+from app.ollama import node_overrides, timings as ollama_timings
+from app.prompting import SYNTHESIS_SYSTEM_PROMPT, build_synthesis_messages, synthesis_user_prompt
+
+
+MEMORY_K = 3
 
 
 class AgentState(TypedDict, total=False):
     messages: List[Dict[str, Any]]
     mode: str
     retrieved_chunks: List[Dict[str, Any]]
+    prefetched_chunks: List[Dict[str, Any]]
+    plan: List[str]
     web_results: List[Dict[str, Any]]
     pages: List[Dict[str, Any]]
     sources: List[str]
     memory_hits: List[Dict[str, Any]]
+    prompt_tokens: int
+    duplicates_dropped: Dict[str, int]
     reply: str
     meta: Dict[str, Any]
     generation_error: str
@@ -49,24 +62,40 @@ def route_logic(state: AgentState) -> str:
 
 
 def route_node(state: AgentState) -> AgentState:
+    # Callers that already looked memory up (one batched search for /chat/batch) pass the hits in.
+    if "memory_hits" in state:
+        return state
     query = _last_user_message(state)
     try:
-        state["memory_hits"] = memory.search_memory(query, k=3)
+        state["memory_hits"] = memory.search_memory(query, k=MEMORY_K)
     except Exception:
         state["memory_hits"] = []
     return state
 
 
+def retrieval_fetch_k() -> int:
+    """Chunks ``retrieve_node`` asks the index for (more when a re-rank stage follows)."""
+    k = settings.retrieval_k
+    return max(k, settings.rerank_candidates) if settings.rerank_enabled else k
+
+
 def retrieve_node(state: AgentState) -> AgentState:
     start = time.time()
     query = _last_user_message(state)
+    k = settings.retrieval_k
+    rerank_info: Dict[str, Any] = {}
+    prefetched = state.get("prefetched_chunks")
     try:
-        chunks = rag.query_index(query, k=4)
+        if settings.rerank_enabled:
+            candidates = prefetched if prefetched is not None else rag.query_index(query, k=retrieval_fetch_k())
+            chunks, rerank_info = rerank.rerank(query, candidates, top_k=k)
+        else:
+            chunks = prefetched[:k] if prefetched is not None else rag.query_index(query, k=k)
     except Exception:
         chunks = []
     state["retrieved_chunks"] = chunks
     duration = time.time() - start
-    _log(state, "retrieve", duration=duration, hits=len(chunks))
+    _log(state, "retrieve", duration=duration, hits=len(chunks), **({"rerank": rerank_info} if rerank_info else {}))
     return state
 
 
@@ -84,66 +113,93 @@ def research_plan_node(state: AgentState) -> AgentState:
 
 def search_node(state: AgentState) -> AgentState:
     start = time.time()
-    query = _last_user_message(state)
+    seeds = state.get("plan") or [_last_user_message(state)]
     try:
-        results = tools_web.web_search_ddg(query, max_results=5)
+        results = tools_web.multi_search(seeds, max_results=5)
     except Exception:
         results = []
     state["web_results"] = results
     duration = time.time() - start
-    _log(state, "search", duration=duration, results=len(results))
+    _log(state, "search", duration=duration, results=len(results), seeds=len(seeds))
     return state
 
 
 def crawl_node(state: AgentState) -> AgentState:
     start = time.time()
-    urls = [item.get("href") for item in state.get("web_results", []) if item.get("href")]
+    groups: Dict[str, List[str]] = {}
+    for item in state.get("web_results", []):
+        if item.get("href"):
+            groups.setdefault(item.get("seed") or "", []).append(item["href"])
+    dedupe = NearDuplicateFilter()
     try:
-        pages = tools_web.crawl(urls, depth=1, max_pages=5)
+        pages = tools_web.crawl_many(list(groups.values()), depth=1, max_pages=5, dedupe=dedupe)
     except Exception:
         pages = []
     state["pages"] = pages
+    state.setdefault("duplicates_dropped", {})["crawl"] = dedupe.dropped
     duration = time.time() - start
-    _log(state, "crawl", duration=duration, pages=len(pages))
+    _log(state, "crawl", duration=duration, pages=len(pages), duplicates=dedupe.dropped)
     return state
 
 
-def synthesize_node(state: AgentState) -> AgentState:
-    start = time.time()
-    client = state.get("client")
-    query = _last_user_message(state)
-    retrieved_chunks = state.get("retrieved_chunks", [])
-    pages = state.get("pages", [])
-    memory_hits = state.get("memory_hits", [])
+def _rank_score(rank: int) -> float:
+    # Sources score on different scales; rank-based scores interleave them fairly.
+    return 1.0 / (settings.rrf_k + rank)
 
-    context_parts: List[str] = []
-    sources: List[str] = []
 
-    for chunk in retrieved_chunks:
-        context_parts.append(f"Local: {chunk.get('snippet')}")
-        if path := chunk.get("path"):
-            sources.append(path)
+def _context_passages(state: AgentState) -> List[Passage]:
+    passages: List[Passage] = []
+    for rank, chunk in enumerate(state.get("retrieved_chunks", []), start=1):
+        passages.append(Passage("Local", chunk.get("snippet") or "", chunk.get("path"), _rank_score(rank)))
+    for rank, episode in enumerate(state.get("memory_hits", []), start=1):
+        passages.append(
+            Passage("Memory", episode.get("response") or "", f"memory://{episode.get('episode_id')}", _rank_score(rank))
+        )
+    for rank, page in enumerate(state.get("pages", []), start=1):
+        passages.append(Passage("Web", page.get("text") or "", page.get("url"), _rank_score(rank)))
+    return passages
 
-    for episode in memory_hits:
-        context_parts.append(f"Memory: {episode.get('response', '')[:400]}")
-        sources.append(f"memory://{episode.get('episode_id')}")
 
-    for page in pages:
-        context_parts.append(f"Web: {page.get('text', '')[:500]}")
-        if url := page.get("url"):
-            sources.append(url)
+def synthesize_node(state: AgentState) -> AgentState:
+    start = time.time()
+    client = state.get("client")
+    query = _last_user_message(state)
 
-    prompt = "\n\n".join(context_parts)
-    messages = [
-        {"role": "system", "content": "Answer the question with the provided context and cite sources."},
-        {"role": "user", "content": f"Question: {query}\n\nContext:\n{prompt}"},
-    ]
+    mode = state.get("mode", "hybrid")
+    overhead = count_tokens(SYNTHESIS_SYSTEM_PROMPT) + count_tokens(synthesis_user_prompt(query, "", mode))
+    budget = settings.num_ctx - settings.context_reserve_tokens - overhead
+    packed = pack_context(_context_passages(state), budget)
+    sources = packed.sources
+
+    messages = build_synthesis_messages(query, packed.text, mode)
+    state["prompt_tokens"] = overhead + packed.tokens
+    state.setdefault("duplicates_dropped", {})["context"] = packed.duplicates
+    _log(
+        state,
+        "context",
+        prompt_tokens=state["prompt_tokens"],
+        budget=budget,
+        passages=packed.included,
+        duplicates=packed.duplicates,
+        truncated=packed.truncated,
+        dropped=packed.dropped,
+    )
 
     reply = ""
     if client:
         try:
-            response = client.generate(messages, stream=False)
+            response = client.generate(messages, stream=False, **node_overrides("synthesize"))
             reply = response.get("message", {}).get("content", "")
+            _log(
+                state,
+                "generation",
+                queue_time=getattr(client, "last_queue_time", 0.0),
+                priority=current_priority(),
+                backend=getattr(client, "last_backend", None),
+                **ollama_timings(response),
+            )
+        except AdmissionError:
+            raise
         except Exception as exc:
             reply = "Unable to generate response at this time."
             state["generation_error"] = str(exc)
@@ -165,6 +221,10 @@ def respond_node(state: AgentState) -> Dict[str, Any]:
         "pages": len(state.get("pages", [])),
         "memory_hits": len(state.get("memory_hits", [])),
     }
+    if duplicates := state.get("duplicates_dropped"):
+        meta["duplicates_dropped"] = duplicates
+    if prompt_tokens := state.get("prompt_tokens"):
+        meta["prompt_tokens"] = prompt_tokens
     if error := state.get("generation_error"):
         meta["generation_error"] = error
     _log(state, "respond", duration=0, reply_length=len(reply))
@@ -175,7 +235,8 @@ def build_default_graph() -> Any:
     graph = StateGraph(AgentState)
     graph.add_node("route", route_node)
     graph.add_node("retrieve", retrieve_node)
-    graph.add_node("plan", research_plan_node)
+    # Node names must differ from state keys, so the planner node is not called "plan".
+    graph.add_node("research_plan", research_plan_node)
     graph.add_node("search", search_node)
     graph.add_node("crawl", crawl_node)
     graph.add_node("synthesize", synthesize_node)
@@ -191,21 +252,21 @@ def build_default_graph() -> Any:
         _route_decision,
         {
             "offline": "retrieve",
-            "web": "plan",
+            "web": "research_plan",
             "hybrid": "retrieve",
         },
     )
 
     graph.add_conditional_edges(
         "retrieve",
-        lambda state: "respond" if state.get("mode") == "offline" else "plan",
+        lambda state: "respond" if state.get("mode") == "offline" else "research_plan",
         {
             "respond": "respond",
-            "plan": "plan",
+            "research_plan": "research_plan",
         },
     )
 
-    graph.add_edge("plan", "search")
+    graph.add_edge("research_plan", "search")
     graph.add_edge("search", "crawl")
     graph.add_edge("crawl", "synthesize")
     graph.add_edge("synthesize", "respond")
@@ -0,0 +1,197 @@
+"""In-process background jobs with ids, status polling, deduplication and periodic scheduling."""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from app import consolidation, rag, reflection
+from app.config import settings
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+ACTIVE = {QUEUED, RUNNING}
+
+
+@dataclass(frozen=True)
+class Task:
+    fn: Callable[..., Any]
+    skip_on: Tuple[Type[BaseException], ...] = ()
+
+
+def _rag_index(dir: Optional[str] = None) -> Dict[str, Any]:
+    return asdict(rag.build_index(Path(dir) if dir else settings.docs_dir))
+
+
+TASKS: Dict[str, Task] = {
+    "reflection": Task(reflection.run_reflection, skip_on=(reflection.NoNewEpisodes,)),
+    "consolidation": Task(lambda **params: consolidation.consolidate(**params).to_dict()),
+    "rag-index": Task(_rag_index),
+}
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = QUEUED
+    dedupe_key: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobManager:
+    """Runs callables on a small worker pool and keeps their status for polling.
+
+    Submitting a job whose ``dedupe_key`` matches a queued or running job
+    returns that job instead of starting another, so scheduled and manual
+    runs never pile up. Exceptions listed in ``skip_on`` mark a job
+    ``skipped`` (nothing to do) rather than ``failed``. The newest
+    ``max_history`` jobs are kept.
+    """
+
+    def __init__(self, workers: int = 1, max_history: int = 200) -> None:
+        self.workers = max(1, workers)
+        self.max_history = max_history
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, str] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._schedules: Dict[str, threading.Thread] = {}
+        self.start()
+
+    def start(self) -> None:
+        """Create the worker pool; after ``shutdown`` this starts a fresh pool and schedule set."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            self._stop = threading.Event()
+            self._schedules = {}
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., Any],
+        dedupe_key: Optional[str] = None,
+        skip_on: Tuple[Type[BaseException], ...] = (),
+        **params: Any,
+    ) -> Tuple[Job, bool]:
+        """Queue ``fn(**params)``; returns the job and whether it was newly created.
+
+        Raises ``RuntimeError`` after ``shutdown``; the job is only recorded
+        once the pool has accepted it.
+        """
+        with self._lock:
+            existing = self._jobs.get(self._active.get(dedupe_key, "")) if dedupe_key else None
+            if existing is not None and existing.status in ACTIVE:
+                return existing, False
+            if self._executor is None:
+                raise RuntimeError("Job manager is shut down")
+            job = Job(id=uuid.uuid4().hex, kind=kind, dedupe_key=dedupe_key, params=params)
+            # _run takes the lock first, so it cannot observe the job before it is registered.
+            self._futures[job.id] = self._executor.submit(self._run, job, fn, skip_on)
+            self._jobs[job.id] = job
+            if dedupe_key:
+                self._active[dedupe_key] = job.id
+            self._trim()
+        return job, True
+
+    def enqueue(self, kind: str, **params: Any) -> Tuple[Job, bool]:
+        """Submit a registered task; at most one job per kind is queued or running at a time."""
+        task = TASKS[kind]
+        return self.submit(kind, task.fn, dedupe_key=kind, skip_on=task.skip_on, **params)
+
+    def _run(self, job: Job, fn: Callable[..., Any], skip_on: Tuple[Type[BaseException], ...]) -> None:
+        with self._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = fn(**job.params)
+        except skip_on as exc:
+            status, result, error = SKIPPED, None, str(exc)
+        except Exception as exc:
+            status, result, error = FAILED, None, str(exc)
+        else:
+            status, error = SUCCEEDED, None
+        with self._lock:
+            job.status, job.result, job.error = status, result, error
+            self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        self._futures.pop(job.id, None)
+        if job.dedupe_key and self._active.get(job.dedupe_key) == job.id:
+            del self._active[job.dedupe_key]
+
+    def _trim(self) -> None:
+        while len(self._jobs) > self.max_history:
+            oldest = next((job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, limit: int = 20) -> List[Job]:
+        """Most recent jobs first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))[:limit]
+
+    def schedule(self, kind: str, interval: float, **params: Any) -> Optional[threading.Thread]:
+        """Enqueue task ``kind`` every ``interval`` seconds until ``shutdown``."""
+        with self._lock:
+            if interval <= 0 or kind in self._schedules or self._executor is None:
+                return self._schedules.get(kind)
+            stop = self._stop
+
+            def loop() -> None:
+                while not stop.wait(interval):
+                    try:
+                        self.enqueue(kind, **params)
+                    except RuntimeError:
+                        break
+
+            thread = threading.Thread(target=loop, name=f"schedule-{kind}", daemon=True)
+            self._schedules[kind] = thread
+        thread.start()
+        return thread
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop schedules and cancel queued jobs; a running job finishes in the background."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._stop.set()
+            self._schedules = {}
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            for job_id, future in list(self._futures.items()):
+                job = self._jobs.get(job_id)
+                if future.cancelled() and job is not None and job.status == QUEUED:
+                    job.status, job.error = CANCELLED, "Job manager shut down before the job started"
+                    self._finish(job)
+
+
+__all__ = ["Job", "JobManager", "TASKS", "Task", "QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "SKIPPED", "CANCELLED"]
@@ -0,0 +1,150 @@
+"""Array-backed BM25 inverted index used alongside the dense FAISS store.
+
+On disk the index is a handful of ``.npy`` arrays (sorted fixed-width term
+table, posting offsets, doc ids, term frequencies and document lengths), all
+opened with ``mmap_mode="r"`` so queries touch only the postings they need.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import shutil
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+MAX_TERM_BYTES = 48
+TOKEN_RE = re.compile(r"\w+(?:[.\-:/]\w+)*")
+PART_RE = re.compile(r"[^\W_]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens that keep identifiers such as ``tools_web.crawl`` or ``E1234`` intact.
+
+    Compound identifiers are emitted whole and also split into their parts so a
+    query for either form matches.
+    """
+    tokens: List[str] = []
+    for match in TOKEN_RE.findall(text.lower()):
+        if match not in STOPWORDS:
+            tokens.append(match)
+        parts = PART_RE.findall(match)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in STOPWORDS)
+    return [token.encode("utf-8")[:MAX_TERM_BYTES].decode("utf-8", errors="ignore") for token in tokens]
+
+
+class BM25Builder:
+    """Accumulates postings as documents stream in; ids follow insertion order."""
+
+    def __init__(self) -> None:
+        self._doc_ids: Dict[str, array] = defaultdict(lambda: array("I"))
+        self._tfs: Dict[str, array] = defaultdict(lambda: array("H"))
+        self._doc_lens = array("I")
+
+    def add(self, text: str) -> int:
+        doc_id = len(self._doc_lens)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._doc_ids[term].append(doc_id)
+            self._tfs[term].append(min(tf, 65535))
+        self._doc_lens.append(sum(counts.values()))
+        return doc_id
+
+    def add_many(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+    def write(self, directory: Path) -> None:
+        """Write the index beside ``directory`` and swap it in atomically."""
+        tmp = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        terms = sorted(self._doc_ids)
+        offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(self._doc_ids[term]) for term in terms], dtype=np.uint64)
+        postings = np.concatenate([np.frombuffer(self._doc_ids[t], dtype=np.uint32) for t in terms] or [np.zeros(0, np.uint32)])
+        tfs = np.concatenate([np.frombuffer(self._tfs[t], dtype=np.uint16) for t in terms] or [np.zeros(0, np.uint16)])
+        doc_lens = np.frombuffer(self._doc_lens, dtype=np.uint32)
+
+        np.save(tmp / "terms.npy", np.array([t.encode("utf-8") for t in terms], dtype=f"S{MAX_TERM_BYTES}"))
+        np.save(tmp / "offsets.npy", offsets)
+        np.save(tmp / "postings.npy", postings)
+        np.save(tmp / "tfs.npy", tfs)
+        np.save(tmp / "doc_lens.npy", doc_lens)
+        stats = {"documents": int(len(doc_lens)), "avgdl": float(doc_lens.mean()) if len(doc_lens) else 0.0}
+        (tmp / "stats.json").write_text(json.dumps(stats), encoding="utf-8")
+
+        backup = directory.with_name(directory.name + ".old")
+        shutil.rmtree(backup, ignore_errors=True)
+        if directory.exists():
+            directory.rename(backup)
+        tmp.rename(directory)
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+class BM25Index:
+    """Read-only, memory-mapped view over an index written by :class:`BM25Builder`."""
+
+    def __init__(self, directory: Path, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._terms = np.load(directory / "terms.npy", mmap_mode="r")
+        self._offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        self._postings = np.load(directory / "postings.npy", mmap_mode="r")
+        self._tfs = np.load(directory / "tfs.npy", mmap_mode="r")
+        self._doc_lens = np.load(directory / "doc_lens.npy", mmap_mode="r")
+        stats = json.loads((directory / "stats.json").read_text(encoding="utf-8"))
+        self.documents = int(stats["documents"])
+        self.avgdl = float(stats["avgdl"]) or 1.0
+
+    def _postings_for(self, term: str) -> Tuple[np.ndarray, np.ndarray] | None:
+        key = term.encode("utf-8")
+        position = int(np.searchsorted(self._terms, key))
+        if position >= len(self._terms) or self._terms[position] != key:
+            return None
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return self._postings[start:end], self._tfs[start:end]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(doc_id, score)`` pairs, best first."""
+        ids: List[np.ndarray] = []
+        scores: List[np.ndarray] = []
+        for term in set(tokenize(query)):
+            found = self._postings_for(term)
+            if found is None:
+                continue
+            doc_ids, tfs = found
+            df = len(doc_ids)
+            idf = math.log(1.0 + (self.documents - df + 0.5) / (df + 0.5))
+            tf = tfs.astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * self._doc_lens[doc_ids] / self.avgdl)
+            ids.append(np.asarray(doc_ids))
+            scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+        if not ids:
+            return []
+        unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        top = np.argpartition(-totals, k)[:k] if len(totals) > k else np.arange(len(totals))
+        top = top[np.argsort(-totals[top], kind="stable")]
+        return [(int(unique[i]), float(totals[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists with RRF: ``score(d) = sum(1 / (k + rank))``."""
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+__all__ = ["tokenize", "BM25Builder", "BM25Index", "reciprocal_rank_fusion"]
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 import json
+import math
+import os
+import threading
 import time
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
@@ -19,6 +24,12 @@ INDEX_FILE = MEMORY_DIR / "episodic.faiss"
 META_FILE = MEMORY_DIR / "episodes.json"
 LOG_FILE = MEMORY_DIR / "episodes.jsonl"
 
+TAIL_BLOCK = 64 * 1024
+PLACEHOLDER_REPLIES = {"Unable to generate response at this time.", "No answer generated."}
+
+_CACHE: Dict[str, Any] = {}
+_LOCK = threading.RLock()
+
 
 @dataclass
 class Episode:
@@ -31,22 +42,136 @@ class Episode:
     meta: Dict[str, Any]
 
 
+@dataclass
+class EpisodeAttributes:
+    """Per-row filter columns aligned with the FAISS ids, so searches never scan metadata."""
+
+    timestamps: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    valid: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+    mode_codes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int16))
+    modes: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_metadata(cls, metadata: Sequence[Dict[str, Any]]) -> "EpisodeAttributes":
+        return cls().extended(metadata)
+
+    def extended(self, episodes: Sequence[Dict[str, Any]]) -> "EpisodeAttributes":
+        """A copy with ``episodes`` appended; ``self`` is left untouched for concurrent readers."""
+        modes = dict(self.modes)
+        codes = [modes.setdefault(episode.get("mode") or "", len(modes)) for episode in episodes]
+        return EpisodeAttributes(
+            timestamps=np.concatenate([self.timestamps, [float(e.get("timestamp") or 0.0) for e in episodes]]),
+            valid=np.concatenate([self.valid, np.array([is_usable(e) for e in episodes], dtype=bool)]),
+            mode_codes=np.concatenate([self.mode_codes, np.array(codes, dtype=np.int16)]),
+            modes=modes,
+        )
+
+    def mask(self, mode: Optional[str] = None, since: Optional[float] = None, include_failed: bool = False) -> np.ndarray:
+        selected = np.ones(len(self.timestamps), dtype=bool) if include_failed else self.valid.copy()
+        if mode is not None:
+            code = self.modes.get(mode)
+            if code is None:
+                return np.zeros(len(self.timestamps), dtype=bool)
+            selected &= self.mode_codes == code
+        if since is not None:
+            selected &= self.timestamps >= since
+        return selected
+
+
+def is_usable(episode: Dict[str, Any]) -> bool:
+    """False for empty, failed or placeholder replies that should never be recalled."""
+    response = (episode.get("response") or "").strip()
+    meta = episode.get("meta") or {}
+    return bool(response) and not meta.get("generation_error") and response not in PLACEHOLDER_REPLIES
+
+
 def _ensure_dirs() -> None:
     MEMORY_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _cache_key() -> Tuple[int, int]:
+    return INDEX_FILE.stat().st_mtime_ns, META_FILE.stat().st_mtime_ns
+
+
 def _load_index() -> Tuple[faiss.Index | None, List[Dict[str, Any]]]:
+    """Return the episodic index, reusing the loaded copy until the files change."""
     if not INDEX_FILE.exists() or not META_FILE.exists():
         return None, []
-    index = faiss.read_index(str(INDEX_FILE))
-    metadata: List[Dict[str, Any]] = json.loads(META_FILE.read_text(encoding="utf-8"))
-    return index, metadata
+    with _LOCK:
+        key = _cache_key()
+        if _CACHE.get("key") != key:
+            index = faiss.read_index(str(INDEX_FILE))
+            metadata: List[Dict[str, Any]] = json.loads(META_FILE.read_text(encoding="utf-8"))
+            _CACHE.update(key=key, index=index, metadata=metadata, attrs=EpisodeAttributes.from_metadata(metadata))
+        return _CACHE["index"], _CACHE["metadata"]
+
+
+def _attributes() -> EpisodeAttributes:
+    """Filter columns for the currently loaded index (call after ``_load_index``)."""
+    with _LOCK:
+        return _CACHE.get("attrs") or EpisodeAttributes()
+
+
+def _snapshot() -> Tuple[faiss.Index | None, List[Dict[str, Any]], EpisodeAttributes]:
+    """The loaded index, metadata and filter columns as one consistent set.
+
+    Writers never modify published objects (they build copies and swap them
+    in), so the snapshot can be searched without holding the lock.
+    """
+    with _LOCK:
+        index, metadata = _load_index()
+        return index, metadata, _attributes()
+
+
+def _write_index(
+    index: faiss.Index, metadata: List[Dict[str, Any]], attrs: Optional[EpisodeAttributes] = None
+) -> None:
+    """Persist ``index``/``metadata`` via temporary files, then publish them to the cache.
+
+    A failed write leaves the previous files and cached objects in place.
+    """
+    with _LOCK:
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        index_tmp, meta_tmp = INDEX_FILE.with_suffix(".faiss.tmp"), META_FILE.with_suffix(".json.tmp")
+        faiss.write_index(index, str(index_tmp))
+        meta_tmp.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(index_tmp, INDEX_FILE)
+        os.replace(meta_tmp, META_FILE)
+        attrs = attrs if attrs is not None else EpisodeAttributes.from_metadata(metadata)
+        _CACHE.update(key=_cache_key(), index=index, metadata=metadata, attrs=attrs)
+
+
+def clear_cache() -> None:
+    """Drop the in-process copy of the episodic index."""
+    with _LOCK:
+        _CACHE.clear()
+
+
+@contextmanager
+def use_store(directory: Path) -> Iterator[Path]:
+    """Point episodic memory at ``directory`` until the block exits, then restore the configured store.
+
+    Process-wide: every caller records to and searches the temporary store
+    meanwhile, so use it from tools like the evaluation runner, not a live server.
+    """
+    global MEMORY_DIR, INDEX_FILE, META_FILE, LOG_FILE
+    with _LOCK:
+        saved = MEMORY_DIR, INDEX_FILE, META_FILE, LOG_FILE
+        MEMORY_DIR = Path(directory)
+        INDEX_FILE, META_FILE, LOG_FILE = (MEMORY_DIR / path.name for path in saved[1:])
+        _CACHE.clear()
+    try:
+        yield MEMORY_DIR
+    finally:
+        with _LOCK:
+            MEMORY_DIR, INDEX_FILE, META_FILE, LOG_FILE = saved
+            _CACHE.clear()
 
 
-def _write_index(index: faiss.Index, metadata: List[Dict[str, Any]]) -> None:
-    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
-    faiss.write_index(index, str(INDEX_FILE))
-    META_FILE.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+def warm_index() -> int:
+    """Load episodic memory ahead of the first search and return its size."""
+    _, metadata = _load_index()
+    return len(metadata)
 
 
 def record_episode(query: str, response: str, mode: str, sources: List[str], meta: Dict[str, Any]) -> None:
@@ -60,16 +185,6 @@ def record_episode(query: str, response: str, mode: str, sources: List[str], met
     faiss.normalize_L2(embedding)
     dim = embedding.shape[1]
 
-    index, metadata = _load_index()
-    if index is None:
-        index = faiss.IndexFlatIP(dim)
-    elif index.d != dim:
-        # rebuild index if dimensionality changed
-        index = faiss.IndexFlatIP(dim)
-        metadata = []
-
-    index.add(embedding)
-
     episode: Dict[str, Any] = {
         "episode_id": uuid.uuid4().hex,
         "timestamp": time.time(),
@@ -79,47 +194,160 @@ def record_episode(query: str, response: str, mode: str, sources: List[str], met
         "sources": sources,
         "meta": meta,
     }
-    metadata.append(episode)
-    _write_index(index, metadata)
+    with _LOCK:
+        index, metadata, attrs = _snapshot()
+        if index is None or index.d != dim:
+            # start afresh (also when the embedding dimensionality changed)
+            index, metadata, attrs = faiss.IndexFlatIP(dim), [], EpisodeAttributes()
+        else:
+            # Copy rather than append in place: searches may be reading the cached objects,
+            # and the cache must keep matching the files if the write below fails.
+            index = faiss.clone_index(index)
+
+        index.add(embedding)
+        _write_index(index, metadata + [episode], attrs.extended([episode]))
 
-    with LOG_FILE.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(episode, ensure_ascii=False) + "\n")
+        with LOG_FILE.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(episode, ensure_ascii=False) + "\n")
 
 
-def search_memory(query: str, k: int = 3) -> List[Dict[str, Any]]:
+def search_memory(
+    query: str, k: int = 3, mode: Optional[str] = None, max_age: Optional[float] = None
+) -> List[Dict[str, Any]]:
     """Return similar prior episodes for the given prompt."""
-    if not query:
-        return []
-    index, metadata = _load_index()
+    return search_memory_batch([query], k=k, mode=mode, max_age=max_age)[0]
+
+
+def _decay(ages: np.ndarray, half_life: float) -> np.ndarray:
+    return np.exp(-math.log(2) * np.maximum(ages, 0.0) / half_life)
+
+
+def search_memory_batch(
+    queries: List[str],
+    k: int = 3,
+    mode: Optional[str] = None,
+    max_age: Optional[float] = None,
+    include_failed: bool = False,
+) -> List[List[Dict[str, Any]]]:
+    """Top ``k`` usable episodes per prompt, filtered inside the index and blended with recency.
+
+    Mode, age (``max_age`` seconds) and failed/placeholder replies are applied
+    as a FAISS ``IDSelectorBitmap`` built from precomputed attribute columns,
+    so every returned neighbour already qualifies. When time decay is on, the
+    search over-fetches ``MEMORY_OVERFETCH`` x ``k`` candidates (capped at the
+    number that pass the filter) and re-ranks them by
+    ``(1 - w) * similarity + w * 0.5 ** (age / half_life)``. All prompts share
+    one encoder pass and one multi-vector search.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+    rows = [i for i, query in enumerate(queries) if query]
+    if not rows:
+        return results
+    index, metadata, attrs = _snapshot()
     if index is None or not metadata:
-        return []
+        return results
+
+    now = time.time()
+    allowed = attrs.mask(mode=mode, since=now - max_age if max_age else None, include_failed=include_failed)
+    allowed = allowed[: min(index.ntotal, len(metadata))]
+    candidates = int(allowed.sum())
+    if candidates == 0:
+        return results
+    weight = settings.memory_decay_weight if settings.memory_decay_half_life > 0 else 0.0
+    fetch = min(candidates, k * max(1, settings.memory_overfetch) if weight else k)
 
     encoder = get_encoder(DEFAULT_EMBED_MODEL)
-    vector = encoder.encode([query], convert_to_numpy=True)
-    faiss.normalize_L2(vector)
-    scores, indices = index.search(vector, k)
+    vectors = encoder.encode([queries[i] for i in rows], convert_to_numpy=True)
+    faiss.normalize_L2(vectors)
+    bitmap = np.packbits(allowed, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(allowed), faiss.swig_ptr(bitmap))
+    scores, indices = index.search(vectors, fetch, params=faiss.SearchParameters(sel=selector))
 
-    hits: List[Dict[str, Any]] = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx == -1 or idx >= len(metadata):
-            continue
-        episode = metadata[idx].copy()
-        episode["score"] = float(score)
-        response = (episode.get("response") or "").strip()
-        meta = episode.get("meta") or {}
-        if not response:
-            continue
-        if meta.get("generation_error"):
+    for row, target in enumerate(rows):
+        found = indices[row] >= 0
+        ids, similarity = indices[row][found], scores[row][found]
+        blended = similarity
+        if weight:
+            recency = _decay(now - attrs.timestamps[ids], settings.memory_decay_half_life)
+            blended = (1 - weight) * similarity + weight * recency
+        for position in np.argsort(-blended, kind="stable")[:k]:
+            episode = metadata[ids[position]].copy()
+            episode["score"] = float(blended[position])
+            episode["similarity"] = float(similarity[position])
+            results[target].append(episode)
+    return results
+
+
+def _reverse_lines(path: Path, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(offset, line)`` from ``path`` newest first, reading ``TAIL_BLOCK`` bytes at a time.
+
+    Only lines that start before byte ``end`` (default: the current end of file)
+    are read, so memory stays bounded by the block size plus one line.
+    """
+    with path.open("rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        position = fh.tell() if end is None else min(end, fh.tell())
+        carry = b""
+        while position > 0:
+            size = min(TAIL_BLOCK, position)
+            position -= size
+            fh.seek(position)
+            pieces = (fh.read(size) + carry).split(b"\n")
+            carry = pieces.pop(0)
+            offset = position + len(carry) + 1
+            starts = []
+            for piece in pieces:
+                starts.append(offset)
+                offset += len(piece) + 1
+            for start, piece in zip(reversed(starts), reversed(pieces)):
+                if piece.strip():
+                    yield start, piece
+        if carry.strip():
+            yield 0, carry
+
+
+def load_page(limit: int = 10, cursor: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Return up to ``limit`` episodes newest first and the cursor for the next (older) page.
+
+    Reads the append-only ``episodes.jsonl`` log backwards, so a page costs
+    O(limit) regardless of history size. ``cursor`` is the byte offset returned
+    by the previous page; the next cursor is None once the log is exhausted.
+    A line still being appended (not yet valid JSON) is skipped.
+    """
+    if limit <= 0 or not LOG_FILE.exists():
+        return [], None
+    episodes: List[Dict[str, Any]] = []
+    for offset, line in _reverse_lines(LOG_FILE, end=cursor):
+        try:
+            episodes.append(json.loads(line))
+        except ValueError:
             continue
-        if response in {"Unable to generate response at this time.", "No answer generated."}:
+        if len(episodes) == limit:
+            return episodes, offset or None
+    return episodes, None
+
+
+def load_since(since: float, limit: int = 10) -> List[Dict[str, Any]]:
+    """The oldest ``limit`` episodes recorded after ``since``, oldest first.
+
+    Reads the log backwards until the first episode at or before ``since``,
+    keeping only the last ``limit`` seen, so a caller that advances ``since``
+    to the newest returned timestamp walks the whole uncovered range in order.
+    """
+    if limit <= 0 or not LOG_FILE.exists():
+        return []
+    oldest: Deque[Dict[str, Any]] = deque(maxlen=limit)
+    for _, line in _reverse_lines(LOG_FILE):
+        try:
+            episode = json.loads(line)
+        except ValueError:
             continue
-        hits.append(episode)
-    return hits
+        if episode.get("timestamp", 0.0) <= since:
+            break
+        oldest.append(episode)
+    return list(reversed(oldest))
 
 
 def load_recent(limit: int = 10) -> List[Dict[str, Any]]:
-    """Load the most recent episodes from the JSON metadata."""
-    _, metadata = _load_index()
-    if not metadata:
-        return []
-    return sorted(metadata, key=lambda item: item.get("timestamp", 0), reverse=True)[:limit]
+    """Load the most recent episodes from the episode log."""
+    return load_page(limit)[0]
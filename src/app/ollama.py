@@ -1,12 +1,18 @@
 """Thin HTTP client around the Ollama REST interface."""
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Dict, Generator, Iterable
+import threading
+import time
+import weakref
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Iterable, List, Tuple
 
 import httpx
 from tenacity import RetryError, retry, stop_after_attempt, wait_exponential
 
+from .admission import get_controller
+from .backends import BackendPool, get_pool
 from .config import settings
 
 DEFAULT_TIMEOUT = 60
@@ -18,9 +24,58 @@ class OllamaError(RuntimeError):
 
 class OllamaClient:
     def __init__(self, base_url: str | None = None, model: str | None = None) -> None:
-        self.base_url = (base_url or settings.ollama_base_url).rstrip("/")
+        # An explicit base_url pins the client to that instance; otherwise calls are balanced across the shared pool.
+        self.pool = BackendPool([base_url]) if base_url else get_pool()
+        self.base_url = self.pool.backends[0].url
+        self._call = threading.local()
         self.model = model or settings.ollama_model
         self._client = httpx.Client(timeout=DEFAULT_TIMEOUT)
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._async_transport: httpx.AsyncBaseTransport | None = None
+
+    @property
+    def last_queue_time(self) -> float:
+        """Seconds the calling thread's most recent call waited for admission."""
+        return getattr(self._call, "queue_time", 0.0)
+
+    @last_queue_time.setter
+    def last_queue_time(self, value: float) -> None:
+        self._call.queue_time = value
+
+    @property
+    def last_backend(self) -> str | None:
+        """Backend that served the calling thread's most recent call."""
+        return getattr(self._call, "backend", None)
+
+    @last_backend.setter
+    def last_backend(self, value: str | None) -> None:
+        self._call.backend = value
+
+    def close(self) -> None:
+        """Close the sync client and every per-loop async client on the loop that owns it.
+
+        Clients whose loop has already been closed went down with it.
+        """
+        self._client.close()
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, client in list(self._async_clients.items()):
+            self._async_clients.pop(loop, None)
+            if loop.is_closed() or client.is_closed:
+                continue
+            if loop is current:
+                loop.create_task(client.aclose())
+            elif loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=DEFAULT_TIMEOUT)
+                except Exception:  # pragma: no cover - best effort on shutdown
+                    pass
+            else:
+                loop.run_until_complete(client.aclose())
 
     def _raise_for_status(self, response: httpx.Response) -> None:
         try:
@@ -28,40 +83,219 @@ class OllamaClient:
         except httpx.HTTPStatusError as exc:  # pragma: no cover - network failure details
             raise OllamaError(f"Ollama request failed: {exc}") from exc
 
-    def _payload(self, **overrides: Any) -> Dict[str, Any]:
+    def _payload(
+        self,
+        model: str | None = None,
+        options: Dict[str, Any] | None = None,
+        keep_alive: str | None = None,
+        **overrides: Any,
+    ) -> Dict[str, Any]:
+        base_options: Dict[str, Any] = {
+            "temperature": settings.temperature,
+            "num_ctx": settings.num_ctx,
+        }
+        for name in ("num_predict", "num_thread", "num_batch"):
+            value = getattr(settings, f"ollama_{name}")
+            if value is not None:
+                base_options[name] = value
+        base_options.update(options or {})
         payload = {
-            "model": self.model,
-            "options": {
-                "temperature": settings.temperature,
-                "num_ctx": settings.num_ctx,
-            },
+            "model": model or self.model,
+            "options": base_options,
+            "keep_alive": keep_alive or settings.ollama_keep_alive,
         }
         payload.update(overrides)
         return payload
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=8), stop=stop_after_attempt(3))
-    def _post(self, path: str, json_payload: Dict[str, Any], stream: bool = False) -> httpx.Response:
-        url = f"{self.base_url}{path}"
+    def _send(self, url: str, json_payload: Dict[str, Any], stream: bool) -> httpx.Response:
         if stream:
             request = self._client.build_request("POST", url, json=json_payload)
-            response = self._client.send(request, stream=True)
-        else:
-            response = self._client.post(url, json=json_payload)
-        self._raise_for_status(response)
-        return response
-
-    def generate(self, messages: Iterable[Dict[str, Any]], stream: bool = False) -> Any:
-        payload = self._payload(messages=list(messages), stream=stream)
+            return self._client.send(request, stream=True)
+        return self._client.post(url, json=json_payload)
+
+    @retry(wait=wait_exponential(multiplier=1, min=1, max=8), stop=stop_after_attempt(3))
+    def _post(
+        self, path: str, json_payload: Dict[str, Any], stream: bool = False
+    ) -> Tuple[httpx.Response, Callable[[], None]]:
+        """POST to the best available backend, failing over on connection errors and 5xx.
+
+        Returns the response and a ``done`` callback that hands the backend
+        slot back to the pool; call it once the body has been consumed.
+        """
+        model = json_payload.get("model", self.model)
+        tried: set[str] = set()
+        last_error: Exception | None = None
+        while True:
+            backend = self.pool.acquire(model, exclude=tried)
+            if backend is None:
+                raise last_error or OllamaError("No Ollama backend available")
+            tried.add(backend.url)
+            start = time.perf_counter()
+            try:
+                response = self._send(f"{backend.url}{path}", json_payload, stream)
+                if response.status_code >= 500:
+                    response.close()
+                    raise OllamaError(f"Ollama backend {backend.url} returned {response.status_code}")
+            except (httpx.TransportError, OllamaError) as exc:
+                self.pool.fail(backend)
+                last_error = exc
+                continue
+            try:
+                self._raise_for_status(response)
+            except OllamaError:
+                self.pool.release(backend)
+                raise
+            latency = time.perf_counter() - start
+            self.last_backend = backend.url
+            return response, lambda: self.pool.release(backend, model, latency)
+
+    def generate(
+        self,
+        messages: Iterable[Dict[str, Any]],
+        stream: bool = False,
+        *,
+        model: str | None = None,
+        options: Dict[str, Any] | None = None,
+        keep_alive: str | None = None,
+    ) -> Any:
+        """Chat completion, admitted through the shared admission controller.
+
+        ``model``, ``options`` (merged over the configured defaults) and
+        ``keep_alive`` override the client settings for this call only.
+        Raises ``AdmissionError`` when the queue is full or the wait times out.
+        A streaming call is admitted when first iterated and keeps its slot
+        until the stream is exhausted or closed.
+        """
+        payload = self._payload(model, options, keep_alive, messages=list(messages), stream=stream)
+        if stream:
+            return self._admitted_stream(payload)
+        response, done = self._admitted_post(payload)
+        try:
+            return response.json()
+        finally:
+            done()
+
+    def _admitted_post(
+        self, payload: Dict[str, Any], stream: bool = False
+    ) -> Tuple[httpx.Response, Callable[[], None]]:
+        """Take an admission slot, then POST; the returned callback releases the backend and the slot."""
+        controller = get_controller()
+        self.last_queue_time = controller.acquire()
         try:
-            response = self._post("/api/chat", payload, stream=stream)
+            response, done = self._post("/api/chat", payload, stream=stream)
         except RetryError as exc:  # pragma: no cover - network
+            controller.release()
             raise OllamaError("Exceeded retries when contacting Ollama") from exc
+        except BaseException:
+            controller.release()
+            raise
 
-        if stream:
-            return self._streaming_chunks(response)
-        return response.json()
+        def release() -> None:
+            done()
+            controller.release()
+
+        return response, release
+
+    def _admitted_stream(self, payload: Dict[str, Any]) -> Generator[Dict[str, Any], None, None]:
+        # Slots are taken on the first ``next()`` so a stream that is never iterated holds nothing.
+        response, release = self._admitted_post(payload, stream=True)
+        yield from self._streaming_chunks(response, release=release)
+
+    def preload(self, keep_alive: str | None = None, model: str | None = None) -> Dict[str, Any]:
+        """Load the model into memory without generating any tokens."""
+        payload = {"model": model or self.model, "messages": [], "keep_alive": keep_alive or settings.ollama_keep_alive}
+        try:
+            with get_controller().slot("background"):
+                response, done = self._post("/api/chat", payload)
+        except RetryError as exc:  # pragma: no cover - network
+            raise OllamaError("Exceeded retries when preloading Ollama model") from exc
+        try:
+            return response.json()
+        finally:
+            done()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Async connections belong to the loop that opened them, so keep one client per running loop.
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, transport=self._async_transport)
+            self._async_clients[loop] = client
+        return client
+
+    async def astream(
+        self,
+        messages: Iterable[Dict[str, Any]],
+        *,
+        model: str | None = None,
+        options: Dict[str, Any] | None = None,
+        keep_alive: str | None = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream NDJSON chat chunks over ``httpx.AsyncClient`` without tying up a worker thread.
+
+        Admission, backend selection and failover match ``generate``; the last
+        chunk (``done: true``) carries Ollama's token counts and timings.
+        """
+        payload = self._payload(model, options, keep_alive, messages=list(messages), stream=True)
+        controller = get_controller()
+        acquiring = asyncio.ensure_future(asyncio.to_thread(controller.acquire))
+        try:
+            self.last_queue_time = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted; hand its slot back once it is granted.
+            acquiring.add_done_callback(
+                lambda future: controller.release() if not future.cancelled() and not future.exception() else None
+            )
+            raise
+        try:
+            client = self._get_async_client()
+            tried: set[str] = set()
+            last_error: Exception | None = None
+            while True:
+                backend = self.pool.acquire(payload["model"], exclude=tried)
+                if backend is None:
+                    raise last_error or OllamaError("No Ollama backend available")
+                tried.add(backend.url)
+                start = time.perf_counter()
+                try:
+                    request = client.build_request("POST", f"{backend.url}/api/chat", json=payload)
+                    response = await client.send(request, stream=True)
+                except httpx.TransportError as exc:
+                    self.pool.fail(backend)
+                    last_error = exc
+                    continue
+                if response.status_code >= 500:
+                    await response.aclose()
+                    self.pool.fail(backend)
+                    last_error = OllamaError(f"Ollama backend {backend.url} returned {response.status_code}")
+                    continue
+                break
+            latency = time.perf_counter() - start
+            self.last_backend = backend.url
+            try:
+                self._raise_for_status(response)
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+            finally:
+                await response.aclose()
+                self.pool.release(backend, payload["model"], latency)
+        finally:
+            controller.release()
+
+    async def agenerate(self, messages: Iterable[Dict[str, Any]], **overrides: Any) -> Dict[str, Any]:
+        """Async counterpart of ``generate(stream=False)`` built on ``astream``."""
+        parts: List[str] = []
+        final: Dict[str, Any] = {}
+        async for chunk in self.astream(messages, **overrides):
+            parts.append(chunk.get("message", {}).get("content", ""))
+            if chunk.get("done"):
+                final = chunk
+        return {**final, "message": {"role": "assistant", "content": "".join(parts)}}
 
-    def _streaming_chunks(self, response: httpx.Response) -> Generator[Dict[str, Any], None, None]:
+    def _streaming_chunks(
+        self, response: httpx.Response, release: Callable[[], None] | None = None
+    ) -> Generator[Dict[str, Any], None, None]:
         try:
             for line in response.iter_lines():
                 if not line:
@@ -69,7 +303,56 @@ class OllamaClient:
                 yield json.loads(line)
         finally:  # pragma: no branch
             response.close()
+            if release:
+                release()
+
+
+def node_overrides(node: str) -> Dict[str, Any]:
+    """``generate`` keyword overrides configured for a graph node or job (empty when none are set)."""
+    overrides: Dict[str, Any] = {}
+    if settings.ollama_node_models.get(node):
+        overrides["model"] = settings.ollama_node_models[node]
+    if settings.ollama_node_options.get(node):
+        overrides["options"] = dict(settings.ollama_node_options[node])
+    return overrides
+
+
+def configured_models() -> List[str]:
+    """The default model plus every per-node model, without duplicates."""
+    return list(dict.fromkeys([settings.ollama_model, *settings.ollama_node_models.values()]))
+
+
+def timings(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Ollama's server-side timings (reported in nanoseconds) as seconds and tokens/second."""
+    data: Dict[str, Any] = {"model": response.get("model")}
+    for key in ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration"):
+        if key in response:
+            data[key.replace("_duration", "")] = response[key] / 1e9
+    for key in ("prompt_eval_count", "eval_count"):
+        if key in response:
+            data[key] = response[key]
+    if response.get("eval_count") and response.get("eval_duration"):
+        data["tokens_per_second"] = response["eval_count"] / (response["eval_duration"] / 1e9)
+    return data
+
+
+_shared_client: OllamaClient | None = None
+_shared_lock = threading.Lock()
 
 
 def get_client() -> OllamaClient:
-    return OllamaClient()
+    """Process-wide client so every caller shares one HTTP connection pool."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = OllamaClient()
+        return _shared_client
+
+
+def reset_client() -> None:
+    """Close and drop the shared client (used on shutdown)."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = None
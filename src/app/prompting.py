@@ -30,11 +30,35 @@ EXAMPLE_TOOL_CALL = {
     "args": {"query": "history of langchain", "max_results": 3},
 }
 
+ANSWER_INSTRUCTIONS = dedent(
+    """
+    Answer the question using the provided context. Cite sources by the
+    bracketed path or URL that precedes each passage. If the context does not
+    contain the answer, say so.
+    """
+).strip()
+
+# System prompts are module constants so every request shares a byte-identical
+# prefix and Ollama can reuse its KV cache; anything per-request goes last.
 DEFAULT_SYSTEM_PROMPT = f"{BASE_SYSTEM_PROMPT}\n\n{TOOL_INSTRUCTIONS}"
+SYNTHESIS_SYSTEM_PROMPT = f"{BASE_SYSTEM_PROMPT}\n\n{ANSWER_INSTRUCTIONS}"
 
 
-def build_messages(user_message: str, mode: str) -> list[dict]:
+def build_messages(user_message: str) -> list[dict]:
+    """Conversation seed; the mode travels in the graph state, not the prompt, so the system prefix never varies."""
     return [
-        {"role": "system", "content": DEFAULT_SYSTEM_PROMPT + f"\nActive mode: {mode}."},
+        {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
         {"role": "user", "content": user_message},
     ]
+
+
+def synthesis_user_prompt(question: str, context: str, mode: str) -> str:
+    """Variable part of a synthesis prompt, ordered from most to least reusable: mode, context, question."""
+    return f"Mode: {mode}\n\nContext:\n{context}\n\nQuestion: {question}"
+
+
+def build_synthesis_messages(question: str, context: str, mode: str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+        {"role": "user", "content": synthesis_user_prompt(question, context, mode)},
+    ]
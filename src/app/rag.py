@@ -2,86 +2,245 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Tuple
 
 import faiss
 import numpy as np
+from tqdm import tqdm
 
 from .config import settings
-from .embeddings import DEFAULT_EMBED_MODEL, get_encoder
+from .dedupe import NearDuplicateFilter
+from .embeddings import DEFAULT_EMBED_MODEL, get_encoder, iter_encode
+from .extractors import get_extractor, iter_extracted
+from .lexical import BM25Builder, BM25Index, reciprocal_rank_fusion
+
 INDEX_FILE = Path("data/vectorstore/index.faiss")
-META_FILE = Path("data/vectorstore/metadata.json")
+META_FILE = Path("data/vectorstore/metadata.jsonl")
+LEXICAL_DIR = Path("data/vectorstore/bm25")
+
+_INDEX_CACHE: Dict[str, object] = {}
+_INDEX_LOCK = threading.Lock()
 
 
 @dataclass
 class IndexStats:
     documents_indexed: int
     dim: int
+    chunks_indexed: int = 0
+    duplicates_skipped: int = 0
 
 
-def _load_documents(directory: Path) -> List[Tuple[str, str]]:
-    docs: List[Tuple[str, str]] = []
+def _iter_paths(directory: Path) -> Iterator[Path]:
     for path in directory.rglob("*"):
-        if path.suffix.lower() not in {".txt", ".md", ""}:
+        if get_extractor(path) is None:
             continue
         if not path.is_file():
             continue
-        content = path.read_text(encoding="utf-8", errors="ignore")
-        docs.append((str(path), content))
-    return docs
-
-
-def build_index(directory: Path | None = None) -> IndexStats:
+        yield path
+
+
+def _iter_documents(directory: Path) -> Iterator[Tuple[str, str]]:
+    """Walk ``directory`` lazily, extracting one file at a time (or across the extractor pool)."""
+    yield from iter_extracted(_iter_paths(directory))
+
+
+def _chunk_text(text: str, size: int, overlap: int) -> Iterator[str]:
+    """Split ``text`` into ~``size`` character windows, breaking on whitespace."""
+    text = text.strip()
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            split = text.rfind(" ", start + size // 2, end)
+            if split > start:
+                end = split
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= len(text):
+            break
+        next_start = max(end - overlap, start + 1)
+        boundary = text.find(" ", next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+
+
+def _iter_chunks(
+    documents: Iterable[Tuple[str, str]],
+    dedupe: NearDuplicateFilter | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield chunk records; near-duplicate chunks are skipped before they reach the encoder."""
+    for path, content in documents:
+        position = 0
+        for chunk in _chunk_text(content, settings.chunk_size, settings.chunk_overlap):
+            if dedupe is not None and dedupe.check(chunk):
+                continue
+            yield {"path": path, "chunk": position, "content": chunk}
+            position += 1
+
+
+def _batched(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_index(directory: Path | None = None, workers: int | None = None) -> IndexStats:
+    """Stream walk -> read -> chunk -> embed -> add in fixed-size batches.
+
+    Only a bounded window of chunk batches is held at once and metadata is
+    appended to disk as each batch lands, so peak memory depends on the batch
+    size rather than the corpus (the flat FAISS index itself still keeps one
+    vector per chunk). Files are written beside the live index and swapped in
+    at the end so readers never observe a half-built store.
+    """
     directory = Path(directory or settings.docs_dir)
     directory.mkdir(parents=True, exist_ok=True)
-    documents = _load_documents(directory)
-    if not documents:
-        raise RuntimeError(f"No documents found in {directory}")
+    workers = settings.index_workers if workers is None else workers
+    batch_size = settings.index_batch_size
 
-    model = get_encoder(DEFAULT_EMBED_MODEL)
-    texts = [content for _, content in documents]
-    embeddings = model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
-    dim = embeddings.shape[1]
+    pending: Deque[List[Dict[str, Any]]] = deque()
+    dedupe = NearDuplicateFilter() if settings.rag_dedupe else None
 
-    index = faiss.IndexFlatIP(dim)
-    faiss.normalize_L2(embeddings)
-    index.add(embeddings)
+    def text_batches() -> Iterator[List[str]]:
+        for batch in _batched(_iter_chunks(_iter_documents(directory), dedupe), batch_size):
+            pending.append(batch)
+            yield [item["content"] for item in batch]
 
     INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
-    faiss.write_index(index, str(INDEX_FILE))
-
-    metadata = [{"path": path, "content": content} for path, content in documents]
-    META_FILE.write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+    tmp_index = INDEX_FILE.with_name(INDEX_FILE.name + ".tmp")
+    tmp_meta = META_FILE.with_name(META_FILE.name + ".tmp")
+
+    index: faiss.Index | None = None
+    lexical = BM25Builder()
+    documents = 0
+    with tmp_meta.open("w", encoding="utf-8") as meta_fh, tqdm(unit="chunk", desc="Embedding") as progress:
+        for embeddings in iter_encode(text_batches(), DEFAULT_EMBED_MODEL, workers=workers, batch_size=batch_size):
+            batch = pending.popleft()
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            faiss.normalize_L2(embeddings)
+            if index is None:
+                index = faiss.IndexFlatIP(embeddings.shape[1])
+            index.add(embeddings)
+            for item in batch:
+                documents += item["chunk"] == 0
+                lexical.add(item["content"])
+                meta_fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+            progress.update(len(batch))
+
+    if index is None:
+        tmp_meta.unlink(missing_ok=True)
+        raise RuntimeError(f"No documents found in {directory}")
 
-    return IndexStats(documents_indexed=len(documents), dim=dim)
+    faiss.write_index(index, str(tmp_index))
+    lexical.write(LEXICAL_DIR)
+    os.replace(tmp_index, INDEX_FILE)
+    os.replace(tmp_meta, META_FILE)
+    return IndexStats(
+        documents_indexed=documents,
+        dim=index.d,
+        chunks_indexed=index.ntotal,
+        duplicates_skipped=dedupe.dropped if dedupe is not None else 0,
+    )
 
 
 def _load_index() -> Tuple[faiss.Index, List[Dict[str, str]]]:
+    """Return the on-disk index, reusing the loaded copy until the files change."""
     if not INDEX_FILE.exists() or not META_FILE.exists():
         raise RuntimeError("Vector store not built. Run rag-index first.")
-    index = faiss.read_index(str(INDEX_FILE))
-    metadata: List[Dict[str, str]] = json.loads(META_FILE.read_text(encoding="utf-8"))
-    return index, metadata
-
-
-def query_index(question: str, k: int = 4) -> List[Dict[str, str]]:
+    key = (INDEX_FILE.stat().st_mtime_ns, META_FILE.stat().st_mtime_ns)
+    with _INDEX_LOCK:
+        if _INDEX_CACHE.get("key") != key:
+            index = faiss.read_index(str(INDEX_FILE), faiss.IO_FLAG_MMAP)
+            with META_FILE.open("r", encoding="utf-8") as fh:
+                metadata: List[Dict[str, str]] = [json.loads(line) for line in fh if line.strip()]
+            _INDEX_CACHE.update(key=key, index=index, metadata=metadata)
+        return _INDEX_CACHE["index"], _INDEX_CACHE["metadata"]  # type: ignore[return-value]
+
+
+def clear_cache() -> None:
+    """Drop the in-process copies of the dense and lexical indexes."""
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
+
+
+def warm_index() -> bool:
+    """Load the vector store ahead of the first query; False when not built yet."""
+    try:
+        _load_index()
+    except RuntimeError:
+        return False
+    _load_lexical()
+    return True
+
+
+def _load_lexical() -> BM25Index | None:
+    stats_file = LEXICAL_DIR / "stats.json"
+    if not stats_file.exists():
+        return None
+    key = stats_file.stat().st_mtime_ns
+    with _INDEX_LOCK:
+        if _INDEX_CACHE.get("lexical_key") != key:
+            _INDEX_CACHE.update(lexical_key=key, lexical=BM25Index(LEXICAL_DIR))
+        return _INDEX_CACHE["lexical"]  # type: ignore[return-value]
+
+
+def query_index(question: str, k: int = 4, hybrid: bool | None = None) -> List[Dict[str, Any]]:
+    """Return the top ``k`` chunks, fusing dense and BM25 rankings with RRF when hybrid."""
+    return query_index_batch([question], k=k, hybrid=hybrid)[0]
+
+
+def query_index_batch(questions: List[str], k: int = 4, hybrid: bool | None = None) -> List[List[Dict[str, Any]]]:
+    """``query_index`` for many questions: one encoder pass and one multi-vector FAISS search.
+
+    Each hit's ``score`` is its cosine similarity to the question; hybrid
+    queries are ordered by the fused rank score, reported as ``rrf_score``.
+    """
+    if not questions:
+        return []
     model = get_encoder(DEFAULT_EMBED_MODEL)
     index, metadata = _load_index()
-    query_vec = model.encode([question], convert_to_numpy=True)
-    faiss.normalize_L2(query_vec)
-    scores, indices = index.search(query_vec, k)
-
-    hits: List[Dict[str, str]] = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx == -1:
-            continue
-        doc_meta = metadata[idx]
-        snippet = doc_meta.get("content", "")[:512]
-        hits.append({
-            "path": doc_meta.get("path"),
-            "score": float(score),
-            "snippet": snippet,
-        })
-    return hits
+    lexical = _load_lexical() if (settings.rag_hybrid if hybrid is None else hybrid) else None
+    fetch = max(k, settings.rag_candidates) if lexical is not None else k
+
+    query_vecs = model.encode(list(questions), convert_to_numpy=True)
+    faiss.normalize_L2(query_vecs)
+    scores, indices = index.search(query_vecs, fetch)
+
+    results: List[List[Dict[str, Any]]] = []
+    for row, question in enumerate(questions):
+        dense = {int(idx): float(score) for score, idx in zip(scores[row], indices[row]) if idx != -1}
+        if lexical is None:
+            ranked = list(dense.items())[:k]
+        else:
+            lexical_ids = [doc_id for doc_id, _ in lexical.search(question, fetch) if doc_id < len(metadata)]
+            ranked = reciprocal_rank_fusion([list(dense), lexical_ids], k=settings.rrf_k)[:k]
+
+        hits: List[Dict[str, Any]] = []
+        for idx, rank_score in ranked:
+            doc_meta = metadata[idx]
+            if lexical is None:
+                similarity = rank_score
+            else:
+                # BM25-only hits are outside the dense candidates; score them against their stored vector.
+                similarity = dense[idx] if idx in dense else float(query_vecs[row] @ index.reconstruct(idx))
+            hit = {
+                "id": idx,
+                "path": doc_meta.get("path"),
+                "score": similarity,
+                "snippet": doc_meta.get("content", "")[:512],
+            }
+            if lexical is not None:
+                hit["rrf_score"] = rank_score
+            hits.append(hit)
+        results.append(hits)
+    return results
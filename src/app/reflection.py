@@ -4,19 +4,55 @@ from __future__ import annotations
 import json
 import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
-from app import memory
+from app import admission, consolidation, memory
+from app.config import settings
 from app.logging import tracer
-from app.ollama import get_client
+from app.ollama import get_client, node_overrides, timings
 
-REFLECTION_LOG = Path("data/memory/reflections.jsonl")
+REFLECTION_LOG_NAME = "reflections.jsonl"
 
 
-def run_reflection(limit: int = 5) -> Dict[str, str]:
-    """Generate improvement notes over recent episodes."""
-    episodes = memory.load_recent(limit)
+class NoNewEpisodes(RuntimeError):
+    """Nothing was recorded since the last reflection."""
+
+
+def reflection_log() -> Path:
+    """Reflection records live beside the episode log, so ``memory.use_store`` redirects them too."""
+    return memory.MEMORY_DIR / REFLECTION_LOG_NAME
+
+
+def last_covered() -> float:
+    """Timestamp of the newest episode the previous reflection covered (0 when there is none)."""
+    log = reflection_log()
+    if not log.exists():
+        return 0.0
+    for _, line in memory._reverse_lines(log):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        return float(record.get("covered_until", record.get("timestamp", 0.0)))
+    return 0.0
+
+
+def run_reflection(limit: int = 5, consolidate: Optional[bool] = None, incremental: bool = True) -> Dict[str, Any]:
+    """Generate improvement notes over up to ``limit`` episodes.
+
+    When ``incremental``, the run covers the oldest ``limit`` episodes recorded
+    after the ones the previous reflection covered, so a backlog larger than
+    ``limit`` is worked through over successive runs; ``NoNewEpisodes`` is
+    raised when there are none. The first run (and ``incremental=False``)
+    covers the newest ``limit`` episodes. With ``consolidate`` (default
+    ``MEMORY_CONSOLIDATE_ON_REFLECTION``) episodic memory is consolidated
+    afterwards and the report is added to the record.
+    """
+    since = last_covered() if incremental else 0.0
+    episodes = memory.load_since(since, limit) if since else memory.load_recent(limit)
     if not episodes:
+        if since:
+            raise NoNewEpisodes("No new memory episodes since the last reflection.")
         raise RuntimeError("No memory episodes available to reflect on yet.")
 
     snippets: List[str] = []
@@ -37,26 +73,31 @@ def run_reflection(limit: int = 5) -> Dict[str, str]:
     )
 
     client = get_client()
-    with tracer.span(component="reflection", mode="offline") as span_id:
+    with tracer.span(component="reflection", mode="offline") as span_id, admission.priority("reflection"):
         response = client.generate(
             [
                 {"role": "system", "content": "You are a rigorous AI reviewer."},
                 {"role": "user", "content": prompt},
             ],
             stream=False,
+            **node_overrides("reflection"),
         )
         notes = response.get("message", {}).get("content", "")
-        tracer.append(span_id, {"event": "reflection_complete", "notes_length": len(notes)})
+        tracer.append(span_id, {"event": "reflection_complete", "notes_length": len(notes), **timings(response)})
 
     record = {
         "timestamp": time.time(),
         "notes": notes,
         "episode_count": len(episodes),
+        "covered_until": max(episode.get("timestamp", 0.0) for episode in episodes),
     }
-    REFLECTION_LOG.parent.mkdir(parents=True, exist_ok=True)
-    with REFLECTION_LOG.open("a", encoding="utf-8") as fh:
+    log = reflection_log()
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with log.open("a", encoding="utf-8") as fh:
         fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if settings.memory_consolidate_on_reflection if consolidate is None else consolidate:
+        record["consolidation"] = consolidation.consolidate().to_dict()
     return record
 
 
-__all__ = ["run_reflection"]
+__all__ = ["NoNewEpisodes", "last_covered", "reflection_log", "run_reflection"]
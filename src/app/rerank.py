@@ -0,0 +1,93 @@
+"""Optional cross-encoder re-ranking of retrieved passages."""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from .config import settings
+
+_SCORE_CACHE: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=2)
+def get_cross_encoder(model_name: str) -> Any:
+    """Return a cached cross-encoder (imported lazily; it pulls in torch)."""
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, max_length=512)
+
+
+def _cache_key(query: str, passage: str) -> Tuple[str, str]:
+    normalized = " ".join(query.lower().split())
+    return normalized, hashlib.sha1(passage.encode("utf-8")).hexdigest()
+
+
+def _cached_score(key: Tuple[str, str]) -> float | None:
+    with _CACHE_LOCK:
+        score = _SCORE_CACHE.get(key)
+        if score is not None:
+            _SCORE_CACHE.move_to_end(key)
+        return score
+
+
+def _store_score(key: Tuple[str, str], score: float) -> None:
+    with _CACHE_LOCK:
+        _SCORE_CACHE[key] = score
+        _SCORE_CACHE.move_to_end(key)
+        while len(_SCORE_CACHE) > settings.rerank_cache_size:
+            _SCORE_CACHE.popitem(last=False)
+
+
+def rerank(
+    query: str,
+    hits: List[Dict[str, Any]],
+    top_k: int,
+    budget_ms: float | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Re-order ``hits`` by cross-encoder relevance and keep the best ``top_k``.
+
+    Scores are cached per (query, passage). Uncached pairs are scored in
+    retrieval order, one batch at a time; if the latency budget runs out
+    before every candidate is scored, the scored candidates are ranked first
+    and the rest follow in their original retrieval order.
+    """
+    budget = (settings.rerank_budget_ms if budget_ms is None else budget_ms) / 1000.0
+    start = time.perf_counter()
+    keys = [_cache_key(query, hit.get("snippet") or "") for hit in hits]
+    scores: List[float | None] = [_cached_score(key) for key in keys]
+    missing = [i for i, score in enumerate(scores) if score is None]
+    info: Dict[str, Any] = {"candidates": len(hits), "cached": len(hits) - len(missing)}
+
+    if missing:
+        model = get_cross_encoder(settings.rerank_model)
+        batch_size = settings.rerank_batch_size
+        for offset in range(0, len(missing), batch_size):
+            if time.perf_counter() - start > budget:
+                info.update(reranked=False, fallback="budget")
+                break
+            batch = missing[offset : offset + batch_size]
+            pairs = [(query, hits[i].get("snippet") or "") for i in batch]
+            for i, score in zip(batch, model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)):
+                scores[i] = float(score)
+                _store_score(keys[i], float(score))
+
+    scored = [i for i, score in enumerate(scores) if score is not None]
+    unscored = [i for i, score in enumerate(scores) if score is None]
+    order = sorted(scored, key=lambda i: scores[i], reverse=True) + unscored  # type: ignore[arg-type, return-value]
+    reranked = [hits[i] if scores[i] is None else {**hits[i], "rerank_score": scores[i]} for i in order[:top_k]]
+    info.setdefault("reranked", True)
+    info.update(scored=len(scored), duration=time.perf_counter() - start)
+    return reranked, info
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _SCORE_CACHE.clear()
+
+
+__all__ = ["get_cross_encoder", "rerank", "clear_cache"]
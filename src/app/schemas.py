@@ -28,6 +28,11 @@ class ChatResponse(BaseModel):
     meta: Dict[str, Any] = Field(default_factory=dict)
 
 
+class ChatBatchRequest(BaseModel):
+    items: List[ChatRequest] = Field(max_length=1000)
+    concurrency: int = Field(default=4, ge=1, le=32)
+
+
 class RAGIndexRequest(BaseModel):
     dir: Optional[str] = Field(default=None)
 
@@ -35,6 +40,8 @@ class RAGIndexRequest(BaseModel):
 class RAGIndexResponse(BaseModel):
     documents_indexed: int
     dim: int
+    chunks_indexed: int = 0
+    duplicates_skipped: int = 0
 
 
 class RAGQueryRequest(BaseModel):
@@ -46,6 +53,15 @@ class RAGQueryResponse(BaseModel):
     results: List[Dict[str, Any]]
 
 
+class RAGQueryBatchRequest(BaseModel):
+    questions: List[str] = Field(max_length=1000)
+    k: int = Field(default=4, ge=1, le=10)
+
+
+class RAGQueryBatchResponse(BaseModel):
+    results: List[List[Dict[str, Any]]]
+
+
 class ResearchRequest(BaseModel):
     query: str
     depth: int = Field(default=1, ge=0, le=3)
@@ -53,6 +69,7 @@ class ResearchRequest(BaseModel):
 
 
 class ResearchResponse(BaseModel):
+    plan: List[str] = Field(default_factory=list)
     pages: List[Dict[str, Any]]
     synthesis: Dict[str, Any]
 
@@ -65,6 +82,14 @@ class HealthResponse(BaseModel):
     frontend_enabled: bool
     submodules: Dict[str, bool]
     agents_available: bool = False
+    admission: Dict[str, Any] = Field(default_factory=dict)
+    backends: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    timings: Dict[str, float] = Field(default_factory=dict)
+    errors: Dict[str, str] = Field(default_factory=dict)
 
 
 class NodeTrace(BaseModel):
@@ -86,12 +111,30 @@ class ToolResult(BaseModel):
 class MemoryQueryRequest(BaseModel):
     query: str
     k: int = Field(default=3, ge=1, le=10)
+    mode: Optional[str] = None
+    max_age: Optional[float] = Field(default=None, gt=0, description="Only episodes newer than this many seconds")
 
 
 class MemorySearchResponse(BaseModel):
     episodes: List[Dict[str, Any]]
 
 
+class MemoryRecentResponse(BaseModel):
+    episodes: List[Dict[str, Any]]
+    next_cursor: Optional[int] = None
+
+
+class MemoryQueryBatchRequest(BaseModel):
+    queries: List[str] = Field(max_length=1000)
+    k: int = Field(default=3, ge=1, le=10)
+    mode: Optional[str] = None
+    max_age: Optional[float] = Field(default=None, gt=0)
+
+
+class MemorySearchBatchResponse(BaseModel):
+    episodes: List[List[Dict[str, Any]]]
+
+
 class AgentsChatRequest(BaseModel):
     prompt: str
 
@@ -99,8 +142,28 @@ class AgentsChatRequest(BaseModel):
 class AgentsChatResponse(BaseModel):
     reply: str
     raw_items: List[Dict[str, Any]] = Field(default_factory=list)
+    usage: Dict[str, int] = Field(default_factory=dict)
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    deduplicated: bool = False
+
+
+class JobListResponse(BaseModel):
+    jobs: List[JobResponse]
 
 
-class ReflectionResponse(BaseModel):
-    notes: str
-    episode_count: int
+class ConsolidationRequest(BaseModel):
+    similarity: Optional[float] = Field(default=None, ge=0, le=1)
+    max_age: Optional[float] = Field(default=None, ge=0)
+    max_episodes: Optional[int] = Field(default=None, ge=0)
+    dry_run: bool = False
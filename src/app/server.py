@@ -1,52 +1,75 @@
 """FastAPI server exposing unified agent functionality."""
 from __future__ import annotations
 
+import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.adapters import (
-    AGENTS_AVAILABLE,
-    get_agents_adapter,
-    get_orchestrator,
-    get_research_adapter,
-    get_ui_adapter,
-)
+from app.adapters import AGENTS_AVAILABLE, get_agents_adapter
 from app.config import settings
+from app.container import get_container
 from app.logging import tracer
-from app import memory, rag, reflection
+from app import admission, backends, memory, rag, warmup
 from app.schemas import (
     AgentsChatRequest,
     AgentsChatResponse,
+    ChatBatchRequest,
     ChatRequest,
     ChatResponse,
+    ConsolidationRequest,
     HealthResponse,
+    JobListResponse,
+    JobResponse,
+    MemoryQueryBatchRequest,
     MemoryQueryRequest,
+    MemoryRecentResponse,
+    MemorySearchBatchResponse,
     MemorySearchResponse,
     RAGIndexRequest,
     RAGIndexResponse,
+    RAGQueryBatchRequest,
+    RAGQueryBatchResponse,
     RAGQueryRequest,
     RAGQueryResponse,
+    ReadinessResponse,
     ResearchRequest,
     ResearchResponse,
-    ReflectionResponse,
 )
 
 app = FastAPI(title="lam-agent-unified", version="0.1.0")
 
 
+@app.exception_handler(admission.AdmissionError)
+def admission_rejected(request: Request, exc: admission.AdmissionError) -> JSONResponse:
+    tracer.append("admission", {"event": "rejected", "path": request.url.path, "status": exc.status_code, "error": str(exc)})
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
 def orchestrator_dep() -> Any:
-    return get_orchestrator()
+    return get_container().orchestrator
 
 
 def research_dep() -> Any:
-    return get_research_adapter()
+    return get_container().research
 
 
 def ui_dep() -> Any:
-    return get_ui_adapter()
+    return get_container().ui
+
+
+def jobs_dep() -> Any:
+    return get_container().jobs
+
+
+def _job_response(job: Any, created: bool = True) -> JobResponse:
+    return JobResponse(**job.to_dict(), deduplicated=not created)
 
 
 def agents_dep() -> Any:
@@ -56,19 +79,29 @@ def agents_dep() -> Any:
 
 
 @app.get("/health", response_model=HealthResponse)
-def health(orchestrator=Depends(orchestrator_dep), research=Depends(research_dep), ui=Depends(ui_dep)) -> HealthResponse:
+def health() -> HealthResponse:
     return HealthResponse(
         model=settings.ollama_model,
         base_url=settings.ollama_base_url,
         web_enabled=settings.enable_web,
         frontend_enabled=settings.frontend_enabled,
-        submodules={
-            "langgraph": orchestrator.external_enabled,
-            "deerflow": research.external_enabled,
-            "copilotkit": ui.external_enabled,
-        },
+        submodules=get_container().submodules,
         agents_available=AGENTS_AVAILABLE,
+        admission=admission.get_controller().snapshot(),
+        backends=backends.get_pool().snapshot(),
+    )
+
+
+@app.get("/ready", response_model=ReadinessResponse)
+def ready() -> Any:
+    payload = ReadinessResponse(
+        ready=warmup.state.ready,
+        timings=warmup.state.timings,
+        errors=warmup.state.errors,
     )
+    if not payload.ready:
+        return JSONResponse(status_code=503, content=payload.model_dump())
+    return payload
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -77,11 +110,30 @@ def chat(request: ChatRequest, orchestrator=Depends(orchestrator_dep)) -> ChatRe
     return ChatResponse(**result)
 
 
+@app.post("/chat/batch")
+def chat_batch(request: ChatBatchRequest, orchestrator=Depends(orchestrator_dep)) -> StreamingResponse:
+    """NDJSON stream of ``{"index": i, ...ChatResponse}`` lines in completion order."""
+    items = [(item.message, item.mode) for item in request.items]
+
+    def lines() -> Iterator[str]:
+        for index, result in orchestrator.run_batch(items, concurrency=request.concurrency):
+            if "error" not in result:
+                result = ChatResponse(**result).model_dump()
+            yield json.dumps({"index": index, **result}, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @app.post("/rag/index", response_model=RAGIndexResponse)
 def rag_index(request: RAGIndexRequest) -> RAGIndexResponse:
     directory = Path(request.dir) if request.dir else settings.docs_dir
     stats = rag.build_index(directory)
-    return RAGIndexResponse(documents_indexed=stats.documents_indexed, dim=stats.dim)
+    return RAGIndexResponse(
+        documents_indexed=stats.documents_indexed,
+        dim=stats.dim,
+        chunks_indexed=stats.chunks_indexed,
+        duplicates_skipped=stats.duplicates_skipped,
+    )
 
 
 @app.post("/rag/query", response_model=RAGQueryResponse)
@@ -93,35 +145,102 @@ def rag_query(request: RAGQueryRequest) -> RAGQueryResponse:
     return RAGQueryResponse(results=results)
 
 
+@app.post("/rag/query/batch", response_model=RAGQueryBatchResponse)
+def rag_query_batch(request: RAGQueryBatchRequest) -> RAGQueryBatchResponse:
+    try:
+        results = rag.query_index_batch(request.questions, k=request.k)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return RAGQueryBatchResponse(results=results)
+
+
 @app.post("/research", response_model=ResearchResponse)
 def research(request: ResearchRequest, adapter=Depends(research_dep)) -> ResearchResponse:
-    plan = adapter.plan(request.query)
-    search_results = adapter.search(request.query, k=request.max_results)
-    urls = [item.get("href") for item in search_results if item.get("href")]
-    pages = adapter.crawl(urls, depth=request.depth, max_pages=request.max_results)
-    synthesis = adapter.synthesize(pages)
-    return ResearchResponse(pages=pages, synthesis=synthesis)
+    result = adapter.research(request.query, depth=request.depth, max_results=request.max_results)
+    return ResearchResponse(plan=result["plan"], pages=result["pages"], synthesis=result["synthesis"])
+
+
+@app.get("/memory/recent", response_model=MemoryRecentResponse)
+def memory_recent(
+    limit: int = Query(10, ge=1, le=100), cursor: Optional[int] = Query(None, ge=0)
+) -> MemoryRecentResponse:
+    episodes, next_cursor = memory.load_page(limit, cursor=cursor)
+    return MemoryRecentResponse(episodes=episodes, next_cursor=next_cursor)
 
 
 @app.post("/memory/search", response_model=MemorySearchResponse)
 def memory_search(request: MemoryQueryRequest) -> MemorySearchResponse:
-    episodes = memory.search_memory(request.query, k=request.k)
+    episodes = memory.search_memory(request.query, k=request.k, mode=request.mode, max_age=request.max_age)
     return MemorySearchResponse(episodes=episodes)
 
 
+@app.post("/memory/search/batch", response_model=MemorySearchBatchResponse)
+def memory_search_batch(request: MemoryQueryBatchRequest) -> MemorySearchBatchResponse:
+    episodes = memory.search_memory_batch(request.queries, k=request.k, mode=request.mode, max_age=request.max_age)
+    return MemorySearchBatchResponse(episodes=episodes)
+
+
 @app.post("/agents/chat", response_model=AgentsChatResponse)
-def agents_chat(request: AgentsChatRequest, adapter=Depends(agents_dep)) -> AgentsChatResponse:
-    result = adapter.run(request.prompt)
+async def agents_chat(request: AgentsChatRequest, adapter=Depends(agents_dep)) -> AgentsChatResponse:
+    result = await adapter.arun(request.prompt)
     return AgentsChatResponse(**result)
 
 
-@app.post("/reflection/run", response_model=ReflectionResponse)
-def reflection_run(limit: int = 5) -> ReflectionResponse:
-    record = reflection.run_reflection(limit=limit)
-    return ReflectionResponse(notes=record["notes"], episode_count=record["episode_count"])
+@app.post("/agents/chat/stream")
+async def agents_chat_stream(request: AgentsChatRequest, adapter=Depends(agents_dep)) -> StreamingResponse:
+    """NDJSON stream of ``{"type": "delta", "text": ...}`` lines ending with a ``done`` line."""
+    events = adapter.stream(request.prompt)
+    # Admission happens before the first event, so pull it here: a rejection still becomes a 429/503.
+    first = await events.__anext__()
+
+    async def lines() -> AsyncIterator[str]:
+        yield json.dumps(first, ensure_ascii=False) + "\n"
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/reflection/run", response_model=JobResponse, status_code=202)
+def reflection_run(limit: int = Query(5, ge=1, le=50), jobs=Depends(jobs_dep)) -> JobResponse:
+    """Queue a reflection over episodes added since the last one; poll ``/jobs/{id}`` for the notes."""
+    return _job_response(*jobs.enqueue("reflection", limit=limit))
+
+
+@app.post("/jobs/consolidation", response_model=JobResponse, status_code=202)
+def consolidation_job(request: ConsolidationRequest, jobs=Depends(jobs_dep)) -> JobResponse:
+    return _job_response(*jobs.enqueue("consolidation", **request.model_dump()))
+
+
+@app.post("/jobs/rag-index", response_model=JobResponse, status_code=202)
+def rag_index_job(request: RAGIndexRequest, jobs=Depends(jobs_dep)) -> JobResponse:
+    return _job_response(*jobs.enqueue("rag-index", dir=request.dir))
+
+
+@app.get("/jobs", response_model=JobListResponse)
+def job_list(limit: int = Query(20, ge=1, le=200), jobs=Depends(jobs_dep)) -> JobListResponse:
+    return JobListResponse(jobs=[_job_response(job) for job in jobs.list(limit)])
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def job_status(job_id: str, jobs=Depends(jobs_dep)) -> JobResponse:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return _job_response(job)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     settings.ensure_directories()
     tracer.append("startup", {"event": "startup", "mode": settings.mode})
+    get_container().start()
+    if settings.warmup_enabled:
+        warmup.start_background_warmup()
+    else:
+        warmup.mark_ready()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    get_container().stop()
@@ -0,0 +1,126 @@
+"""Map-reduce summarisation of crawled pages for research synthesis."""
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Dict, List, Optional, Sequence
+
+from .admission import AdmissionError
+from .cache import SqliteCache
+from .config import settings
+from .context import Passage, count_tokens, pack_context
+from .ollama import node_overrides
+
+SINGLE_PROMPT = "Summarize the findings with citations."
+MAP_PROMPT = "Summarize the key facts of this page in a few sentences. Keep names, numbers and dates."
+REDUCE_PROMPT = "Combine these page summaries into one summary of the findings. Cite sources by URL."
+NO_PAGES_SUMMARY = "No web pages retrieved."
+FALLBACK_CHARS = 800
+
+_cache: Optional[SqliteCache] = None
+
+
+def _get_cache() -> SqliteCache:
+    global _cache
+    if _cache is None:
+        _cache = SqliteCache("summaries")
+    return _cache
+
+
+def set_cache(cache: Optional[SqliteCache]) -> None:
+    """Swap the page summary cache (``None`` reopens it under ``CACHE_DIR`` on next use)."""
+    global _cache
+    _cache = cache
+
+
+def _prompt_budget(system_prompt: str) -> int:
+    return settings.num_ctx - settings.context_reserve_tokens - count_tokens(system_prompt)
+
+
+def _reply(response: Dict[str, Any]) -> str:
+    return response.get("message", {}).get("content", "")
+
+
+def page_cache_key(page: Dict[str, Any], model: str) -> str:
+    digest = hashlib.sha256((page.get("text") or "").encode("utf-8")).hexdigest()
+    return f"{model}|{page.get('url')}|{digest}"
+
+
+def summarize_page(client: Any, page: Dict[str, Any]) -> Dict[str, Any]:
+    """Map step: summarise one page, reusing the cached summary for unchanged content."""
+    overrides = node_overrides("summarize")
+    key = page_cache_key(page, overrides.get("model") or getattr(client, "model", settings.ollama_model))
+    cached = _get_cache().get(key)
+    if cached is not None:
+        return {"url": page.get("url"), "summary": cached[0], "cached": True}
+
+    packed = pack_context([Passage("Page", page.get("text") or "", page.get("url"))], _prompt_budget(MAP_PROMPT), max_share=1.0)
+    messages = [{"role": "system", "content": MAP_PROMPT}, {"role": "user", "content": packed.text}]
+    try:
+        summary = _reply(client.generate(messages, stream=False, **overrides)).strip()
+    except AdmissionError:
+        raise
+    except Exception as exc:
+        return {"url": page.get("url"), "summary": (page.get("text") or "")[:FALLBACK_CHARS], "cached": False, "error": str(exc)}
+    if summary:
+        _get_cache().set(key, summary)
+    return {"url": page.get("url"), "summary": summary, "cached": False}
+
+
+def needs_map_reduce(pages: Sequence[Dict[str, Any]]) -> bool:
+    """True when the pages cannot fit a single synthesis prompt."""
+    mode = settings.research_synthesis.lower()
+    if mode in {"single", "map_reduce"}:
+        return mode == "map_reduce"
+    total = sum(count_tokens(page.get("text") or "") for page in pages)
+    return total > _prompt_budget(SINGLE_PROMPT)
+
+
+def single_pass_summarize(client: Any, pages: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    content = "\n\n".join(f"Source: {page.get('url')}\n{(page.get('text') or '')[:FALLBACK_CHARS]}" for page in pages)
+    messages = [{"role": "system", "content": SINGLE_PROMPT}, {"role": "user", "content": content}]
+    response = client.generate(messages, stream=False, **node_overrides("research"))
+    return {"summary": _reply(response), "sources": [page.get("url") for page in pages]}
+
+
+def map_reduce_summarize(client: Any, pages: Sequence[Dict[str, Any]], workers: int | None = None) -> Dict[str, Any]:
+    """Summarise pages concurrently (at most ``workers`` in flight), then combine them in one reduce call.
+
+    Map results are cached per (model, URL, content hash), so re-running
+    research over the same pages only pays for the reduce step. With no
+    pages nothing is sent to the model.
+    """
+    if not pages:
+        return {"summary": NO_PAGES_SUMMARY, "sources": []}
+    workers = max(1, workers or settings.summary_workers)
+    with ThreadPoolExecutor(max_workers=min(workers, len(pages)), thread_name_prefix="summarize") as pool:
+        # Each task runs in a copy of the caller's context so the admission priority carries over.
+        futures = [pool.submit(copy_context().run, summarize_page, client, page) for page in pages]
+        summaries: List[Dict[str, Any]] = [future.result() for future in futures]
+
+    passages = [
+        Passage("Summary", item["summary"], item["url"], score=float(len(summaries) - rank))
+        for rank, item in enumerate(summaries)
+        if item["summary"]
+    ]
+    packed = pack_context(passages, _prompt_budget(REDUCE_PROMPT), max_share=1.0)
+    messages = [{"role": "system", "content": REDUCE_PROMPT}, {"role": "user", "content": packed.text}]
+    return {
+        "summary": _reply(client.generate(messages, stream=False, **node_overrides("research"))),
+        "sources": [page.get("url") for page in pages],
+        "strategy": "map_reduce",
+        "pages_summarized": len(summaries),
+        "cached_summaries": sum(1 for item in summaries if item.get("cached")),
+    }
+
+
+__all__ = [
+    "NO_PAGES_SUMMARY",
+    "summarize_page",
+    "needs_map_reduce",
+    "single_pass_summarize",
+    "map_reduce_summarize",
+    "page_cache_key",
+    "set_cache",
+]
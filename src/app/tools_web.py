@@ -2,11 +2,19 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import json
+import re
+import threading
 import time
+import unicodedata
 from collections import deque
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence
+from urllib.parse import urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
 
 import requests
@@ -14,32 +22,183 @@ from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
 from readability import Document
 
+from .cache import SqliteCache
 from .config import settings
+from .dedupe import NearDuplicateFilter
 
 HEADERS = {"User-Agent": "lam-agent-unified/0.1 (+https://github.com/)"}
 MAX_CONTENT_LENGTH = 1_048_576  # 1 MB
 REQUEST_TIMEOUT = 15
+MAX_PARALLEL_SEEDS = 4
+
+
+class SearchBackend(Protocol):
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]: ...
+
+
+class DDGSearchBackend:
+    """DuckDuckGo search over one long-lived DDGS session.
+
+    DDGS is not thread-safe, so calls are serialised; the session is closed
+    once at interpreter exit instead of after every query.
+    """
+
+    def __init__(self) -> None:
+        self._ddgs: Optional[DDGS] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        with self._lock:
+            if self._ddgs is None:
+                self._ddgs = DDGS()
+            results: List[Dict[str, str]] = []
+            try:
+                for result in self._ddgs.text(query, max_results=max_results):
+                    if not result:
+                        continue
+                    results.append(
+                        {
+                            "title": result.get("title", ""),
+                            "href": result.get("href", ""),
+                            "body": result.get("body", ""),
+                        }
+                    )
+            except Exception:
+                # A failed request can leave the session unusable; start fresh next time.
+                self._reset()
+                raise
+            return results
+
+    def _reset(self) -> None:
+        if self._ddgs is not None:
+            _close_ddgs_session(self._ddgs)
+            self._ddgs = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+
+
+class FakeSearchBackend:
+    """Offline backend for tests and benchmarks.
+
+    Serves results from ``fixtures`` (normalised query -> results, optionally
+    loaded from a JSON file) and synthesises deterministic results otherwise.
+    """
+
+    def __init__(self, fixtures: Optional[Dict[str, List[Dict[str, str]]]] = None, path: Optional[Path] = None) -> None:
+        data = dict(fixtures or {})
+        if path is not None:
+            data.update(json.loads(Path(path).read_text(encoding="utf-8")))
+        self.fixtures = {normalize_query(query): results for query, results in data.items()}
+        self.calls = 0
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        self.calls += 1
+        normalized = normalize_query(query)
+        if normalized in self.fixtures:
+            return self.fixtures[normalized][:max_results]
+        slug = re.sub(r"\W+", "-", normalized).strip("-") or "query"
+        return [
+            {"title": f"{query} ({i + 1})", "href": f"https://example.invalid/{slug}/{i + 1}", "body": f"Result {i + 1} for {query}."}
+            for i in range(max_results)
+        ]
+
+
+_backend: Optional[SearchBackend] = None
+_search_cache: Optional[SqliteCache] = None
+_refreshing: set[str] = set()
+_refresh_lock = threading.Lock()
+
+
+def get_search_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        if settings.search_backend.lower() == "fake":
+            _backend = FakeSearchBackend(path=settings.search_fixtures)
+        else:
+            _backend = DDGSearchBackend()
+    return _backend
+
+
+def set_search_backend(backend: Optional[SearchBackend]) -> None:
+    """Swap the search backend (``None`` restores the configured default)."""
+    global _backend
+    _backend = backend
+
+
+def close_search_backend() -> None:
+    """Release the active backend's session, if one was ever created."""
+    close = getattr(_backend, "close", None)
+    if close:
+        close()
+
+
+def _get_search_cache() -> SqliteCache:
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SqliteCache("search")
+    return _search_cache
+
+
+def set_search_cache(cache: Optional[SqliteCache]) -> None:
+    """Swap the search result cache (``None`` reopens it under ``CACHE_DIR`` on next use)."""
+    global _search_cache
+    _search_cache = cache
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def _search_and_store(key: str, query: str, max_results: int) -> List[Dict[str, str]]:
+    results = get_search_backend().search(query, max_results)
+    if results:
+        _get_search_cache().set(key, results)
+    return results
+
+
+def _revalidate(key: str, query: str, max_results: int) -> None:
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh() -> None:
+        try:
+            _search_and_store(key, query, max_results)
+        except Exception:
+            pass
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, name="search-revalidate", daemon=True).start()
 
 
 def web_search_ddg(query: str, max_results: int = 5) -> List[Dict[str, str]]:
+    """Search the web through the configured backend with a persistent result cache.
+
+    Fresh entries (younger than ``SEARCH_CACHE_TTL``) are returned directly.
+    Stale entries within ``SEARCH_CACHE_STALE`` are returned immediately while a
+    background refresh runs. Anything older goes to the network.
+    """
     if not settings.enable_web:
         raise RuntimeError("Web access disabled by configuration")
-    results: List[Dict[str, str]] = []
-    ddgs = DDGS()
-    try:
-        for result in ddgs.text(query, max_results=max_results):
-            if not result:
-                continue
-            results.append(
-                {
-                    "title": result.get("title", ""),
-                    "href": result.get("href", ""),
-                    "body": result.get("body", ""),
-                }
-            )
-    finally:
-        _close_ddgs_session(ddgs)
-    return results
+    if settings.search_cache_ttl <= 0:
+        return get_search_backend().search(query, max_results)
+
+    key = f"{normalize_query(query)}|{max_results}"
+    cached = _get_search_cache().get(key)
+    if cached is not None:
+        results, age = cached
+        if age < settings.search_cache_ttl:
+            return results
+        if age < settings.search_cache_ttl + settings.search_cache_stale:
+            _revalidate(key, query, max_results)
+            return results
+    return _search_and_store(key, query, max_results)
 
 
 def _close_ddgs_session(ddgs: DDGS) -> None:
@@ -98,25 +257,121 @@ class CrawlConfig:
     rate_limit: float = 1.0
 
 
-def crawl(urls: Iterable[str], depth: int = 1, max_pages: int = 8) -> List[Dict[str, str]]:
+@dataclass
+class CrawlBudget:
+    """Page budget and visited set shared by crawls running in parallel."""
+
+    max_pages: int
+    visited: set[str] = field(default_factory=set)
+    pages: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.pages >= self.max_pages
+
+    def seen(self, url: str) -> bool:
+        return canonical_url(url) in self.visited
+
+    def claim_url(self, url: str) -> bool:
+        """Mark ``url`` visited; False if another crawl already took it."""
+        key = canonical_url(url)
+        with self._lock:
+            if key in self.visited:
+                return False
+            self.visited.add(key)
+            return True
+
+    def claim_page(self) -> bool:
+        """Reserve one page slot; False once the budget is spent."""
+        with self._lock:
+            if self.pages >= self.max_pages:
+                return False
+            self.pages += 1
+            return True
+
+
+def canonical_url(url: str) -> str:
+    """Normalise a URL for de-duplication (case-insensitive host, no fragment or trailing slash)."""
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip("/")
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, parsed.query, ""))
+
+
+def _interleave_unique(groups: Sequence[Sequence[Dict[str, str]]], url_key: str) -> List[Dict[str, str]]:
+    # Round-robin across groups so every seed contributes its best items first.
+    merged: List[Dict[str, str]] = []
+    seen: set[str] = set()
+    for row in zip_longest(*groups):
+        for item in row:
+            url = item.get(url_key) if item else None
+            if not url:
+                continue
+            key = canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged
+
+
+def multi_search(queries: Sequence[str], max_results: int = 5) -> List[Dict[str, str]]:
+    """Search every query concurrently and merge the results, de-duplicated by URL.
+
+    Each result carries the ``seed`` query that produced it. A failing query
+    contributes nothing rather than failing the whole search.
+    """
     if not settings.enable_web:
         raise RuntimeError("Web access disabled by configuration")
+    queries = list(dict.fromkeys(query for query in queries if query))
+    if not queries:
+        return []
+
+    def search_one(query: str) -> List[Dict[str, str]]:
+        try:
+            results = web_search_ddg(query, max_results=max_results)
+        except Exception:
+            return []
+        return [{**result, "seed": query} for result in results]
+
+    with ThreadPoolExecutor(max_workers=min(len(queries), MAX_PARALLEL_SEEDS), thread_name_prefix="search") as pool:
+        groups = list(pool.map(search_one, queries))
+    return _interleave_unique(groups, "href")
+
+
+def crawl(
+    urls: Iterable[str],
+    depth: int = 1,
+    max_pages: int = 8,
+    dedupe: Optional[NearDuplicateFilter] = None,
+    budget: Optional[CrawlBudget] = None,
+) -> List[Dict[str, str]]:
+    """Breadth-first crawl. Near-duplicate pages (mirrors, syndicated copies) are
+    dropped and their links are not followed; pass ``dedupe`` to share the filter
+    across crawls or to read ``dedupe.dropped`` afterwards. A shared ``budget``
+    caps the pages and de-duplicates URLs across concurrent crawls."""
+    if not settings.enable_web:
+        raise RuntimeError("Web access disabled by configuration")
+    dedupe = dedupe if dedupe is not None else NearDuplicateFilter()
     cfg = CrawlConfig(depth=depth, max_pages=max_pages)
-    visited: set[str] = set()
+    budget = budget if budget is not None else CrawlBudget(cfg.max_pages)
     queue: deque[tuple[str, int]] = deque((url, 0) for url in urls)
     pages: List[Dict[str, str]] = []
 
-    while queue and len(pages) < cfg.max_pages:
+    while queue and len(pages) < cfg.max_pages and not budget.exhausted:
         url, level = queue.popleft()
-        if url in visited or level > cfg.depth:
+        if level > cfg.depth or not budget.claim_url(url):
             continue
-        visited.add(url)
         try:
             fetched = fetch_url(url)
             readable = extract_readable(fetched["content"], url)
-            pages.append(readable)
         except Exception:
             continue
+        if dedupe.check(readable.get("text") or ""):
+            continue
+        if not budget.claim_page():
+            break
+        pages.append(readable)
 
         if level < cfg.depth:
             soup = BeautifulSoup(fetched["content"], "html.parser")
@@ -127,8 +382,38 @@ def crawl(urls: Iterable[str], depth: int = 1, max_pages: int = 8) -> List[Dict[
                 if href.startswith("/"):
                     parsed = urlparse(url)
                     href = f"{parsed.scheme}://{parsed.netloc}{href}"
-                if href.startswith("http") and href not in visited:
+                if href.startswith("http") and not budget.seen(href):
                     queue.append((href, level + 1))
         time.sleep(cfg.rate_limit)
 
     return pages
+
+
+def crawl_many(
+    url_groups: Sequence[Sequence[str]],
+    depth: int = 1,
+    max_pages: int = 8,
+    dedupe: Optional[NearDuplicateFilter] = None,
+) -> List[Dict[str, str]]:
+    """Crawl each group of seed URLs concurrently against one shared page budget.
+
+    URLs and near-duplicate pages are de-duplicated across groups, so the
+    combined result never exceeds ``max_pages``; pages are interleaved by group.
+    """
+    if not settings.enable_web:
+        raise RuntimeError("Web access disabled by configuration")
+    groups = [list(urls) for urls in url_groups if urls]
+    if not groups:
+        return []
+    dedupe = dedupe if dedupe is not None else NearDuplicateFilter()
+    budget = CrawlBudget(max_pages)
+
+    def crawl_one(urls: List[str]) -> List[Dict[str, str]]:
+        try:
+            return crawl(urls, depth=depth, max_pages=max_pages, dedupe=dedupe, budget=budget)
+        except Exception:
+            return []
+
+    with ThreadPoolExecutor(max_workers=min(len(groups), MAX_PARALLEL_SEEDS), thread_name_prefix="crawl") as pool:
+        results = list(pool.map(crawl_one, groups))
+    return _interleave_unique(results, "url")
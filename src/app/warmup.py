@@ -0,0 +1,96 @@
+"""Startup warm-up so the first request does not pay for cold model loads."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from app import memory, rag, rerank
+from app.config import settings
+from app.embeddings import DEFAULT_EMBED_MODEL, get_encoder
+from app.logging import tracer
+from app.ollama import configured_models, get_client
+
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    started: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+state = WarmupState()
+_lock = threading.Lock()
+
+
+def _load_encoder() -> Any:
+    encoder = get_encoder(DEFAULT_EMBED_MODEL)
+    encoder.encode(["warm-up"], convert_to_numpy=True)
+    return encoder
+
+
+def _load_rag_index() -> bool:
+    return rag.warm_index()
+
+
+def _load_memory_index() -> int:
+    return memory.warm_index()
+
+
+def _load_reranker() -> Any:
+    if not settings.rerank_enabled:
+        return None
+    return rerank.get_cross_encoder(settings.rerank_model)
+
+
+def _preload_ollama() -> Dict[str, Any]:
+    client = get_client()
+    return {model: client.preload(settings.ollama_keep_alive, model=model) for model in configured_models()}
+
+
+STEPS: List[tuple[str, Callable[[], Any]]] = [
+    ("encoder", _load_encoder),
+    ("rag_index", _load_rag_index),
+    ("memory_index", _load_memory_index),
+    ("reranker", _load_reranker),
+    ("ollama", _preload_ollama),
+]
+
+
+def run_warmup() -> WarmupState:
+    """Run every warm-up step once, recording per-step timings in the startup trace."""
+    with _lock:
+        if state.started:
+            return state
+        state.started = True
+
+    total_start = time.perf_counter()
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:
+            state.errors[name] = str(exc)
+        state.timings[name] = time.perf_counter() - start
+    state.timings["total"] = time.perf_counter() - total_start
+    state.ready = True
+    tracer.append("startup", {"event": "warmup", "timings": state.timings, "errors": state.errors})
+    return state
+
+
+def start_background_warmup() -> threading.Thread:
+    """Warm up in a daemon thread so the server can answer readiness probes meanwhile."""
+    thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def mark_ready() -> None:
+    """Skip warm-up entirely (used when WARMUP_ENABLED=false)."""
+    state.started = True
+    state.ready = True
+
+
+__all__ = ["WarmupState", "state", "run_warmup", "start_background_warmup", "mark_ready"]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from app import memory
+
+DIM = 64
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder so tests never download model weights."""
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                bucket = int(hashlib.md5(token.encode()).hexdigest(), 16) % DIM
+                vectors[row, bucket] += 1.0
+        vectors[:, 0] += 1e-3
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    encoder = HashingEncoder()
+    monkeypatch.setattr("app.embeddings.get_encoder", lambda *args, **kwargs: encoder)
+    monkeypatch.setattr("app.rag.get_encoder", lambda *args, **kwargs: encoder)
+    monkeypatch.setattr("app.memory.get_encoder", lambda *args, **kwargs: encoder)
+    return encoder
+
+
+@pytest.fixture
+def rag_store(monkeypatch, tmp_path):
+    """Point the RAG vector store at a temporary directory."""
+    store = tmp_path / "vectorstore"
+    monkeypatch.setattr("app.rag.INDEX_FILE", store / "index.faiss")
+    monkeypatch.setattr("app.rag.META_FILE", store / "metadata.jsonl")
+    monkeypatch.setattr("app.rag.LEXICAL_DIR", store / "bm25")
+    return store
+
+
+@pytest.fixture
+def memory_store(monkeypatch, tmp_path, fake_encoder):
+    """Point episodic memory at a temporary directory."""
+    store = tmp_path / "memory"
+    monkeypatch.setattr(memory, "MEMORY_DIR", store)
+    monkeypatch.setattr(memory, "INDEX_FILE", store / "episodic.faiss")
+    monkeypatch.setattr(memory, "META_FILE", store / "episodes.json")
+    monkeypatch.setattr(memory, "LOG_FILE", store / "episodes.jsonl")
+    memory._CACHE.clear()
+    yield store
+    memory._CACHE.clear()
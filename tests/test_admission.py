@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import admission
+from app.container import get_container
+from app.logging import JsonTracer
+from app.server import app
+
+
+def test_waiters_are_admitted_by_priority():
+    controller = admission.AdmissionController(limit=1, max_queue=4, timeout=5)
+    controller.acquire()
+    order: list[str] = []
+
+    def worker(name: str) -> None:
+        with controller.slot(name):
+            order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ("reflection", "research", "interactive")]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    controller.release()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["interactive", "research", "reflection"]
+    stats = controller.snapshot()
+    assert stats["admitted"] == 4 and stats["in_flight"] == 0
+    assert stats["queue_time_max"] > 0
+
+
+def test_full_queue_and_timeout_are_rejected():
+    controller = admission.AdmissionController(limit=1, max_queue=1, timeout=0.1)
+    controller.acquire()
+    with pytest.raises(admission.QueueTimeoutError):
+        controller.acquire()
+
+    blocker = threading.Thread(target=lambda: pytest.raises(admission.QueueTimeoutError, controller.acquire))
+    blocker.start()
+    time.sleep(0.02)
+    with pytest.raises(admission.QueueFullError):
+        controller.acquire()
+    blocker.join()
+    assert controller.snapshot()["rejected"] == 1
+
+
+def test_server_maps_rejections_to_http_status(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.server.tracer", JsonTracer(tmp_path))
+    controller = admission.AdmissionController(limit=1, max_queue=0, timeout=0.1)
+    controller.acquire()
+    admission.set_controller(controller)
+
+    def run(query, mode="hybrid"):
+        from app.ollama import OllamaClient
+
+        OllamaClient().generate([{"role": "user", "content": query}])
+
+    monkeypatch.setattr(get_container().orchestrator, "run", run)
+    try:
+        response = TestClient(app).post("/chat", json={"message": "hi"})
+    finally:
+        admission.set_controller(None)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
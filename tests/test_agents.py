@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("agents")
+
+from app.adapters.agents import OllamaAgentsAdapter, OllamaModelProvider  # noqa: E402
+from app.logging import JsonTracer  # noqa: E402
+from app.ollama import OllamaClient  # noqa: E402
+from app.server import agents_dep, app  # noqa: E402
+
+CHUNKS = [
+    {"message": {"content": "Hello"}, "done": False},
+    {"message": {"content": ", world"}, "done": False},
+    {"message": {"content": ""}, "done": True, "prompt_eval_count": 321, "eval_count": 7},
+]
+
+
+@pytest.fixture
+def adapter(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.adapters.agents.tracer", JsonTracer(tmp_path))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content="\n".join(json.dumps(chunk) for chunk in CHUNKS).encode())
+
+    client = OllamaClient(base_url="http://ollama.test")
+    client._async_transport = httpx.MockTransport(handler)
+    return OllamaAgentsAdapter(provider=OllamaModelProvider(client=client))
+
+
+def test_run_reports_ollama_token_counts(adapter):
+    result = adapter.run("hi")
+    assert result["reply"] == "Hello, world"
+    assert result["usage"] == {"input_tokens": 321, "output_tokens": 7, "total_tokens": 328}
+
+
+def test_stream_endpoint_emits_deltas_and_usage(adapter):
+    app.dependency_overrides[agents_dep] = lambda: adapter
+    try:
+        response = TestClient(app).post("/agents/chat/stream", json={"prompt": "hi"})
+    finally:
+        app.dependency_overrides.clear()
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["text"] for e in events if e["type"] == "delta"] == ["Hello", ", world"]
+    assert events[-1] == {
+        "type": "done",
+        "reply": "Hello, world",
+        "usage": {"input_tokens": 321, "output_tokens": 7, "total_tokens": 328},
+    }
+
+
+def test_adapter_and_loop_are_reused(adapter):
+    from app.adapters.agents import get_agents_adapter, get_event_loop_thread
+
+    assert get_agents_adapter() is get_agents_adapter()
+    loop = get_event_loop_thread().loop
+    adapter.run("hi")
+    adapter.run("again")
+    assert get_event_loop_thread().loop is loop and loop.is_running()
+    client = adapter._provider.get_model(None)._client
+    assert list(client._async_clients) == [loop]
+
+
+def test_closing_the_client_closes_its_loop_clients(adapter):
+    from app import container as container_module
+    from app.adapters.agents import get_agents_adapter
+
+    adapter.run("hi")
+    client = adapter._provider.get_model(None)._client
+    (async_client,) = client._async_clients.values()
+    client.close()
+    assert async_client.is_closed and not client._async_clients
+
+    container = container_module.Container()
+    container.started = True
+    cached = get_agents_adapter()
+    container.stop()
+    assert get_agents_adapter() is not cached
+
+
+def test_stream_endpoint_rejects_when_admission_is_saturated(adapter):
+    from app import admission
+
+    controller = admission.AdmissionController(limit=1, max_queue=0, timeout=0.1)
+    admission.set_controller(controller)
+    controller.acquire()
+    app.dependency_overrides[agents_dep] = lambda: adapter
+    try:
+        response = TestClient(app).post("/agents/chat/stream", json={"prompt": "hi"})
+    finally:
+        app.dependency_overrides.clear()
+        controller.release()
+        admission.set_controller(None)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
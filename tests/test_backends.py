@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import admission
+from app.backends import BackendPool
+from app.ollama import OllamaClient
+
+SERVICE_TIME = 0.1
+
+
+def _stub_server() -> ThreadingHTTPServer:
+    """Ollama stand-in that, like OLLAMA_NUM_PARALLEL=1, serves one chat at a time."""
+    busy = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            with busy:
+                time.sleep(SERVICE_TIME)
+            body = json.dumps({"message": {"content": "ok"}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stubs():
+    servers = [_stub_server() for _ in range(3)]
+    admission.set_controller(admission.AdmissionController(limit=32, max_queue=32, timeout=30))
+    yield [f"http://127.0.0.1:{server.server_address[1]}" for server in servers]
+    admission.set_controller(None)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _run(pool: BackendPool, requests: int = 12) -> float:
+    client = OllamaClient()
+    client.pool = pool
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        list(executor.map(lambda _: client.generate([{"role": "user", "content": "hi"}]), range(requests)))
+    return time.perf_counter() - start
+
+
+def test_throughput_scales_with_backends(stubs):
+    one = _run(BackendPool(stubs[:1]))
+    three_pool = BackendPool(stubs)
+    three = _run(three_pool)
+    assert three < one * 0.6
+    assert all(backend["requests"] >= 2 for backend in three_pool.snapshot())
+
+
+def test_failover_opens_circuit_on_dead_backend(stubs):
+    pool = BackendPool(["http://127.0.0.1:9", stubs[0]], failure_threshold=1, cooldown=60)
+    _run(pool, requests=4)
+    dead, alive = pool.snapshot()
+    assert dead["circuit_open"] and dead["requests"] >= 1
+    assert alive["requests"] == 4
+
+
+def test_model_affinity_prefers_warm_backend():
+    pool = BackendPool(["http://a", "http://b"])
+    pool.backends[1].models.add("llama3:8b")
+    assert pool.acquire("llama3:8b").url == "http://b"
+    assert pool.acquire("llama3:8b").url == "http://b"
+    assert pool.acquire("llama3:8b").url == "http://a"
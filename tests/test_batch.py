@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import cli, memory, rag
+from app.admission import QueueFullError
+from app.adapters.orchestrator import LangGraphAdapter
+from app.server import app, orchestrator_dep
+
+
+class StubOrchestrator(LangGraphAdapter):
+    """Runs the real batching around a canned ``run``."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls: list = []
+        self._calls_lock = threading.Lock()
+
+    def run(self, query, mode="hybrid", memory_hits=None, retrieved=None):
+        with self._calls_lock:
+            self.calls.append((query, mode, memory_hits))
+        time.sleep(self.delay)
+        if query == "busy":
+            raise QueueFullError("queue full")
+        if query == "boom":
+            raise ValueError("graph failed")
+        return {"reply": f"answer to {query}", "sources": [], "meta": {"mode": mode}}
+
+
+def _record(query, response, mode="offline"):
+    memory.record_episode(query=query, response=response, mode=mode, sources=[], meta={})
+
+
+def test_search_memory_batch_matches_single_searches(memory_store, fake_encoder, monkeypatch):
+    _record("rebuild the faiss index", "Run rag-index again.")
+    _record("ollama keep alive", "Set OLLAMA_KEEP_ALIVE.", mode="web")
+    _record("capital of france", "Paris.")
+    queries = ["faiss index rebuild", "keep alive for ollama", ""]
+    singles = [memory.search_memory(query, k=2) for query in queries[:2]]
+
+    calls = []
+    encode = fake_encoder.encode
+    monkeypatch.setattr(fake_encoder, "encode", lambda sentences, **kwargs: calls.append(sentences) or encode(sentences, **kwargs))
+    batch = memory.search_memory_batch(queries, k=2)
+    assert len(calls) == 1
+    assert [[hit["episode_id"] for hit in hits] for hits in batch[:2]] == [[hit["episode_id"] for hit in hits] for hits in singles]
+    assert batch[2] == []
+    assert [[hit["mode"] for hit in hits] for hits in memory.search_memory_batch(queries[:2], k=2, mode="web")] == [["web"], ["web"]]
+
+
+def test_run_batch_maps_item_errors_and_reuses_prefetched_memory(memory_store):
+    _record("rebuild the faiss index", "Run rag-index again.")
+    orchestrator = StubOrchestrator()
+    items = [("rebuild faiss", "offline"), ("busy", "web"), ("boom", "bogus")]
+
+    results = dict(orchestrator.run_batch(items, concurrency=2))
+
+    assert results[0]["reply"] == "answer to rebuild faiss"
+    assert results[1] == {"error": "queue full", "status": 429}
+    assert results[2] == {"error": "graph failed"}
+    by_query = {query: (mode, hits) for query, mode, hits in orchestrator.calls}
+    assert by_query["boom"][0] == "hybrid"
+    assert by_query["rebuild faiss"][1][0]["response"] == "Run rag-index again."
+
+
+def test_run_batch_drops_queued_items_when_the_consumer_stops(memory_store):
+    orchestrator = StubOrchestrator(delay=0.05)
+    stream = orchestrator.run_batch([(f"q{i}", "web") for i in range(20)], concurrency=1)
+    next(stream)
+    stream.close()
+    time.sleep(0.3)
+    assert len(orchestrator.calls) <= 3
+
+
+def test_chat_batch_streams_ndjson(memory_store):
+    app.dependency_overrides[orchestrator_dep] = lambda: StubOrchestrator()
+    try:
+        response = TestClient(app).post(
+            "/chat/batch", json={"items": [{"message": "hello", "mode": "web"}, {"message": "busy"}]}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+    assert lines[0] == {"index": 0, "reply": "answer to hello", "sources": [], "meta": {"mode": "web"}}
+    assert lines[1] == {"index": 1, "error": "queue full", "status": 429}
+
+
+def test_batch_query_endpoints(tmp_path, memory_store, rag_store):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "ollama.txt").write_text("Ollama serves local language models over HTTP.", encoding="utf-8")
+    (docs / "faiss.txt").write_text("FAISS stores dense vectors for similarity search.", encoding="utf-8")
+    rag.build_index(docs, workers=1)
+    _record("ollama keep alive", "Set OLLAMA_KEEP_ALIVE.")
+    http = TestClient(app)
+
+    rag_results = http.post("/rag/query/batch", json={"questions": ["local language models", "dense vectors"], "k": 1}).json()
+    assert [hits[0]["path"].rsplit("/", 1)[-1] for hits in rag_results["results"]] == ["ollama.txt", "faiss.txt"]
+    episodes = http.post("/memory/search/batch", json={"queries": ["keep alive", "keep alive"], "mode": "web"}).json()
+    assert episodes == {"episodes": [[], []]}
+    episodes = http.post("/memory/search/batch", json={"queries": ["keep alive"]}).json()["episodes"]
+    assert episodes[0][0]["response"] == "Set OLLAMA_KEEP_ALIVE."
+
+
+def test_cli_input_prints_one_json_line_per_request(tmp_path, memory_store, monkeypatch, capsys):
+    orchestrator = StubOrchestrator()
+    monkeypatch.setattr(cli, "get_orchestrator", lambda: orchestrator)
+    workload = tmp_path / "requests.jsonl"
+    workload.write_text('"plain question"\n\n{"message": "boom", "mode": "offline"}\n', encoding="utf-8")
+
+    cli.chat(message=None, mode="web", input=workload, concurrency=2)
+    lines = sorted((json.loads(line) for line in capsys.readouterr().out.splitlines()), key=lambda line: line["index"])
+    assert lines[0]["reply"] == "answer to plain question" and lines[0]["meta"] == {"mode": "web"}
+    assert lines[1] == {"index": 1, "error": "graph failed"}
+
+    _record("ollama keep alive", "Set OLLAMA_KEEP_ALIVE.")
+    queries = tmp_path / "queries.jsonl"
+    queries.write_text('{"query": "keep alive"}\n"capital of france"\n', encoding="utf-8")
+    cli.memory_search(query=None, k=1, mode=None, max_age=None, input=queries)
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(lines) == 2 and lines[0][0]["response"] == "Set OLLAMA_KEEP_ALIVE."
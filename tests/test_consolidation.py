@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from app import consolidation, memory
+from app.logging import JsonTracer
+
+
+@pytest.fixture
+def memory_store(monkeypatch, tmp_path, fake_encoder):
+    store = tmp_path / "memory"
+    monkeypatch.setattr(memory, "MEMORY_DIR", store)
+    monkeypatch.setattr(memory, "INDEX_FILE", store / "episodic.faiss")
+    monkeypatch.setattr(memory, "META_FILE", store / "episodes.json")
+    monkeypatch.setattr(memory, "LOG_FILE", store / "episodes.jsonl")
+    monkeypatch.setattr("app.consolidation.tracer", JsonTracer(tmp_path / "traces"))
+    memory._CACHE.clear()
+    yield store
+    memory._CACHE.clear()
+
+
+def _record(query, response, sources=(), meta=None):
+    memory.record_episode(query=query, response=response, mode="offline", sources=list(sources), meta=meta or {})
+
+
+def test_consolidate_merges_near_duplicates_and_drops_failures(memory_store):
+    for i in range(4):
+        _record("how do I rebuild the faiss index", "Run rag-index again.", sources=[f"docs/{i}.md"])
+    _record("how do I rebuild the faiss index", "Unable to generate response at this time.")
+    _record("what is the capital of france", "Paris.")
+
+    report = consolidation.consolidate(similarity=0.95, max_age=0, max_episodes=0)
+
+    assert (report.episodes_before, report.episodes_after) == (6, 2)
+    assert (report.clusters_merged, report.episodes_merged, report.dropped_invalid) == (1, 3, 1)
+    assert report.bytes_after < report.bytes_before
+    index, metadata = memory._load_index()
+    assert index.ntotal == len(metadata) == 2
+    merged = next(e for e in metadata if e["query"].startswith("how"))
+    assert merged["meta"]["consolidated"]["count"] == 4
+    assert sorted(merged["sources"]) == [f"docs/{i}.md" for i in range(4)]
+    log = [json.loads(line) for line in memory.LOG_FILE.read_text(encoding="utf-8").splitlines()]
+    assert [e["episode_id"] for e in log] == [e["episode_id"] for e in metadata]
+    assert memory.search_memory("rebuild the faiss index", k=1)[0]["episode_id"] == merged["episode_id"]
+
+
+def test_consolidate_applies_age_and_size_retention(memory_store):
+    for i in range(5):
+        _record(f"distinct topic number {i} about {'abcde'[i]}", f"answer {i}")
+    _, metadata = memory._load_index()
+    metadata[0]["timestamp"] = time.time() - 3600
+
+    dry = consolidation.consolidate(similarity=0, max_age=600, max_episodes=3, dry_run=True)
+    assert (dry.dropped_age, dry.dropped_size, dry.episodes_after) == (1, 1, 3)
+    assert memory._load_index()[0].ntotal == 5
+
+    consolidation.consolidate(similarity=0, max_age=600, max_episodes=3)
+    assert [e["response"] for e in memory.load_recent(10)] == ["answer 4", "answer 3", "answer 2"]
+
+
+def test_episodes_recorded_during_consolidation_are_kept(memory_store, monkeypatch):
+    for _ in range(3):
+        _record("how do I rebuild the faiss index", "Run rag-index again.")
+    cluster = consolidation.cluster_near_duplicates
+
+    def cluster_while_recording(*args, **kwargs):
+        _record("a question asked mid-run", "A fresh answer.")
+        return cluster(*args, **kwargs)
+
+    monkeypatch.setattr(consolidation, "cluster_near_duplicates", cluster_while_recording)
+    report = consolidation.consolidate(similarity=0.95, max_age=0, max_episodes=0)
+
+    index, metadata = memory._load_index()
+    assert report.episodes_after == index.ntotal == len(metadata) == 2
+    assert metadata[-1]["query"] == "a question asked mid-run"
+    assert memory.search_memory("question asked mid-run", k=1)[0]["response"] == "A fresh answer."
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import container as container_module
+from app.adapters.orchestrator import LangGraphAdapter
+from app.ollama import get_client
+from app.server import app
+
+
+def test_adapters_and_graph_are_built_once(monkeypatch):
+    container_module.reset_container()
+    path_length = len(sys.path)
+    for _ in range(3):
+        LangGraphAdapter()
+    assert len(sys.path) == path_length
+
+    container = container_module.get_container()
+    assert container_module.get_container() is container
+    container.start()
+    graph = container.orchestrator.build_graph()
+    assert container.orchestrator._graph is graph
+    assert container.client is get_client()
+
+    calls = []
+    monkeypatch.setattr("app.container.LangGraphAdapter", lambda: calls.append("built"))
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.get("/health").json()["submodules"] == container.submodules
+    assert calls == []
+    container_module.reset_container()
+    assert not container.started
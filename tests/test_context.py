@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from app.context import Passage, count_tokens, pack_context
+
+
+def test_count_tokens_approximates_bpe():
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 4
+    assert count_tokens("tokenization") == 3
+
+
+def test_pack_context_respects_budget_and_score_order():
+    passages = [
+        Passage("Web", "low value page " * 200, "https://example.com/low", score=0.1),
+        Passage("Local", "the index is rebuilt nightly", "notes.md", score=0.9),
+        Passage("Memory", "we answered this before", "memory://1", score=0.5),
+    ]
+    packed = pack_context(passages, budget_tokens=120)
+
+    assert packed.tokens <= 120
+    assert packed.sources == ["notes.md", "memory://1", "https://example.com/low"]
+    assert packed.text.startswith("Local [notes.md]: the index is rebuilt nightly")
+    assert packed.truncated == 1
+
+
+def test_pack_context_drops_near_duplicates():
+    article = "Ollama keeps recently used models in memory so follow-up requests skip the load step entirely."
+    passages = [
+        Passage("Web", article, "https://a.example", score=0.9),
+        Passage("Web", article + " Share this post.", "https://b.example", score=0.8),
+        Passage("Local", "A different passage about FAISS.", "faiss.md", score=0.7),
+    ]
+    packed = pack_context(passages, budget_tokens=500)
+    assert packed.duplicates == 1
+    assert packed.sources == ["https://a.example", "faiss.md"]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from app import tools_web
+from app.dedupe import NearDuplicateFilter
+
+ARTICLE = " ".join(f"Paragraph {i} explains how local models are cached between requests." for i in range(20))
+
+
+def _html(body: str, links=()) -> str:
+    anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+    return f"<html><body><article><p>{body}</p></article>{anchors}</body></html>"
+
+
+def test_filter_flags_near_duplicates_only():
+    seen = NearDuplicateFilter()
+    assert not seen.check(ARTICLE)
+    assert seen.check(ARTICLE + " Originally published elsewhere.")
+    assert not seen.check(ARTICLE.replace("local models", "vector indexes").replace("cached", "sharded"))
+    assert seen.dropped == 1
+
+
+def test_crawl_skips_mirrors_and_their_links(monkeypatch):
+    site = {
+        "https://a.example/post": _html(ARTICLE, ["https://a.example/next"]),
+        "https://mirror.example/post": _html(ARTICLE + " Mirrored copy.", ["https://mirror.example/never"]),
+        "https://a.example/next": _html("A follow-up post about FAISS sharding and index rebuilds. " * 10),
+    }
+    fetched = []
+
+    def fake_fetch(url):
+        fetched.append(url)
+        return {"url": url, "content": site[url]}
+
+    monkeypatch.setattr("app.tools_web.fetch_url", fake_fetch)
+    monkeypatch.setattr("app.tools_web.time.sleep", lambda seconds: None)
+    monkeypatch.setattr("app.config.settings.enable_web", True)
+
+    dedupe = NearDuplicateFilter()
+    pages = tools_web.crawl(["https://a.example/post", "https://mirror.example/post"], depth=1, dedupe=dedupe)
+
+    assert [page["url"] for page in pages] == ["https://a.example/post", "https://a.example/next"]
+    assert "https://mirror.example/never" not in fetched
+    assert dedupe.dropped == 1
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app import embeddings
+
+SENTENCES = [
+    "FAISS builds an inner-product index over normalised vectors.",
+    "Ollama serves local language models over HTTP.",
+    "The crawler honours robots.txt and caps downloads at 1 MB.",
+    "error code E1234 raised by build_index",
+]
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    pooled = embeddings._mean_pool(hidden, mask)
+    np.testing.assert_allclose(pooled, [[1.0, 0.0]])
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        embeddings.get_encoder(backend="tensorrt")
+
+
+def _load(backend: str):
+    try:
+        return embeddings.get_encoder(embeddings.DEFAULT_EMBED_MODEL, backend=backend)
+    except Exception as exc:  # model weights unavailable offline
+        pytest.skip(f"{backend} encoder unavailable: {exc}")
+
+
+@pytest.mark.parametrize("backend", ["onnx", "int8"])
+def test_backend_cosine_parity_with_torch(backend):
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+    reference = _load("torch").encode(SENTENCES, convert_to_numpy=True)
+    candidate = _load(backend).encode(SENTENCES, convert_to_numpy=True)
+
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    assert candidate.shape == reference.shape
+    assert np.min(np.sum(reference * candidate, axis=1)) > 0.98
+    np.testing.assert_allclose(candidate @ candidate.T, reference @ reference.T, atol=0.03)
+
+
+class CharCountEncoder:
+    """Picklable stand-in so spawned workers need no model weights."""
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        return np.array([[len(text), sum(map(ord, text)) % 997, text.count(" ")] for text in sentences], dtype=np.float32)
+
+
+def test_worker_pool_preserves_batch_order_and_vectors():
+    batches = [[f"{sentence} batch {i}" for sentence in SENTENCES[: 1 + i % 4]] for i in range(9)]
+    serial = list(embeddings.iter_encode(batches, workers=1, factory=CharCountEncoder))
+    pooled = list(embeddings.iter_encode(iter(batches), workers=2, batch_size=2, factory=CharCountEncoder))
+
+    assert [matrix.shape[0] for matrix in pooled] == [len(batch) for batch in batches]
+    for batch, left, right in zip(batches, serial, pooled):
+        np.testing.assert_array_equal(left, right)
+        np.testing.assert_array_equal(right, CharCountEncoder().encode(batch))
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app import evaluation, memory, tools_web
+from app.cache import SqliteCache
+from app.config import settings
+from app.logging import JsonTracer
+
+
+class TracingOrchestrator:
+    """Writes node and generation events like the real graph, without models."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.calls = []
+
+    def run(self, query, mode="hybrid"):
+        self.calls.append((query, mode))
+        if query == "boom":
+            raise RuntimeError("backend down")
+        with self.tracer.span(component="orchestrator", mode=mode) as trace_id:
+            self.tracer.append(trace_id, {"node": "retrieve", "duration": 0.25, "hits": 2})
+            self.tracer.append(trace_id, {"node": "generation", "queue_time": 0.1, "eval_count": 40, "eval": 2.0})
+            self.tracer.append(trace_id, {"node": "synthesize", "duration": 2.5})
+        retrieved = 2 if mode == "offline" else 0
+        return {"reply": "ok", "sources": ["docs/faiss.md"], "meta": {"trace_id": trace_id, "retrieved": retrieved}}
+
+
+def test_load_requests_accepts_strings_and_backlog_lines(tmp_path):
+    path = tmp_path / "workload.jsonl"
+    lines = ['"plain question"', json.dumps({"request_id": "r-1", "title": "Title", "body": "Body"}), ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    requests = evaluation.load_requests(path)
+    assert [r.message for r in requests] == ["plain question", "Title\n\nBody"]
+    assert requests[1].id == "r-1"
+    assert len(evaluation.load_requests(path, limit=1)) == 1
+
+
+def test_run_evaluation_reports_stages_throughput_and_hit_rates(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluation, "reset_caches", lambda: None)
+    tracer = JsonTracer(tmp_path / "traces")
+    orchestrator = TracingOrchestrator(tracer)
+    requests = [
+        evaluation.EvalRequest("a", "what is faiss", expected_sources=["faiss.md"]),
+        evaluation.EvalRequest("b", "boom"),
+    ]
+
+    report = evaluation.run_evaluation(
+        requests, orchestrator, modes=["offline", "web"], phases=["cold", "warm"], concurrency=2, tracer=tracer
+    )
+
+    assert len(orchestrator.calls) == 8
+    assert len(report["results"]) == 8
+    cold = report["summary"]["cold"]
+    assert cold["requests"] == 4 and cold["errors"] == 2
+    assert cold["stages_mean"] == {"retrieve": 0.25, "synthesize": 2.5}
+    assert cold["tokens_per_second"] == 20.0
+    assert cold["retrieval_hit_rate"] == 0.5
+    assert cold["source_hit_rate"] == 1.0
+    assert cold["by_mode"]["offline"]["retrieval_hit_rate"] == 1.0
+    assert "throughput_rps" in cold and "throughput_rps" not in cold["by_mode"]["offline"]
+    with pytest.raises(ValueError):
+        evaluation.run_evaluation(requests, orchestrator, phases=["hot"], tracer=tracer)
+
+
+def test_percentile_uses_nearest_rank():
+    assert evaluation.percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert evaluation.percentile([1.0, 2.0, 3.0, 4.0], 95) == 4.0
+    assert evaluation.percentile([], 99) == 0.0
+
+
+class RecordingOrchestrator:
+    """Searches and records episodic memory like the real orchestrator."""
+
+    def run(self, query, mode="hybrid"):
+        hits = memory.search_memory(query, k=3)
+        memory.record_episode(query=query, response=f"answer to {query}", mode=mode, sources=[], meta={})
+        return {"reply": "ok", "sources": [], "meta": {"memory_hits": len(hits)}}
+
+
+def test_replays_record_into_scratch_memory(memory_store, monkeypatch):
+    monkeypatch.setattr(evaluation, "reset_caches", lambda: None)
+    memory.record_episode(query="existing question", response="existing answer", mode="offline", sources=[], meta={})
+    log_before = memory.LOG_FILE.read_text(encoding="utf-8")
+    requests = [evaluation.EvalRequest("a", "brand new topic"), evaluation.EvalRequest("b", "existing question")]
+
+    report = evaluation.run_evaluation(requests, RecordingOrchestrator(), phases=["cold", "warm"])
+
+    assert memory.LOG_FILE.read_text(encoding="utf-8") == log_before
+    assert memory.LOG_FILE.parent == memory_store
+    hits = {phase: [row["memory_hits"] for row in report["results"] if row["phase"] == phase] for phase in ("cold", "warm")}
+    assert hits["cold"] == hits["warm"] == [1, 2]
+
+
+class CachingOrchestrator:
+    """Reads and fills the web search cache like a research run."""
+
+    def __init__(self):
+        self.cache_hits = []
+
+    def run(self, query, mode="hybrid"):
+        cache = tools_web._get_search_cache()
+        self.cache_hits.append(cache.get(query) is not None)
+        cache.set(query, [{"url": "https://example.com"}])
+        return {"reply": "ok", "sources": [], "meta": {}}
+
+
+def test_replays_use_a_scratch_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_dir", tmp_path / "cache")
+    monkeypatch.setattr(tools_web, "_search_cache", None)
+    SqliteCache("search").set("cached question", ["kept"])
+    orchestrator = CachingOrchestrator()
+    requests = [evaluation.EvalRequest("a", "cached question"), evaluation.EvalRequest("b", "new question")]
+
+    evaluation.run_evaluation(requests, orchestrator, phases=["cold", "warm"])
+
+    assert orchestrator.cache_hits == [False, False, True, True]
+    assert settings.cache_dir == tmp_path / "cache"
+    real = SqliteCache("search")
+    assert real.get("cached question")[0] == ["kept"] and real.get("new question") is None
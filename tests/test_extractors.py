@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app import extractors
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.extractors.CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+def test_builtin_formats(tmp_path):
+    html = tmp_path / "page.html"
+    html.write_text(
+        "<html><head><title>Release notes</title></head><body><article>"
+        + "<p>The retriever now fuses lexical and dense hits for better recall.</p>" * 5
+        + "</article></body></html>",
+        encoding="utf-8",
+    )
+    data = tmp_path / "config.json"
+    data.write_text(json.dumps({"service": {"name": "ollama", "ports": [11434]}}), encoding="utf-8")
+
+    assert "fuses lexical and dense hits" in extractors.extract(html)
+    assert extractors.extract(data).splitlines() == ["service.name: ollama", "service.ports: 11434"]
+    assert extractors.extract(tmp_path / "image.png") is None
+
+
+def test_docx_extraction(tmp_path):
+    docx = pytest.importorskip("docx")
+    path = tmp_path / "notes.docx"
+    document = docx.Document()
+    document.add_paragraph("Quarterly capacity plan")
+    document.save(str(path))
+    assert "Quarterly capacity plan" in extractors.extract(path)
+
+
+def test_binary_extraction_is_cached_by_hash(monkeypatch, tmp_path, cache_dir):
+    calls = []
+
+    def extract_fake(path):
+        calls.append(path)
+        return path.read_bytes().decode()
+
+    monkeypatch.setitem(extractors.EXTRACTORS, ".bin", extractors.Extractor("extract_fake", extract_fake))
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"first version")
+
+    assert extractors.extract(path) == "first version"
+    assert extractors.extract(path) == "first version"
+    assert len(calls) == 1
+
+    path.write_bytes(b"second version")
+    assert extractors.extract(path) == "second version"
+    assert len(calls) == 2
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_process_pool_preserves_order(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"document {i}", encoding="utf-8")
+        paths.append(path)
+    (tmp_path / "empty.txt").write_text("", encoding="utf-8")
+    paths.insert(3, tmp_path / "empty.txt")
+
+    results = list(extractors.iter_extracted(paths, workers=2))
+    assert [text for _, text in results] == [f"document {i}" for i in range(6)]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from app import graphs
+
+
+class StubClient:
+    def generate(self, messages, stream=False, **kwargs):
+        return {"message": {"content": "stub answer"}}
+
+
+def _stub_io(monkeypatch):
+    searched = []
+    monkeypatch.setattr("app.graphs.memory.search_memory", lambda query, k=3: [])
+    monkeypatch.setattr("app.graphs.rag.query_index", lambda query, k=4: [])
+    monkeypatch.setattr("app.graphs.tools_web.multi_search", lambda seeds, max_results=5: searched.extend(seeds) or [])
+    monkeypatch.setattr("app.graphs.tools_web.crawl_many", lambda groups, **kwargs: [])
+    return searched
+
+
+def test_search_receives_every_planned_seed(monkeypatch):
+    searched = _stub_io(monkeypatch)
+    seeds = ["faiss ivf tuning", "faiss nprobe recall", "ivf vs hnsw"]
+
+    def stub_planner(state):
+        state["plan"] = list(seeds)
+        return state
+
+    monkeypatch.setattr(graphs, "research_plan_node", stub_planner)
+    graph = graphs.build_default_graph()
+    result = graph({"messages": [{"role": "user", "content": "hello"}], "mode": "web", "client": StubClient()})
+
+    assert searched == seeds
+    assert result["reply"] == "stub answer"
+
+
+def test_default_hybrid_plan_reaches_search(monkeypatch):
+    searched = _stub_io(monkeypatch)
+    graph = graphs.build_default_graph()
+    graph({"messages": [{"role": "user", "content": "hello"}], "mode": "hybrid", "client": StubClient()})
+    assert searched == ["hello", "context around hello"]
+
+
+def test_route_keeps_memory_hits_passed_in(monkeypatch):
+    _stub_io(monkeypatch)
+    calls = []
+    monkeypatch.setattr("app.graphs.memory.search_memory", lambda query, k=3: calls.append(query) or [])
+    hits = [{"episode_id": "e1", "response": "cached answer"}]
+    graph = graphs.build_default_graph()
+
+    result = graph({"messages": [{"role": "user", "content": "hello"}], "mode": "offline", "client": StubClient(), "memory_hits": hits})
+    assert calls == [] and result["meta"]["memory_hits"] == 1
+
+    graph({"messages": [{"role": "user", "content": "hello"}], "mode": "offline", "client": StubClient()})
+    assert calls == ["hello"]
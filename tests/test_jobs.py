@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import container as container_module
+from app import jobs, memory, reflection
+from app.logging import JsonTracer
+from app.server import app
+
+
+def _wait(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status not in jobs.ACTIVE:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_overlapping_submissions_are_deduplicated():
+    manager = jobs.JobManager(workers=2)
+    release = threading.Event()
+    first, created = manager.submit("slow", lambda: release.wait(5) and "done", dedupe_key="slow")
+    second, created_again = manager.submit("slow", lambda: "other", dedupe_key="slow")
+    assert created and not created_again and second is first
+
+    release.set()
+    assert _wait(manager, first.id).result == "done"
+    third, created = manager.submit("slow", lambda: "again", dedupe_key="slow")
+    assert created and third.id != first.id
+    assert _wait(manager, third.id).result == "again"
+    manager.shutdown()
+
+
+def _nothing_new():
+    raise reflection.NoNewEpisodes("nothing new")
+
+
+def test_job_statuses_cover_failures_and_skips():
+    manager = jobs.JobManager()
+    failed, _ = manager.submit("boom", lambda: 1 / 0)
+    skipped, _ = manager.submit("idle", _nothing_new, skip_on=(reflection.NoNewEpisodes,))
+    assert _wait(manager, failed.id).status == jobs.FAILED
+    assert _wait(manager, skipped.id).status == jobs.SKIPPED
+    assert [job.id for job in manager.list()] == [skipped.id, failed.id]
+    manager.shutdown()
+
+
+def test_schedule_enqueues_periodically(monkeypatch):
+    calls = []
+    monkeypatch.setitem(jobs.TASKS, "tick", jobs.Task(lambda: calls.append(1)))
+    manager = jobs.JobManager()
+    manager.schedule("tick", 0.02)
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.shutdown()
+    assert len(calls) >= 3
+
+
+@pytest.fixture
+def episode_log(tmp_path):
+    with memory.use_store(tmp_path):
+        yield memory.LOG_FILE
+
+
+def _append_episodes(log, start, count):
+    with log.open("a", encoding="utf-8") as fh:
+        for i in range(start, start + count):
+            fh.write(f'{{"episode_id": "{i}", "timestamp": {1000 + i}, "query": "q{i}", "response": "a{i}"}}\n')
+
+
+class RecordingClient:
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, messages, stream=False, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return {"message": {"content": "## Findings"}}
+
+
+def test_reflection_job_covers_only_new_episodes(monkeypatch, episode_log, tmp_path):
+    client = RecordingClient()
+    monkeypatch.setattr("app.reflection.get_client", lambda: client)
+    monkeypatch.setattr("app.reflection.tracer", JsonTracer(tmp_path / "traces"))
+    container_module.reset_container()
+    http = TestClient(app)
+    _append_episodes(episode_log, 0, 3)
+
+    job = http.post("/reflection/run", params={"limit": 5}).json()
+    assert job["status"] in {"queued", "running", "succeeded"}
+    done = _wait(container_module.get_container().jobs, job["id"])
+    assert done.result["episode_count"] == 3
+    assert http.get(f"/jobs/{job['id']}").json()["status"] == "succeeded"
+
+    job = http.post("/reflection/run").json()
+    assert _wait(container_module.get_container().jobs, job["id"]).status == jobs.SKIPPED
+
+    _append_episodes(episode_log, 3, 2)
+    job = http.post("/reflection/run").json()
+    done = _wait(container_module.get_container().jobs, job["id"])
+    assert done.result["episode_count"] == 2
+    assert "q4" in client.prompts[-1] and "q2" not in client.prompts[-1]
+    assert http.get("/jobs/unknown").status_code == 404
+    container_module.reset_container()
+
+
+def test_jobs_run_again_after_container_stop_and_start(monkeypatch):
+    calls = []
+    monkeypatch.setitem(jobs.TASKS, "tick", jobs.Task(lambda: calls.append(1)))
+    monkeypatch.setattr("app.container._compile_graph", lambda container: None)
+    container = container_module.Container()
+    container.start()
+    release = threading.Event()
+    blocker, _ = container.jobs.submit("block", lambda: release.wait(5))
+    queued, _ = container.jobs.enqueue("tick")
+    container.stop()
+    release.set()
+    assert _wait(container.jobs, queued.id).status == jobs.CANCELLED
+    with pytest.raises(RuntimeError):
+        container.jobs.enqueue("tick")
+
+    container.start()
+    job, created = container.jobs.enqueue("tick")
+    assert created and _wait(container.jobs, job.id).status == jobs.SUCCEEDED
+    assert _wait(container.jobs, blocker.id).status == jobs.SUCCEEDED
+    assert container.jobs.schedule("tick", 0.02) is not None
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    container.stop()
+    assert len(calls) >= 3
+
+
+def test_reflection_works_through_a_backlog_larger_than_limit(monkeypatch, episode_log, tmp_path):
+    client = RecordingClient()
+    monkeypatch.setattr("app.reflection.get_client", lambda: client)
+    monkeypatch.setattr("app.reflection.tracer", JsonTracer(tmp_path / "traces"))
+    _append_episodes(episode_log, 0, 2)
+    assert reflection.run_reflection(limit=5)["episode_count"] == 2
+
+    _append_episodes(episode_log, 2, 8)
+    first = reflection.run_reflection(limit=5)
+    assert first["episode_count"] == 5 and first["covered_until"] == 1006
+    assert "q2" in client.prompts[-1] and "q6" in client.prompts[-1] and "q7" not in client.prompts[-1]
+    second = reflection.run_reflection(limit=5)
+    assert second["episode_count"] == 3 and second["covered_until"] == 1009
+    assert "q7" in client.prompts[-1] and "q9" in client.prompts[-1]
+    with pytest.raises(reflection.NoNewEpisodes):
+        reflection.run_reflection(limit=5)
+    assert reflection.reflection_log() == tmp_path / "reflections.jsonl"
+    assert len(reflection.reflection_log().read_text(encoding="utf-8").splitlines()) == 3
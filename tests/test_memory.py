@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app import memory
+
+
+def _record(query, response, mode="offline", meta=None):
+    memory.record_episode(query=query, response=response, mode=mode, sources=[], meta=meta or {})
+
+
+def test_search_skips_failed_episodes_inside_the_index(memory_store):
+    for i in range(6):
+        _record("how do I rebuild the faiss index", "Unable to generate response at this time.")
+        _record("how do I rebuild the faiss index", "", meta={"generation_error": "timeout"})
+    _record("how do I rebuild the faiss index", "Run rag-index again.")
+    _record("rebuild faiss index after changes", "Delete the vectorstore and re-run rag-index.")
+    _record("what is the capital of france", "Paris.")
+
+    hits = memory.search_memory("how do I rebuild the faiss index", k=3)
+    assert [hit["response"] for hit in hits][:2] == ["Run rag-index again.", "Delete the vectorstore and re-run rag-index."]
+    assert len(hits) == 3
+    assert all(memory.is_usable(hit) for hit in hits)
+
+
+def test_search_filters_by_mode_and_age(memory_store, monkeypatch):
+    _record("ollama keep alive setting", "Use OLLAMA_KEEP_ALIVE.", mode="offline")
+    _record("ollama keep alive setting", "Search the docs for keep_alive.", mode="web")
+    memory._CACHE["attrs"].timestamps[0] -= 7200
+
+    assert [hit["mode"] for hit in memory.search_memory("ollama keep alive", k=3, mode="web")] == ["web"]
+    assert memory.search_memory("ollama keep alive", k=3, mode="research") == []
+    recent = memory.search_memory("ollama keep alive", k=3, max_age=3600)
+    assert [hit["mode"] for hit in recent] == ["web"]
+
+
+def test_time_decay_prefers_recent_episodes(memory_store, monkeypatch):
+    monkeypatch.setattr("app.config.settings.memory_decay_half_life", 86400.0)
+    monkeypatch.setattr("app.config.settings.memory_decay_weight", 0.5)
+    _record("crawler depth limit", "Old answer about depth.")
+    _record("crawler depth limit", "New answer about depth.")
+    memory._CACHE["attrs"].timestamps[0] = time.time() - 30 * 86400
+
+    hits = memory.search_memory("crawler depth limit", k=2)
+    assert [hit["response"] for hit in hits] == ["New answer about depth.", "Old answer about depth."]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert hits[1]["similarity"] == pytest.approx(hits[0]["similarity"], rel=0.2)
+
+
+def test_load_page_reads_the_log_backwards_with_a_cursor(memory_store, monkeypatch):
+    monkeypatch.setattr(memory, "TAIL_BLOCK", 64)
+    for i in range(7):
+        _record(f"question {i}", f"answer {i} " + "x" * (i * 20))
+    with memory.LOG_FILE.open("a", encoding="utf-8") as fh:
+        fh.write('{"episode_id": "half-writ')
+
+    seen, cursor = [], None
+    for _ in range(4):
+        page, cursor = memory.load_page(3, cursor=cursor)
+        seen.append([episode["query"] for episode in page])
+        if cursor is None:
+            break
+    assert seen == [["question 6", "question 5", "question 4"], ["question 3", "question 2", "question 1"], ["question 0"]]
+    assert [e["query"] for e in memory.load_recent(2)] == ["question 6", "question 5"]
+
+
+def test_record_episode_publishes_copies_only_after_a_successful_write(memory_store, monkeypatch):
+    _record("first question", "first answer")
+    index, metadata, attrs = memory._snapshot()
+
+    def failing_write(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patched, pytest.raises(OSError):
+        patched.setattr(memory.faiss, "write_index", failing_write)
+        _record("second question", "second answer")
+
+    assert memory._snapshot() == (index, metadata, attrs)
+    assert index.ntotal == len(metadata) == len(attrs.timestamps) == 1
+    assert [hit["query"] for hit in memory.search_memory("second question", k=3)] == ["first question"]
+
+    _record("second question", "second answer")
+    assert index.ntotal == len(metadata) == 1
+    assert memory._snapshot()[0].ntotal == 2
+    assert [hit["query"] for hit in memory.search_memory("second question", k=1)] == ["second question"]
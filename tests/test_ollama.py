@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import admission, ollama
+
+
+def _client(seen: list) -> ollama.OllamaClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        seen.append(payload)
+        return httpx.Response(
+            200,
+            json={
+                "model": payload["model"],
+                "message": {"content": "hi"},
+                "total_duration": 2_000_000_000,
+                "load_duration": 500_000_000,
+                "eval_count": 40,
+                "eval_duration": 1_000_000_000,
+            },
+        )
+
+    client = ollama.OllamaClient(base_url="http://ollama.test")
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_per_call_overrides_merge_with_defaults(monkeypatch):
+    monkeypatch.setattr("app.config.settings.ollama_num_thread", 8)
+    monkeypatch.setattr("app.config.settings.ollama_keep_alive", "1h")
+    seen: list = []
+    client = _client(seen)
+
+    client.generate([{"role": "user", "content": "x"}])
+    client.generate([{"role": "user", "content": "x"}], model="phi3:mini", options={"num_predict": 64}, keep_alive="-1")
+
+    assert seen[0]["keep_alive"] == "1h"
+    assert seen[0]["options"]["num_thread"] == 8 and "num_predict" not in seen[0]["options"]
+    assert seen[1]["model"] == "phi3:mini"
+    assert seen[1]["keep_alive"] == "-1"
+    assert seen[1]["options"]["num_predict"] == 64 and seen[1]["options"]["num_thread"] == 8
+
+
+def test_node_overrides_and_timings(monkeypatch):
+    monkeypatch.setattr("app.config.settings.ollama_node_models", {"reflection": "phi3:mini"})
+    monkeypatch.setattr("app.config.settings.ollama_node_options", {"reflection": {"num_predict": 256}})
+    assert ollama.node_overrides("synthesize") == {}
+    assert ollama.node_overrides("reflection") == {"model": "phi3:mini", "options": {"num_predict": 256}}
+    assert ollama.configured_models()[-1] == "phi3:mini"
+
+    seen: list = []
+    response = _client(seen).generate([{"role": "user", "content": "x"}], **ollama.node_overrides("reflection"))
+    stats = ollama.timings(response)
+    assert stats["model"] == "phi3:mini"
+    assert stats["total"] == 2.0 and stats["load"] == 0.5
+    assert stats["tokens_per_second"] == 40.0
+
+
+def _streaming_client() -> ollama.OllamaClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        lines = [{"message": {"content": "a"}}, {"message": {"content": "b"}, "done": True}]
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode())
+
+    client = ollama.OllamaClient(base_url="http://ollama.test")
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_streams_hold_slots_only_while_iterated():
+    controller = admission.AdmissionController(limit=1, max_queue=0, timeout=0.1)
+    admission.set_controller(controller)
+    try:
+        client = _streaming_client()
+        for _ in range(3):
+            client.generate([{"role": "user", "content": "x"}], stream=True)
+        assert controller.snapshot()["in_flight"] == 0
+
+        stream = client.generate([{"role": "user", "content": "x"}], stream=True)
+        assert next(stream)["message"]["content"] == "a"
+        assert controller.snapshot()["in_flight"] == 1
+        stream.close()
+        assert controller.snapshot()["in_flight"] == 0
+        assert [chunk["message"]["content"] for chunk in client.generate([], stream=True)] == ["a", "b"]
+        assert controller.snapshot()["in_flight"] == 0
+    finally:
+        admission.set_controller(None)
+
+
+def test_cancelled_astream_returns_its_admission_slot():
+    controller = admission.AdmissionController(limit=1, max_queue=1, timeout=5)
+    admission.set_controller(controller)
+
+    async def scenario() -> None:
+        controller.acquire()
+        consumer = asyncio.ensure_future(ollama.OllamaClient(base_url="http://ollama.test").astream([]).__anext__())
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        controller.release()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if controller.snapshot()["admitted"] == 2 and controller.snapshot()["in_flight"] == 0:
+                return
+
+    try:
+        asyncio.run(scenario())
+        assert controller.snapshot()["admitted"] == 2 and controller.snapshot()["in_flight"] == 0
+    finally:
+        admission.set_controller(None)
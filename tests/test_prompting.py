@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import os
+
+from app.prompting import build_messages, build_synthesis_messages
+
+
+def test_system_prefix_is_stable_across_modes():
+    assert build_messages("q")[0] == build_messages("other")[0]
+    assert build_messages("q")[1]["content"] == "q"
+
+
+def test_synthesis_prompt_puts_question_last():
+    first = build_synthesis_messages("What is FAISS?", "Local [a.md]: FAISS is a library.", "hybrid")
+    second = build_synthesis_messages("Who maintains it?", "Local [a.md]: FAISS is a library.", "hybrid")
+    assert first[0] == second[0]
+    assert first[1]["content"].endswith("Question: What is FAISS?")
+    shared = os.path.commonprefix([first[1]["content"], second[1]["content"]])
+    assert shared.startswith("Mode: hybrid\n\nContext:") and "FAISS is a library." in shared
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app import lexical, rag
+
+
+def _write_docs(directory):
+    directory.mkdir()
+    faiss_notes = " ".join(f"FAISS stores dense vector {i} for similarity search." for i in range(40))
+    (directory / "faiss.md").write_text(faiss_notes, encoding="utf-8")
+    (directory / "ollama.txt").write_text("Ollama serves local language models over HTTP.", encoding="utf-8")
+    (directory / "image.png").write_bytes(b"\x89PNG")
+
+
+def test_build_index_streams_chunks(monkeypatch, tmp_path, fake_encoder, rag_store):
+    monkeypatch.setattr("app.config.settings.chunk_size", 300)
+    monkeypatch.setattr("app.config.settings.chunk_overlap", 50)
+    monkeypatch.setattr("app.config.settings.index_batch_size", 3)
+    docs = tmp_path / "docs"
+    _write_docs(docs)
+
+    stats = rag.build_index(docs, workers=1)
+
+    lines = rag.META_FILE.read_text(encoding="utf-8").splitlines()
+    assert stats.documents_indexed == 2
+    assert stats.chunks_indexed == len(lines) > 2
+    assert all(len(json.loads(line)["content"]) <= 300 for line in lines)
+    assert not list(rag_store.glob("*.tmp"))
+
+    hits = rag.query_index("local language models", k=1)
+    assert hits[0]["path"].endswith("ollama.txt")
+
+
+def test_chunk_text_overlaps_on_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(100))
+    chunks = list(rag._chunk_text(text, size=80, overlap=20))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 80 for chunk in chunks)
+    assert all(chunk.split()[0].startswith("word") for chunk in chunks)
+    assert chunks[-1].endswith("word99")
+
+
+def test_bm25_matches_exact_identifiers(tmp_path):
+    builder = lexical.BM25Builder()
+    builder.add_many([
+        "The crawler retries on timeouts.",
+        "build_index raised error E1234 while writing metadata.",
+        "Error handling in the crawler and the index builder.",
+    ])
+    builder.write(tmp_path / "bm25")
+    index = lexical.BM25Index(tmp_path / "bm25")
+
+    assert index.search("E1234", k=3)[0][0] == 1
+    assert index.search("build_index", k=3)[0][0] == 1
+    assert [doc for doc, _ in index.search("crawler", k=3)] == [0, 2]
+    assert index.search("unknown-term", k=3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = lexical.reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    assert [doc for doc, _ in fused][:2] == [1, 3]
+
+
+def test_hybrid_query_uses_lexical_index(monkeypatch, tmp_path, fake_encoder, rag_store):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(8):
+        (docs / f"note{i}.txt").write_text(f"General notes about indexing pipelines, part {i}.", encoding="utf-8")
+    (docs / "errors.txt").write_text("Troubleshooting: code ZX-4411 means the index is stale.", encoding="utf-8")
+    rag.build_index(docs, workers=1)
+
+    assert (rag_store / "bm25" / "postings.npy").exists()
+    hits = rag.query_index("what does ZX-4411 mean", k=2, hybrid=True)
+    assert hits[0]["path"].endswith("errors.txt")
+    assert hits[0]["rrf_score"] >= hits[1]["rrf_score"]
+    dense = {hit["id"]: hit["score"] for hit in rag.query_index("what does ZX-4411 mean", k=9, hybrid=False)}
+    assert all(hit["score"] == pytest.approx(dense[hit["id"]], abs=1e-5) for hit in hits)
+
+
+def test_build_index_skips_duplicate_chunks(tmp_path, fake_encoder, rag_store):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    text = "Syndicated announcement about the new retrieval pipeline and its latency budget."
+    (docs / "original.txt").write_text(text, encoding="utf-8")
+    (docs / "copy.txt").write_text(text, encoding="utf-8")
+    (docs / "other.txt").write_text("Unrelated notes on GPU drivers.", encoding="utf-8")
+
+    stats = rag.build_index(docs, workers=1)
+    assert stats.chunks_indexed == 2
+    assert stats.duplicates_skipped == 1
+
+
+def test_query_index_batch_matches_single_queries(monkeypatch, tmp_path, fake_encoder, rag_store):
+    docs = tmp_path / "docs"
+    _write_docs(docs)
+    rag.build_index(docs, workers=1)
+    questions = ["local language models", "dense vector similarity", "HTTP serving"]
+    singles = [rag.query_index(question, k=2) for question in questions]
+
+    calls = []
+    encode = fake_encoder.encode
+    monkeypatch.setattr(fake_encoder, "encode", lambda sentences, **kwargs: calls.append(sentences) or encode(sentences, **kwargs))
+    assert rag.query_index_batch(questions, k=2) == singles
+    assert len(calls) == 1
+    assert rag.query_index_batch([], k=2) == []
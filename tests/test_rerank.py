@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app import rerank
+from app.config import settings
+
+
+class OverlapCrossEncoder:
+    def __init__(self):
+        self.pairs_scored = 0
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.pairs_scored += len(pairs)
+        return [len(set(query.lower().split()) & set(passage.lower().split())) for query, passage in pairs]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    rerank.clear_cache()
+    encoder = OverlapCrossEncoder()
+    monkeypatch.setattr("app.rerank.get_cross_encoder", lambda name: encoder)
+    yield encoder
+    rerank.clear_cache()
+
+
+HITS = [
+    {"path": "a.txt", "snippet": "unrelated release notes"},
+    {"path": "b.txt", "snippet": "how to rebuild the faiss index"},
+    {"path": "c.txt", "snippet": "faiss notes"},
+]
+
+
+def test_rerank_orders_by_cross_encoder_and_caches(model):
+    ranked, info = rerank.rerank("rebuild faiss index", HITS, top_k=2)
+    assert [hit["path"] for hit in ranked] == ["b.txt", "c.txt"]
+    assert info["reranked"] and info["cached"] == 0
+
+    _, info = rerank.rerank("Rebuild  FAISS index", HITS, top_k=2)
+    assert info["cached"] == 3
+    assert model.pairs_scored == 3
+
+
+def test_rerank_falls_back_to_vector_order_over_budget(model):
+    ranked, info = rerank.rerank("rebuild faiss index", HITS, top_k=2, budget_ms=0)
+    assert [hit["path"] for hit in ranked] == ["a.txt", "b.txt"]
+    assert info["fallback"] == "budget"
+
+
+def test_rerank_keeps_scored_batches_when_a_slow_model_runs_over_budget(model, monkeypatch):
+    predict = model.predict
+
+    def slow_predict(pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(0.1)
+        return predict(pairs, batch_size=batch_size, show_progress_bar=show_progress_bar)
+
+    monkeypatch.setattr(model, "predict", slow_predict)
+    snippets = [f"filler {i}" for i in range(settings.rerank_candidates)]
+    snippets[2] = "faiss"
+    hits = [{"path": f"{i}.txt", "snippet": snippet} for i, snippet in enumerate(snippets)]
+
+    ranked, info = rerank.rerank("faiss index", hits, top_k=5)
+
+    assert info["fallback"] == "budget"
+    assert 0 < info["scored"] < len(hits)
+    assert ranked[0]["path"] == "2.txt" and ranked[0]["rerank_score"] == 1
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from app import tools_web
+from app.adapters.research import DeerFlowAdapter
+from app.cache import SqliteCache
+
+
+def _page(url: str) -> str:
+    words = " ".join(f"{url.rsplit('/', 2)[-2]}-{url.rsplit('/', 1)[-1]}-word{i}" for i in range(60))
+    return f"<html><head><title>{url}</title></head><body><article><p>{words}</p></article></body></html>"
+
+
+@pytest.fixture
+def web(monkeypatch, tmp_path):
+    shared = {"title": "shared", "href": "https://Example.org/shared/", "body": ""}
+    fake = tools_web.FakeSearchBackend(
+        {
+            "faiss": [shared, {"title": "a", "href": "https://example.org/a/1", "body": ""}],
+            "background of faiss": [{"title": "b", "href": "https://example.org/b/1", "body": ""}, shared],
+            "latest updates on faiss": [{"title": "c", "href": "https://example.org/c/1", "body": ""}],
+        }
+    )
+    monkeypatch.setattr("app.tools_web._search_cache", SqliteCache("search", tmp_path / "cache.sqlite"))
+    monkeypatch.setattr("app.config.settings.enable_web", True)
+    monkeypatch.setattr("app.tools_web.time.sleep", lambda seconds: None)
+    fetched: list[str] = []
+
+    def fake_fetch(url):
+        fetched.append(url)
+        return {"url": url, "content": _page(url)}
+
+    monkeypatch.setattr("app.tools_web.fetch_url", fake_fetch)
+    tools_web.set_search_backend(fake)
+    yield fetched
+    tools_web.set_search_backend(None)
+
+
+def test_multi_search_merges_seeds_by_url(web):
+    results = tools_web.multi_search(["faiss", "background of faiss", "latest updates on faiss"], max_results=5)
+    urls = [item["href"] for item in results]
+    assert urls == ["https://Example.org/shared/", "https://example.org/b/1", "https://example.org/c/1", "https://example.org/a/1"]
+    assert results[0]["seed"] == "faiss"
+
+
+def test_crawl_many_shares_budget_and_visited_urls(web):
+    groups = [["https://example.org/a/1", "https://example.org/shared"], ["https://example.org/shared/", "https://example.org/b/1"]]
+    pages = tools_web.crawl_many(groups, depth=0, max_pages=2)
+    assert len(pages) == 2
+    assert len({tools_web.canonical_url(url) for url in web}) == len(web)
+
+
+def test_research_crawls_every_plan_seed(monkeypatch, web):
+    adapter = DeerFlowAdapter()
+    monkeypatch.setattr(adapter, "synthesize", lambda pages: {"summary": "ok", "sources": [p["url"] for p in pages]})
+    result = adapter.research("faiss", depth=0, max_results=5)
+    assert result["plan"] == ["faiss", "background of faiss", "latest updates on faiss"]
+    assert len(result["search_results"]) == 4
+    assert {page["url"] for page in result["pages"]} == {
+        "https://Example.org/shared/",
+        "https://example.org/a/1",
+        "https://example.org/b/1",
+        "https://example.org/c/1",
+    }
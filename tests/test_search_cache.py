@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app import tools_web
+from app.cache import SqliteCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path, clock):
+    fake = tools_web.FakeSearchBackend({"faiss ivf tuning": [{"title": "IVF", "href": "https://faiss.ai/ivf", "body": ""}]})
+    monkeypatch.setattr("app.tools_web._search_cache", SqliteCache("search", tmp_path / "cache.sqlite", clock=clock))
+    monkeypatch.setattr("app.config.settings.enable_web", True)
+    monkeypatch.setattr("app.config.settings.search_cache_ttl", 60)
+    monkeypatch.setattr("app.config.settings.search_cache_stale", 600)
+    tools_web.set_search_backend(fake)
+    yield fake
+    tools_web.set_search_backend(None)
+
+
+def test_cache_hits_on_normalised_query(backend):
+    first = tools_web.web_search_ddg("FAISS  IVF tuning", max_results=3)
+    second = tools_web.web_search_ddg("  faiss ivf TUNING ", max_results=3)
+    assert first == second == [{"title": "IVF", "href": "https://faiss.ai/ivf", "body": ""}]
+    assert backend.calls == 1
+
+    tools_web.web_search_ddg("faiss ivf tuning", max_results=5)
+    assert backend.calls == 2
+
+
+def test_stale_entries_are_served_then_revalidated(monkeypatch, backend, clock):
+    tools_web.web_search_ddg("ollama keep alive", max_results=2)
+
+    refreshed = threading.Event()
+    original = tools_web._search_and_store
+
+    def tracking_store(*args):
+        try:
+            return original(*args)
+        finally:
+            refreshed.set()
+
+    monkeypatch.setattr("app.tools_web._search_and_store", tracking_store)
+    clock.now += 120
+    results = tools_web.web_search_ddg("ollama keep alive", max_results=2)
+    assert len(results) == 2
+    assert refreshed.wait(timeout=5)
+    assert backend.calls == 2
+
+    clock.now += 10_000
+    tools_web.web_search_ddg("ollama keep alive", max_results=2)
+    assert backend.calls == 3
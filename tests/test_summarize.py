@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app import summarize
+from app.cache import SqliteCache
+
+
+class StubClient:
+    model = "stub"
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def generate(self, messages, stream=False):
+        with self._lock:
+            self.calls.append(messages[0]["content"])
+        return {"message": {"content": f"summary of {messages[1]['content'][:20]}"}}
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.summarize._cache", SqliteCache("summaries", tmp_path / "cache.sqlite"))
+
+
+def _pages(n: int, words: int = 50):
+    return [{"url": f"https://example.org/{i}", "text": " ".join(f"p{i}w{j}" for j in range(words))} for i in range(n)]
+
+
+def test_map_reduce_caches_page_summaries():
+    client = StubClient()
+    pages = _pages(6)
+    first = summarize.map_reduce_summarize(client, pages, workers=3)
+    assert client.calls.count(summarize.MAP_PROMPT) == 6
+    assert client.calls.count(summarize.REDUCE_PROMPT) == 1
+    assert first["cached_summaries"] == 0
+
+    second = summarize.map_reduce_summarize(client, pages, workers=3)
+    assert client.calls.count(summarize.MAP_PROMPT) == 6
+    assert second["cached_summaries"] == 6
+
+    pages[0]["text"] += " changed"
+    summarize.map_reduce_summarize(client, pages, workers=3)
+    assert client.calls.count(summarize.MAP_PROMPT) == 7
+
+
+def test_map_reduce_without_pages_skips_the_model():
+    client = StubClient()
+    assert summarize.map_reduce_summarize(client, []) == {"summary": summarize.NO_PAGES_SUMMARY, "sources": []}
+    assert client.calls == []
+
+
+def test_auto_mode_switches_on_prompt_budget(monkeypatch):
+    monkeypatch.setattr("app.config.settings.research_synthesis", "auto")
+    monkeypatch.setattr("app.config.settings.num_ctx", 2048)
+    assert not summarize.needs_map_reduce(_pages(2, words=50))
+    assert summarize.needs_map_reduce(_pages(10, words=400))
+    monkeypatch.setattr("app.config.settings.research_synthesis", "single")
+    assert not summarize.needs_map_reduce(_pages(10, words=400))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app import warmup
+from app.logging import JsonTracer
+from app.server import app
+
+
+def test_ready_reports_warmup_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.warmup.tracer", JsonTracer(tmp_path))
+    monkeypatch.setattr("app.warmup.state", warmup.WarmupState())
+
+    def failing_step():
+        raise RuntimeError("ollama offline")
+
+    monkeypatch.setattr("app.warmup.STEPS", [("encoder", lambda: None), ("ollama", failing_step)])
+    client = TestClient(app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    warmup.run_warmup()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert {"encoder", "ollama", "total"} <= set(body["timings"])
+    assert body["errors"] == {"ollama": "ollama offline"}
+    assert (tmp_path / "startup.jsonl").exists()